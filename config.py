@@ -27,9 +27,25 @@ class BaseConfig(object):
     SECRET_KEY = os.environ.get('SECRET_KEY')
     IMPORTS_FOLDER = './web_app/assets/imports/'
     EXPORTS_FOLDER = './web_app/assets/exports/'
-    ALLOWED_EXTENSIONS = {'csv'}
+    CATALOGUE_DATABASE = './web_app/assets/catalogue/catalogue.sqlite3'
+    BOMS_FOLDER = './web_app/assets/boms/'
+    ALLOWED_EXTENSIONS = {'csv', 'xlsx'}
     SESSION_TYPE = 'filesystem'
+    SESSION_FILE_DIR = os.path.join(os.getcwd(), 'flask_session')
     PART_ADDITIONAL_FIELDS = PART_CUSTOM_FIELDS
+    PARALLEL_PROCESSING_PART_COUNT = 100000
+    # Imported files from this total size are stored in SQLite BOMs instead of memory
+    SQLITE_BOM_IMPORT_SIZE = 64 * 1024 ** 2
+    STREAM_EXPORTS = True
+    STORAGE_LIMITS = {
+        'IMPORTS_FOLDER': {'max_bytes': 1024 ** 3, 'max_age': 24 * 60 * 60},
+        'EXPORTS_FOLDER': {'max_bytes': 1024 ** 3, 'max_age': 24 * 60 * 60},
+        'BOMS_FOLDER': {'max_bytes': 4 * 1024 ** 3, 'max_age': 24 * 60 * 60},
+        'SESSION_FILE_DIR': {'max_bytes': 512 * 1024 ** 2, 'max_age': 7 * 24 * 60 * 60},
+    }
+    STORAGE_EVICTION_INTERVAL = 60
+    # Processed BOMs are stored in BOMS_FOLDER, this many of them are also kept in memory of each process
+    BOM_STORE_SIZE = 16
 
     MAIL_PORT = 465
     MAIL_USE_TLS = False
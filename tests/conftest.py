@@ -0,0 +1,59 @@
+import pytest
+
+from web_app.models import DefaultBom, SqliteBom, SqliteBomManager, BomProcessor, SqliteBomProcessor, \
+    FullFeatureProcessorDirector
+
+PART_LIST_COLUMNS = ['Pos.', 'Qty.', 'Part number', 'Part name', 'Supplier']
+PART_LIST_ROWS = [
+    ['1', '1', 'M-2022-01-00', 'Assembly module', ''],
+    ['1.1', '1', '193 138', 'Non-return valve GRLA', 'FESTO'],
+    ['1.1.1', '1', 'Some junkie part', 'Inside Festo GRLA', 'FESTO'],
+    ['1.2', '2', 'DIN 912 M6 x 10', 'Hexagon head screws', 'NORELEM'],
+    ['2', '2', 'M-2022-02-00', 'Frame', ''],
+    ['2.1', '4', 'M-2022-02-01', 'Profile', ''],
+    ['2.2', '8', 'DIN 125 - A 6.4', 'Washer', 'Norelem'],
+    ['3', '1', 'LHBBW20', 'Linear guide', 'MISUMI'],
+]
+PART_COLUMNS = {
+    'position_column': 'Pos.',
+    'quantity_column': 'Qty.',
+    'number_column': 'Part number',
+    'name_column': 'Part name',
+}
+PROCESSOR_ATTRIBUTES = {
+    'production_part_keywords': 'M-2022',
+    'junk_part_empty_fields': [],
+    'junk_part_keywords': 'iMike',
+    'normalized_columns': ['Supplier'],
+    'supplier_column': 'Supplier',
+}
+
+
+def create_bom(bom, rows=PART_LIST_ROWS, columns=PART_LIST_COLUMNS, part_columns=None):
+    """ Creates Parts of the Bom from rows and sets its part columns. """
+    bom.create_parts(rows, columns)
+    bom.set_part_columns(**(PART_COLUMNS if part_columns is None else part_columns))
+    return bom
+
+
+def process_bom(bom, director_class=FullFeatureProcessorDirector, processor_attributes=None, **kwargs):
+    """ Processes the Bom with all available features, or with features of requested columns given in kwargs. """
+    processor = SqliteBomProcessor(bom) if isinstance(bom, SqliteBom) else BomProcessor(bom)
+    processor.set_attributes_from_kwargs(**(PROCESSOR_ATTRIBUTES if processor_attributes is None
+                                            else processor_attributes))
+    director_class(processor, **kwargs).run_processing()
+    return bom
+
+
+@pytest.fixture
+def bom_manager(tmp_path):
+    """ Fixture of a SQLite Bom Manager storing databases in a temporary directory. """
+    return SqliteBomManager(str(tmp_path))
+
+
+@pytest.fixture(params=[DefaultBom, SqliteBom])
+def empty_bom(request, bom_manager):
+    """ Fixture of an empty Bom of each class, Parts kept in memory or stored in SQLite. """
+    if request.param is SqliteBom:
+        return bom_manager.create_bom('M-2022-00 Layout', 2)
+    return DefaultBom('M-2022-00 Layout', 2)
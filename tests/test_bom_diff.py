@@ -0,0 +1,66 @@
+import pytest
+
+from web_app.models import BomDiff, BomDiffXlsxExporter
+
+PART_COLUMNS = {
+    'position_column': 'Pos.',
+    'quantity_column': 'Qty.',
+    'number_column': 'Part number',
+    'name_column': 'Part name',
+}
+OLD_REVISION = b"""Pos.,Qty.,Part number,Part name
+1,1,M-2022-01-00,Assembly module
+1.1,1,193 138,Non-return valve GRLA
+1.2,2,DIN 912 M6 x 10,Hexagon head screws
+1.3,1,BES01PF,Proximity switch
+"""
+NEW_REVISION = b"""Pos.,Qty.,Part number,Part name
+1,2,M-2022-01-00,Assembly module
+1.1,1,193 138,Non-return valve GRLA
+1.2,1,BES01PF,Proximity switch
+1.3,4,DIN 912 M6 x 10,Hexagon head screws
+1.4,1,KS 10,Switch head
+"""
+
+
+class TestBomDiff:
+    @pytest.fixture
+    def bom_diff(self):
+        """ Fixture of changes between two revisions of a csv part list. """
+        return BomDiff.from_csv(OLD_REVISION, NEW_REVISION, PART_COLUMNS, main_assembly_sets=2)
+
+    def test_part_changes(self, bom_diff):
+        """ Test whether added, moved and quantity-changed parts are reported. """
+        changes = {(change['change'], change['number']): change for change in bom_diff.changes}
+        assert set(changes) == {
+            ('quantity_changed', 'M-2022-01-00'),
+            ('moved', 'BES01PF'),
+            ('moved', 'DIN 912 M6 x 10'),
+            ('added', 'KS 10'),
+        }
+        screws = changes[('moved', 'DIN 912 M6 x 10')]
+        assert (screws['old_position'], screws['new_position']) == ('1.2', '1.3')
+        assert (screws['old_quantity'], screws['new_quantity']) == (2, 4)
+
+    def test_removed_part(self):
+        """ Test whether a part missing in the new revision is reported as removed. """
+        bom_diff = BomDiff.from_csv(NEW_REVISION, OLD_REVISION, PART_COLUMNS)
+        assert [change['number'] for change in bom_diff.changes if change['change'] == 'removed'] == ['KS 10']
+
+    def test_to_order_changes_are_propagated(self, bom_diff):
+        """ Test whether a changed assembly quantity changes quantities to order of all its children. """
+        to_order_changes = {change['number']: (change['old_to_order'], change['new_to_order'])
+                            for change in bom_diff.to_order_changes}
+        assert to_order_changes == {
+            'M-2022-01-00': (2, 4),
+            '193 138': (2, 4),
+            'DIN 912 M6 x 10': (4, 16),
+            'BES01PF': (2, 4),
+            'KS 10': (0, 4),
+        }
+
+    def test_export_diff(self, bom_diff, tmp_path):
+        """ Test whether the changes are exported to a xlsx file. """
+        exporter = BomDiffXlsxExporter(bom_diff)
+        exporter.export_diff(f'{tmp_path}/', 'changes')
+        assert (tmp_path / 'changes.xlsx').exists()
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from web_app.models import BomStore, DefaultBom
+
+
+class TestBomStore:
+    @pytest.fixture
+    def bom_store(self, tmp_path):
+        """ Fixture of a BOM store keeping two BOMs in memory. """
+        return BomStore(str(tmp_path), max_count=2)
+
+    def test_get_stored_bom(self, bom_store):
+        """ Test whether a stored BOM is returned by its key, without loading it again. """
+        bom = DefaultBom('M-2022-00 Layout', 1)
+        key = bom_store.add(bom)
+        assert bom_store.get(key) is bom
+        assert bom_store.get('unknown') is None
+        assert bom_store.get(None) is None
+        assert bom_store.get('../key') is None
+
+    def test_load_bom_from_file(self, bom_store, tmp_path):
+        """ Test whether a BOM is loaded from its file by another process, or after dropped from memory. """
+        key = bom_store.add(DefaultBom('M-2022-00 Layout', 1))
+        other_bom_store = BomStore(str(tmp_path))
+        assert other_bom_store.get(key).main_assembly_name == 'M-2022-00 Layout'
+        bom_store.add(DefaultBom())
+        bom_store.add(DefaultBom())
+        assert len(bom_store) == 2
+        assert bom_store.get(key).main_assembly_sets == 1
+
+    def test_expired_file(self, bom_store):
+        """ Test whether a BOM is not returned after its file expired, even if it is kept in memory. """
+        key = bom_store.add(DefaultBom())
+        os.remove(bom_store.get_path(key))
+        assert bom_store.get(key) is None
+
+    def test_remove_bom(self, bom_store):
+        """ Test whether a removed BOM and its file are dropped. """
+        key = bom_store.add(DefaultBom())
+        bom_store.remove(key)
+        bom_store.remove(key)
+        assert bom_store.get(key) is None
+        assert not os.path.exists(bom_store.get_path(key))
@@ -1,6 +1,8 @@
+import copy
+
 import pytest
 
-from web_app.models import DefaultBom, DefaultPart
+from web_app.models import DefaultBom, DefaultPart, PartFlags
 
 PART = {
     'Pos.': '100',
@@ -128,6 +130,68 @@ class TestDefaultBom:
             for key, value in testing_fields.items():
                 assert getattr(part, key) == value
 
+    def test_create_parts_from_rows(self, default_bom):
+        """ Test whether Default Bom creates Default Parts from rows sharing the same columns. """
+        columns = list(PART.keys())
+        parts = default_bom.create_parts([list(PART.values())] * 3, columns)
+        assert len(parts) == 3
+        assert default_bom.get_part_count() == len(PART_LIST) + 3
+        for part in parts:
+            assert isinstance(part, DefaultPart)
+            assert part.parent is None
+            for key, value in PART.items():
+                assert getattr(part, key) == value
+
+    def test_create_parts_from_columns(self, default_bom):
+        """ Test whether Default Bom creates Default Parts from columnar data. """
+        parts = default_bom.create_parts({'Pos.': ['1', '2'], 'Part number': ['A', 'B']})
+        assert [(part.__dict__['Pos.'], part.__dict__['Part number']) for part in parts] == [('1', 'A'), ('2', 'B')]
+        assert parts[0].__dict__ is not parts[1].__dict__
+
+    def test_create_parts_shares_repeated_values(self, default_bom):
+        """ Test whether equal values of low-cardinality columns are shared by created parts. """
+        rows = [[str(position), ''.join(['Fes', 'to'])] for position in range(10)]
+        parts = default_bom.create_parts(rows, ['Pos.', 'Supplier'])
+        assert default_bom.value_dictionary.encoded_columns == ['Supplier']
+        assert all(part.__dict__['Supplier'] is parts[0].__dict__['Supplier'] for part in parts)
+        assert [part.__dict__['Pos.'] for part in parts] == [str(position) for position in range(10)]
+
+    def test_where_used_index(self, default_bom):
+        """ Test whether the where-used index is kept up to date when parts are created and deleted. """
+        default_bom.set_part_columns(number_column='Part number', position_column='Pos.')
+        screw = default_bom.create_part(**{'Pos.': '1-8', 'Part number': 'DIN 912 M6 x 10'})
+        assert len(default_bom.where_used.get_parts('DIN 912 M6 x 10')) == 2
+        assert 'M-2022-01-00' in default_bom.where_used
+
+        default_bom.delete_part(screw)
+        assert default_bom.where_used.get_parts('DIN 912 M6 x 10') == [part for part in default_bom.part_list
+                                                                       if part.number == 'DIN 912 M6 x 10']
+        assert default_bom.get_where_used('missing part') == []
+
+    def test_set_part_columns(self, default_bom):
+        """ Test whether part columns are remapped for all parts at once, including copies of parts. """
+        default_bom.set_part_columns(number_column='Part number', position_column='Pos.')
+        copied_part = copy.deepcopy(next(iter(default_bom.part_list)))
+        assert all(part._column_schema is default_bom.column_schema for part in default_bom.part_list)
+        assert copied_part._column_schema is default_bom.column_schema
+
+        default_bom.set_part_columns(number_column='Part name')
+        assert copied_part.number == copied_part.__dict__['Part name']
+        assert 'M-2022-01-00' not in default_bom.where_used
+        with pytest.raises(AttributeError):
+            default_bom.set_part_columns(supplier_column='Supplier')
+
+    def test_part_flags(self, part_created_by_default_bom):
+        """ Test whether boolean part attributes are views of the part flags bitmask. """
+        part = part_created_by_default_bom
+        assert part.is_junk is None and part.flags == 0
+        part.is_fastener, part.is_junk_by_keywords = True, False
+        assert part.flags == PartFlags.FASTENER
+        assert (part.is_fastener, part.is_junk_by_keywords, part.is_junk) == (True, False, None)
+        part.is_fastener = None
+        assert part.is_fastener is None and part.flags == 0
+        assert DefaultPart(is_junk=True).flags == PartFlags.JUNK
+
     def test_delete_part(self, default_bom, part_created_by_default_bom):
         """ Test whether created part is correctly deleted. """
         default_bom.delete_part(part_created_by_default_bom)
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+ROOT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ['pandas', 'numpy', 'openpyxl', 'flask', 'flask_session', 'flask_mail']
+# Cold start budget of importing the part model, relative to importing pandas in the same interpreter, so the
+# budget scales with the speed of the machine
+MAX_IMPORT_TIME_RATIO = 0.75
+
+
+def run_python(code: str) -> str:
+    """ Runs the code in a new interpreter and returns its standard output and error. """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT_DIRECTORY,
+                            capture_output=True, text=True, check=True)
+    return result.stdout + result.stderr
+
+
+class TestImportTime:
+    def test_heavy_dependencies_loaded_lazily(self):
+        """ Test whether importing models and functions does not import heavy dependencies. """
+        output = run_python(f'import sys, web_app.models, web_app.functions; '
+                            f'print([module for module in {LAZY_MODULES} if module in sys.modules])')
+        assert '[]' in output.splitlines()
+
+    def test_cold_start_time(self):
+        """ Test whether the cumulative import time of models fits in the budget relative to importing pandas. """
+        output = run_python('import web_app.models, pandas')
+        import_times = [line.split('|') for line in output.splitlines() if line.startswith('import time:')]
+        cumulative_times = {module.strip(): int(cumulative) for _, cumulative, module in import_times
+                            if module.strip() in ('web_app.models', 'pandas')}
+        assert cumulative_times['web_app.models'] < cumulative_times['pandas'] * MAX_IMPORT_TIME_RATIO
+
+    def test_preload(self):
+        """ Test whether preloading imports lazily loaded dependencies up front. """
+        output = run_python("import sys, web_app; web_app.preload(['pandas']); print('pandas' in sys.modules)")
+        assert 'True' in output.splitlines()
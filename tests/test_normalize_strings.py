@@ -0,0 +1,19 @@
+import pandas as pd
+
+from web_app.functions import normalize_string, normalize_strings, normalize_series
+
+SAMPLES = ['Elesa-ganter', '   Elesa-ganter   ', 'elesa - ganter', 'ELESA-GANTER', 'FESTO', 'Festo', '', 'FESTO']
+
+
+def test_normalize_strings():
+    """ Test whether batch normalization gives the same result as normalizing each value. """
+    assert normalize_strings(SAMPLES) == [normalize_string(sample) for sample in SAMPLES]
+
+
+def test_normalize_series():
+    """ Test whether vectorized normalization of a DataFrame column gives the same result as normalizing each value. """
+    series = pd.Series(SAMPLES + [None], index=range(10, 10 + len(SAMPLES) + 1), name='Supplier')
+    normalized_series = normalize_series(series)
+    assert normalized_series.tolist() == [normalize_string(sample) for sample in SAMPLES] + [None]
+    assert normalized_series.index.equals(series.index)
+    assert normalized_series.name == 'Supplier'
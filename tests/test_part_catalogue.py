@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from web_app.models import DefaultBom, PartCatalogue
+
+
+def create_processed_bom(source_name, purchase_items):
+    """ Creates a Default Bom with an imported source and a purchase list. """
+    bom = DefaultBom(main_assembly_name=source_name.rsplit('.', 1)[0], main_assembly_sets=1)
+    bom.imported_bom_sources.append({'type': 'file', 'name': source_name})
+    bom.purchase_list = {}
+    for number, name, supplier, part_type, to_order in purchase_items:
+        bom.purchase_list.setdefault(part_type, []).append({
+            'number': number,
+            'name': name,
+            'supplier': supplier,
+            'type': part_type,
+            'to_order': to_order,
+            'positions': ['1.1'],
+        })
+    return bom
+
+
+class TestPartCatalogue:
+    @pytest.fixture
+    def catalogue(self, tmp_path):
+        """ Fixture of a Part catalogue with two projects. """
+        catalogue = PartCatalogue(str(tmp_path / 'catalogue.sqlite3'))
+        catalogue.update(create_processed_bom('Layout A.csv', [
+            ('DIN 912 M6 x 10', 'Hexagon head screws', 'Norelem', 'fastener', 12),
+            ('193 138', 'Non-return valve GRLA', 'Festo', 'purchased', 2),
+        ]))
+        catalogue.update(create_processed_bom('Layout B.csv', [
+            ('DIN 912 M6 x 10', 'Hexagon head screws', 'Norelem', 'fastener', 30),
+        ]))
+        return catalogue
+
+    def test_find_by_number(self, catalogue):
+        """ Test whether projects using a part number are found with their quantities. """
+        entries = catalogue.find_by_number('DIN 912 M6 x 10')
+        assert [(entry['source'], entry['to_order']) for entry in entries] == [('Layout A.csv', 12),
+                                                                              ('Layout B.csv', 30)]
+
+    def test_find_by_supplier_and_name_prefix(self, catalogue):
+        """ Test whether parts are found by supplier and by a case-insensitive name prefix. """
+        assert [entry['number'] for entry in catalogue.find_by_supplier('Festo')] == ['193 138']
+        assert len(catalogue.find_by_name_prefix('hexagon')) == 2
+        assert catalogue.find_by_name_prefix('head') == []
+
+    def test_update_replaces_only_own_source(self, catalogue):
+        """ Test whether processing a BOM again replaces only rows of its own source. """
+        catalogue.update(create_processed_bom('Layout A.csv', [
+            ('DIN 912 M6 x 10', 'Hexagon head screws', 'Norelem', 'fastener', 6),
+        ]))
+        entries = catalogue.find_by_number('DIN 912 M6 x 10')
+        assert [(entry['source'], entry['to_order']) for entry in entries] == [('Layout A.csv', 6),
+                                                                              ('Layout B.csv', 30)]
+        assert catalogue.find_by_number('193 138') == []
+
+    def test_decimal_quantities(self, catalogue):
+        """ Test whether decimal quantities, e.g. cut lengths, are stored as numbers. """
+        catalogue.update(create_processed_bom('Layout C.csv', [
+            ('LHBBW20', 'Linear guide', 'Misumi', 'purchased', Decimal('2.5')),
+        ]))
+        assert [entry['to_order'] for entry in catalogue.find_by_number('LHBBW20')] == [Decimal('2.5')]
@@ -0,0 +1,80 @@
+import csv
+import io
+
+import openpyxl
+import pytest
+
+from conftest import create_bom, process_bom
+from web_app.functions import get_export_content_key
+from web_app.models import DefaultBom, BomCsvExporter, BomXlsxExporter, BomTypeSheetsXlsxExporter
+
+PART_LIST_COLUMNS = ['Pos.', 'Qty.', 'Part number', 'Part name']
+PART_LIST_ROWS = [
+    ['2', '1', 'M-2022-02-00', 'Frame'],
+    ['1', '1', 'M-2022-01-00', 'Assembly module'],
+    ['1.1', '2', 'DIN 912 M6 x 10', 'Hexagon head screws'],
+]
+EXPORTED_COLUMNS = ['Pos.', 'Part number', 'to_order']
+
+
+@pytest.fixture
+def processed_bom():
+    """ Fixture of a processed Bom imported from a file. """
+    bom = create_bom(DefaultBom('M-2022-00 Layout', 2), PART_LIST_ROWS, PART_LIST_COLUMNS)
+    bom.imported_bom_sources.append({'type': 'file', 'name': 'layout.csv'})
+    return process_bom(bom, processor_attributes={'production_part_keywords': 'M-2022', 'normalized_columns': []})
+
+
+class TestBomCsvExporter:
+    def test_stream_part_list(self, processed_bom):
+        """ Test whether the csv file is streamed in tree order with formatted column names. """
+        bom_exporter = BomCsvExporter(processed_bom)
+        content = b''.join(bom_exporter.stream_part_list(EXPORTED_COLUMNS)).decode('utf-8-sig')
+        assert list(csv.reader(io.StringIO(content))) == [
+            ['Pos.', 'Part number', 'To order'],
+            ['1', 'M-2022-01-00', '2'],
+            ['1.1', 'DIN 912 M6 x 10', '4'],
+            ['2', 'M-2022-02-00', '2'],
+        ]
+        assert bom_exporter.get_exported_filename() == 'layout.csv'
+
+    def test_stream_subtree(self, processed_bom):
+        """ Test whether only the subtree of the root Part is streamed. """
+        subtree_root = next(part for part in processed_bom.part_list if part.position == '1')
+        content = b''.join(BomCsvExporter(processed_bom).stream_part_list(EXPORTED_COLUMNS, subtree_root=subtree_root))
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        assert [row[0] for row in rows[1:]] == ['1', '1.1']
+
+
+class TestBomXlsxExporter:
+    def test_stream_part_list(self, processed_bom):
+        """ Test whether the streamed xlsx file has the same rows as the tree part list. """
+        content = b''.join(BomXlsxExporter(processed_bom).stream_part_list(EXPORTED_COLUMNS, True))
+        workbook = openpyxl.load_workbook(io.BytesIO(content))
+        rows = list(workbook['Bill of materials'].values)
+        assert rows[0] == ('Pos.', 'Part number', 'To order')
+        assert [row[0] for row in rows[1:]] == ['1', '1.1', '2']
+        assert 'Purchase list - production' in workbook.sheetnames
+
+
+class TestBomTypeSheetsXlsxExporter:
+    def test_stream_part_list(self, processed_bom):
+        """ Test whether parts are split into sheets by type and the tree sheet is outlined by depth. """
+        content = b''.join(BomTypeSheetsXlsxExporter(processed_bom).stream_part_list(EXPORTED_COLUMNS + ['child']))
+        workbook = openpyxl.load_workbook(io.BytesIO(content))
+        assert workbook.sheetnames == ['Bill of materials', 'Parts - production', 'Parts - purchased',
+                                       'Parts - fastener', 'Parts - junk']
+        tree_sheet = workbook['Bill of materials']
+        assert [row[0] for row in tree_sheet.values] == ['Pos.', '1', '1.1', '2']
+        assert [tree_sheet.row_dimensions[row].outlineLevel for row in range(2, 5)] == [0, 1, 0]
+        assert tree_sheet.cell(2, 4).value == '[DIN 912 M6 x 10 Hexagon head screws]'
+        assert [row[0] for row in workbook['Parts - production'].values] == ['Pos.', '1', '2']
+        assert [row[0] for row in workbook['Parts - fastener'].values] == ['Pos.', '1.1']
+
+
+def test_export_content_key():
+    """ Test whether the content key changes with the imported file and processing settings. """
+    settings = {'EXPORT_COLUMNS': EXPORTED_COLUMNS}
+    assert get_export_content_key('digest', settings) == get_export_content_key('digest', dict(settings))
+    assert get_export_content_key('digest', settings) != get_export_content_key('other digest', settings)
+    assert get_export_content_key('digest', settings) != get_export_content_key('digest', {'EXPORT_COLUMNS': []})
@@ -0,0 +1,160 @@
+import io
+from decimal import Decimal
+
+import pytest
+
+from web_app.models import PartListCsvImporter, PartListCsvSniffer, PartListXlsxImporter, PartListXlsxSniffer
+
+CSV_COLUMNS = b'Pos.,Qty.,Part number,Part name,Supplier'
+CSV_ROWS = [
+    b'1,1,M-2022-01-00,Assembly module,',
+    b'1.1,1,193 138,Non-return valve GRLA,FESTO',
+    b'1.2,2,DIN 912 M6 x 10,Hexagon head screws,NORELEM',
+]
+
+
+class TestPartListCsvImporter:
+    @pytest.fixture
+    def csv_bytes(self):
+        """ Fixture of a csv part list with a header at the bottom. """
+        return b'\n'.join(CSV_ROWS + [CSV_COLUMNS])
+
+    def test_import_from_bytes(self, csv_bytes):
+        """ Test whether the part list is read from raw bytes. """
+        importer = PartListCsvImporter(csv_bytes, 'bottom', 'sample.csv')
+        assert importer.imported_bom_columns == CSV_COLUMNS.decode().split(',')
+        assert len(importer.imported_part_list) == len(CSV_ROWS)
+
+    def test_import_from_stream(self, csv_bytes):
+        """ Test whether the part list is read from a binary file-like object. """
+        importer = PartListCsvImporter(io.BytesIO(csv_bytes), 'bottom', 'sample.csv')
+        assert importer.imported_part_list[1][2] == '193 138'
+
+    def test_import_from_file(self, csv_bytes, tmp_path):
+        """ Test whether the part list is read from a local file. """
+        filepath = tmp_path / 'sample.csv'
+        filepath.write_bytes(csv_bytes)
+        importer = PartListCsvImporter(str(filepath), 'bottom')
+        assert len(importer.imported_part_list) == len(CSV_ROWS)
+        assert importer._get_imported_bom_source() == {'type': 'file', 'name': 'sample.csv'}
+
+    def test_import_with_header_on_top(self):
+        """ Test whether the header row is removed when it is on top of the part list. """
+        importer = PartListCsvImporter(b'\n'.join([CSV_COLUMNS] + CSV_ROWS), 'top', 'sample.csv')
+        assert [part[0] for part in importer.imported_part_list] == ['1', '1.1', '1.2']
+
+    def test_import_typed_quantities(self):
+        """ Test whether quantities are parsed once to integers or decimals and other values are kept. """
+        rows = [b'1,2,Frame', b'1.1,"2,5",Profile', b'1.2,pcs,Screw']
+        importer = PartListCsvImporter(b'\n'.join([b'Pos.,Qty.,Part number'] + rows), 'top',
+                                       quantity_column='Qty.')
+        assert [part[1] for part in importer.imported_part_list] == [2, Decimal('2.5'), 'pcs']
+        assert isinstance(importer.imported_part_list[0][1], int)
+
+    def test_import_with_another_encoding(self):
+        """ Test whether the next encoding is tried if the source cannot be decoded with the sniffed one. """
+        rows = [b'%d,1,M-2022-%d,Frame' % (index, index) for index in range(1, 100)]
+        rows[50] = '51,1,M-2022-51,Ko\u0142o z\u0119bate'.encode('cp1250')
+        importer = PartListCsvImporter(io.BytesIO(b'\n'.join([b'Pos.,Qty.,Part number,Part name'] + rows)), 'top',
+                                       encoding='utf-8-sig')
+        assert importer.encoding == 'cp1250'
+        assert importer.imported_part_list[50][3] == 'Ko\u0142o z\u0119bate'
+
+    def test_import_stripped_header(self):
+        """ Test whether column names are stripped as offered by the sniffer. """
+        importer = PartListCsvImporter(b'Pos. ,Qty. ,Part number\n1,2,Frame', 'top', quantity_column='Qty.')
+        assert importer.imported_bom_columns == ['Pos.', 'Qty.', 'Part number']
+        assert importer.imported_part_list == [['1', 2, 'Frame']]
+
+
+def get_xlsx_bytes(rows):
+    """ Returns the workbook with rows in its active sheet saved to bytes. """
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+XLSX_COLUMNS = ['Pos.', 'Qty.', 'Part number', 'Part name', 'Supplier']
+XLSX_ROWS = [
+    [1, 1, 'M-2022-01-00', 'Assembly module', None],
+    ['1.1', 2.5, 193138, 'Non-return valve GRLA', 'FESTO'],
+    ['1.2', '2', 'DIN 912 M6 x 10', 'Hexagon head screws', 'NORELEM'],
+]
+
+
+class TestPartListXlsxImporter:
+    def test_import_with_header_at_the_bottom(self):
+        """ Test whether rows of the sheet are read as text, except for parsed quantities. """
+        xlsx_bytes = get_xlsx_bytes(XLSX_ROWS + [[], XLSX_COLUMNS])
+        importer = PartListXlsxImporter(io.BytesIO(xlsx_bytes), 'bottom', 'sample.xlsx', quantity_column='Qty.')
+        assert importer.imported_bom_columns == XLSX_COLUMNS
+        assert importer.imported_part_list == [
+            ['1', 1, 'M-2022-01-00', 'Assembly module', ''],
+            ['1.1', Decimal('2.5'), '193138', 'Non-return valve GRLA', 'FESTO'],
+            ['1.2', 2, 'DIN 912 M6 x 10', 'Hexagon head screws', 'NORELEM'],
+        ]
+        assert importer._get_imported_bom_source() == {'type': 'file', 'name': 'sample.xlsx'}
+
+    def test_import_with_header_on_top(self, tmp_path):
+        """ Test whether the header row is removed and rows are fitted to the header. """
+        filepath = tmp_path / 'sample.xlsx'
+        filepath.write_bytes(get_xlsx_bytes([XLSX_COLUMNS[:3]] + [row[:4] for row in XLSX_ROWS]))
+        importer = PartListXlsxImporter(str(filepath), 'top')
+        assert importer.imported_bom_columns == XLSX_COLUMNS[:3]
+        assert [part[1] for part in importer.imported_part_list] == ['1', '2.5', '2']
+        assert all(len(part) == 3 for part in importer.imported_part_list)
+
+    def test_import_stripped_header(self):
+        """ Test whether column names are stripped as offered by the sniffer. """
+        xlsx_bytes = get_xlsx_bytes([['Pos. ', ' Qty. ', 'Part number'], ['1', 2, 'Frame']])
+        importer = PartListXlsxImporter(xlsx_bytes, 'top', quantity_column='Qty.')
+        assert importer.imported_bom_columns == ['Pos.', 'Qty.', 'Part number']
+        assert importer.imported_part_list == [['1', 2, 'Frame']]
+
+
+class TestPartListXlsxSniffer:
+    def test_sniff_header_at_the_bottom(self):
+        """ Test whether the header position is detected and the stream can be read again. """
+        stream = io.BytesIO(get_xlsx_bytes(XLSX_ROWS + [XLSX_COLUMNS]))
+        sniffed = PartListXlsxSniffer(stream).sniff()
+        assert sniffed['header_position'] == 'bottom'
+        assert sniffed['columns'] == XLSX_COLUMNS
+        assert sniffed['preselected_columns']['quantity'] == 'Qty.'
+        assert stream.tell() == 0
+
+
+class TestPartListCsvSniffer:
+    def test_sniff_header_at_the_bottom(self):
+        """ Test whether the header position and the part columns are detected. """
+        sniffed = PartListCsvSniffer(b'\n'.join(CSV_ROWS + [CSV_COLUMNS])).sniff()
+        assert sniffed['header_position'] == 'bottom'
+        assert sniffed['delimiter'] == ','
+        assert sniffed['preselected_columns'] == {
+            'position': 'Pos.',
+            'quantity': 'Qty.',
+            'number': 'Part number',
+            'name': 'Part name',
+            'supplier': 'Supplier',
+        }
+
+    def test_sniff_encoding_and_delimiter(self):
+        """ Test whether a non utf-8 part list with a custom delimiter is detected. """
+        csv_text = 'Poz.;Ilość;Numer;Nazwa\n1;2;M-2022-01-00;Płyta\n1.1;3;DIN 912 M6 x 10;Śruba\n'
+        sniffed = PartListCsvSniffer(io.BytesIO(csv_text.encode('cp1250'))).sniff()
+        assert sniffed['encoding'] == 'cp1250'
+        assert sniffed['delimiter'] == ';'
+        assert sniffed['header_position'] == 'top'
+        assert sniffed['columns'] == ['Poz.', 'Ilość', 'Numer', 'Nazwa']
+
+    def test_sniff_reads_only_head_and_tail(self, monkeypatch):
+        """ Test whether a part list larger than the sample is sniffed from its first and last lines. """
+        monkeypatch.setattr(PartListCsvSniffer, 'sample_size', 64)
+        csv_bytes = b'\n'.join(CSV_ROWS * 100 + [CSV_COLUMNS])
+        sniffed = PartListCsvSniffer(csv_bytes).sniff()
+        assert sniffed['header_position'] == 'bottom'
+        assert sniffed['columns'] == CSV_COLUMNS.decode().split(',')
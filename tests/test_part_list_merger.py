@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+from web_app.exceptions import MergedColumnNotFound, MergedPositionConflict
+from web_app.models import DefaultBom, PartListMerger
+
+MAIN_ASSEMBLY = b"""Pos.,Qty.,Part number,Part name
+1,1,M-2022-01-00,Assembly module
+2,1,M-2022-02-00,Frame
+2.1,4,DIN 912 M6 x 10,Hexagon head screws
+"""
+SUBASSEMBLY = b"""Pos.,Qty.,Part number,Part name,Supplier
+1,1,193 138,Non-return valve GRLA,FESTO
+1.1,2,DIN 125 - A 6.4,Washer,NORELEM
+"""
+
+
+def merge(sources, **kwargs):
+    """ Merges sources into a new Default Bom and returns the BOM with the merger. """
+    bom = DefaultBom('M-2022-00 Layout', 1)
+    merger = PartListMerger(sources, 'Pos.', 'Qty.', **kwargs)
+    merger.merge_to(bom)
+    return bom, merger
+
+
+class TestPartListMerger:
+    def test_merge_sources_under_parent(self):
+        """ Test whether positions of merged sources are nested under their parent and columns are combined. """
+        bom, merger = merge([
+            {'source': MAIN_ASSEMBLY, 'filename': 'layout.csv'},
+            {'source': io.BytesIO(SUBASSEMBLY), 'filename': 'valve.csv', 'parent_position': '1'},
+        ], max_workers=2)
+        assert [part.__dict__['Pos.'] for part in bom.part_list] == ['1', '2', '2.1', '1.1', '1.1.1']
+        assert bom.imported_bom_columns == ['Pos.', 'Qty.', 'Part number', 'Part name', 'Supplier']
+        assert [part.Supplier for part in bom.part_list] == ['', '', '', 'FESTO', 'NORELEM']
+        assert [source['name'] for source in bom.imported_bom_sources] == ['layout.csv', 'valve.csv']
+        assert len(merger.source_digests) == 2
+
+    def test_skip_duplicates(self):
+        """ Test whether repeated sources and rows are merged once, while a source under another parent is kept. """
+        bom, merger = merge([
+            {'source': MAIN_ASSEMBLY, 'filename': 'layout.csv'},
+            {'source': SUBASSEMBLY, 'filename': 'valve.csv', 'parent_position': '1'},
+            {'source': SUBASSEMBLY, 'filename': 'valve copy.csv', 'parent_position': '1'},
+            {'source': SUBASSEMBLY, 'filename': 'valve.csv', 'parent_position': '2.1'},
+            {'source': MAIN_ASSEMBLY + b'3,1,M-2022-03-00,Cover\n', 'filename': 'layout v2.csv'},
+        ])
+        assert merger.duplicate_sources == ['valve copy.csv']
+        assert merger.duplicate_row_count == 3
+        positions = [part.__dict__['Pos.'] for part in bom.part_list]
+        assert positions == ['1', '2', '2.1', '1.1', '1.1.1', '2.1.1', '2.1.1.1', '3']
+
+    def test_position_conflict(self):
+        """ Test whether a row at a position already merged from another source with other content is reported. """
+        with pytest.raises(MergedPositionConflict) as e:
+            merge([
+                {'source': MAIN_ASSEMBLY, 'filename': 'layout.csv'},
+                {'source': MAIN_ASSEMBLY.replace(b'Frame', b'Base frame'), 'filename': 'layout v2.csv'},
+            ])
+        assert (e.value.position, e.value.source_name) == ('2', 'layout v2.csv')
+
+    def test_position_column_not_found(self):
+        """ Test whether a nested source without the position column is reported. """
+        with pytest.raises(MergedColumnNotFound):
+            merge([{'source': SUBASSEMBLY.replace(b'Pos.', b'Item'), 'filename': 'valve.csv',
+                    'parent_position': '1'}])
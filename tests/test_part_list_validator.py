@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import PART_COLUMNS, PART_LIST_COLUMNS, create_bom
+from web_app.exceptions import PartListValidationError
+from web_app.models import DefaultBom, BomProcessor, FullFeatureProcessorDirector, PartListValidator
+
+MANDATORY_COLUMNS = PART_LIST_COLUMNS[:4]
+
+
+def create_validated_bom(rows, part_columns=None) -> DefaultBom:
+    """ Creates a Default Bom from rows of mandatory columns with part columns set. """
+    return create_bom(DefaultBom('M-2022-00 Layout', 1), rows, MANDATORY_COLUMNS, part_columns)
+
+
+class TestPartListValidator:
+    def test_valid_part_list(self):
+        """ Test whether a valid part list has no problems. """
+        bom = create_validated_bom([['1', '1', 'M-01', 'Module'], ['1.1', ' 2 ', 'M-02', '']])
+        assert PartListValidator(bom).validate() == []
+
+    def test_all_problems_found_at_once(self):
+        """ Test whether every problem of the part list is returned with its row. """
+        bom = create_validated_bom([
+            ['1', '1', 'M-01', 'Module'],
+            ['1.1', 'two', 'M-02', 'Cover'],
+            ['1.1', '1', 'M-03', 'Holder'],
+            ['1-2.1', '1', 'M-04', 'Screw'],
+            ['2.1', '1', '', 'Washer'],
+        ])
+        problems = [(problem['row'], problem['column']) for problem in PartListValidator(bom).validate()]
+        assert problems == [
+            (2, 'Part quantity'),
+            (2, 'Part position'),
+            (3, 'Part position'),
+            (4, 'Part position'),
+            (4, 'Part position'),
+            (5, 'Part number'),
+            (5, 'Part position'),
+        ]
+
+    def test_column_names_not_set(self):
+        """ Test whether mandatory columns which names are not set are reported. """
+        bom = create_validated_bom([['1', '1', 'M-01', 'Module']], {**PART_COLUMNS, 'name_column': ''})
+        assert [problem['column'] for problem in PartListValidator(bom).validate()] == ['Part name']
+
+    def test_processing_stopped_before_initialization(self):
+        """ Test whether processing of an invalid part list stops before copying the part list. """
+        bom = create_validated_bom([['1', 'x', 'M-01', 'Module']])
+        processor = BomProcessor(bom)
+        with pytest.raises(PartListValidationError) as e:
+            FullFeatureProcessorDirector(processor).run_processing()
+        assert len(e.value.problems) == 1
+        assert processor.initial_part_list is None
@@ -0,0 +1,86 @@
+import pytest
+
+from web_app.functions.functions import get_natural_sort_key
+from web_app.models import DefaultPart, PartColumnSchema
+from web_app.models.parts_collection import PartsCollection, PartNumberOrderIterator
+
+PART_COLUMNS = {
+    'position_column': 'Pos.',
+    'quantity_column': 'Qty.',
+    'number_column': 'Part number',
+    'name_column': 'Part name',
+}
+COLUMN_SCHEMA = PartColumnSchema(**PART_COLUMNS)
+
+
+def create_part(position, number, part_type):
+    """ Creates a Default Part with part columns set. """
+    return DefaultPart(**{'Pos.': position, 'Qty.': '1', 'Part number': number, 'Part name': '', 'type': part_type},
+                       _column_schema=COLUMN_SCHEMA)
+
+
+def test_natural_sort_key():
+    """ Test whether positions with numbers are sorted in natural order. """
+    positions = ['1.10', '1.2', '1', '1.1.2', '10', '2', '1.1.10']
+    assert sorted(positions, key=get_natural_sort_key) == ['1', '1.1.2', '1.1.10', '1.2', '1.10', '2', '10']
+
+
+class TestPartsCollectionOrder:
+    @pytest.fixture
+    def parts_collection(self):
+        """ Fixture of a linked Parts collection. """
+        parts = {
+            '1': create_part('1', 'M-2022-01-00', 'production'),
+            '1.10': create_part('1.10', 'DIN 912 M6 x 10', 'fastener'),
+            '1.2': create_part('1.2', 'DIN 912 M6 x 10', 'fastener'),
+            '1.3': create_part('1.3', '193 138', 'purchased'),
+            '1.4': create_part('1.4', 'M-2022-01-01', 'production'),
+            '1.4.1': create_part('1.4.1', 'Some junkie part', 'junk'),
+            '2': create_part('2', 'A-2022-00', 'production'),
+        }
+        for position, part in parts.items():
+            part.parent = parts.get(position.rsplit('.', 1)[0]) if '.' in position else None
+            part.child = [child for child in parts.values() if child.parent_id == position]
+        return PartsCollection(list(parts.values()))
+
+    def test_tree_order(self, parts_collection):
+        """ Test whether the tree is ordered by type, number and natural position within each parent. """
+        tree_positions = [part.position for part in parts_collection.get_tree_part_list()]
+        assert tree_positions == ['2', '1', '1.4', '1.4.1', '1.3', '1.2', '1.10']
+
+    def test_part_number_order(self, parts_collection):
+        """ Test whether parts are ordered by number and natural position. """
+        positions = [part.position for part in PartNumberOrderIterator(list(parts_collection))]
+        assert positions == ['1.3', '2', '1.2', '1.10', '1', '1.4', '1.4.1']
+
+    def test_tree_rows(self, parts_collection):
+        """ Test whether a page of the tree gives Parts with their depths and child counts. """
+        rows = parts_collection.get_tree_rows(1, 3)
+        assert [(row['index'], row['part'].position, row['depth'], row['child_count']) for row in rows] == \
+               [(1, '1', 0, 4), (2, '1.4', 1, 1), (3, '1.4.1', 2, 0)]
+        assert parts_collection.get_tree_rows(6, 10)[0]['part'].position == '1.10'
+
+    def test_tree_children(self, parts_collection):
+        """ Test whether children of a Part are given in tree order without deeper descendants. """
+        children = parts_collection.get_tree_children(1)
+        assert [row['part'].position for row in children] == ['1.4', '1.3', '1.2', '1.10']
+        assert [row['part'].position for row in parts_collection.get_tree_children(1, 1, 2)] == ['1.3', '1.2']
+        with pytest.raises(IndexError):
+            parts_collection.get_tree_children(7)
+
+    def test_tree_order_invalidated_when_parts_added(self, parts_collection):
+        """ Test whether the cached tree order is rebuilt after Parts are added. """
+        assert len(parts_collection.get_tree_order()) == 7
+        parts_collection.add_part(create_part('3', 'A-2022-01', 'production'))
+        assert [part.position for part in parts_collection.get_tree_order()][:2] == ['2', '3']
+
+    def test_subtree_index(self, parts_collection):
+        """ Test whether ancestors and subtrees are found by tree order intervals. """
+        parts = {part.position: part for part in parts_collection}
+        subtree_index = parts_collection.get_subtree_index()
+        assert subtree_index.is_ancestor(parts['1'], parts['1.4.1'])
+        assert not subtree_index.is_ancestor(parts['1.4'], parts['1.3'])
+        assert not subtree_index.is_ancestor(parts['1.4'], parts['1.4'])
+        assert [part.position for part in subtree_index.get_subtree(parts['1.4'])] == ['1.4', '1.4.1']
+        assert [part.position for part in subtree_index.get_descendants(parts['2'])] == []
+        assert subtree_index.get_depth(parts['1.4.1']) == 2
@@ -0,0 +1,116 @@
+import pytest
+
+from conftest import PART_LIST_COLUMNS, PART_LIST_ROWS, create_bom, process_bom
+from web_app.models import DefaultBom, FullFeatureProcessorDirector, ParallelProcessorDirector, PartFlags, \
+    BomXlsxExporter
+
+
+def process_new_bom(director_class=FullFeatureProcessorDirector, **kwargs) -> DefaultBom:
+    """ Processes a new Default Bom with the given Processor Director class. """
+    return process_bom(create_bom(DefaultBom('M-2022-00 Layout', 2)), director_class, **kwargs)
+
+
+class TestFullFeatureProcessorDirector:
+    @pytest.fixture
+    def processed_bom(self):
+        """ Fixture of a Bom processed with all available features. """
+        return process_new_bom()
+
+    def test_linking(self, processed_bom):
+        """ Test whether parents and children are linked by position. """
+        parts = {part.position: part for part in processed_bom.part_list}
+        assert parts['1.1.1'].parent is parts['1.1']
+        assert parts['1'].child == [parts['1.1'], parts['1.2']]
+        assert parts['3'].parent is None
+
+    def test_processed_values(self, empty_bom):
+        """ Test whether quantities to order and types are processed. """
+        processed_bom = process_bom(create_bom(empty_bom))
+        processed = {part.position: (part.to_order, part.type) for part in processed_bom.part_list}
+        assert processed == {
+            '1': (2, 'production'),
+            '1.1': (2, 'purchased'),
+            '1.1.1': (2, 'junk'),
+            '1.2': (4, 'fastener'),
+            '2': (4, 'production'),
+            '2.1': (16, 'production'),
+            '2.2': (32, 'fastener'),
+            '3': (2, 'purchased'),
+        }
+        junk_parts = [part.position for part in processed_bom.part_list if part.flags & PartFlags.JUNK]
+        assert junk_parts == ['1.1.1']
+
+    def test_purchase_list(self, empty_bom):
+        """ Test whether quantities to order are summed up by part number and supplier, split by type. """
+        purchase_list = process_bom(create_bom(empty_bom)).purchase_list
+        assert set(purchase_list) == {'production', 'purchased', 'fastener', 'junk'}
+        fasteners = {item['number']: (item['supplier'], item['to_order'], item['positions'])
+                     for item in purchase_list['fastener']}
+        assert fasteners == {
+            'DIN 912 M6 x 10': ('Norelem', 4, ['1.2']),
+            'DIN 125 - A 6.4': ('Norelem', 32, ['2.2']),
+        }
+
+    def test_purchase_list_sums_repeated_parts(self, empty_bom):
+        """ Test whether a part used in many positions is listed once with a total quantity. """
+        rows = PART_LIST_ROWS + [['2.3', '3', 'DIN 912 M6 x 10', 'Hexagon head screws', 'norelem']]
+        bom = process_bom(create_bom(empty_bom, rows))
+        screws = [item for item in bom.purchase_list['fastener'] if item['number'] == 'DIN 912 M6 x 10']
+        assert len(screws) == 1
+        assert screws[0]['to_order'] == 4 + 12
+        assert screws[0]['positions'] == ['1.2', '2.3']
+
+    def test_where_used(self, processed_bom):
+        """ Test whether occurrences of a part number have ancestor paths and cumulative sets. """
+        occurrences = processed_bom.get_where_used('Some junkie part')
+        assert len(occurrences) == 1
+        assert occurrences[0]['position'] == '1.1.1'
+        assert occurrences[0]['sets'] == 2
+        assert [ancestor['number'] for ancestor in occurrences[0]['path']] == ['M-2022-01-00', '193 138']
+
+    def test_requested_columns_skip_unneeded_steps(self):
+        """ Test whether only steps needed for requested columns are run. """
+        bom = process_new_bom(requested_columns=['Pos.', 'Part number', 'to_order', 'child'])
+        parts = {part.position: part for part in bom.part_list}
+        assert parts['1.2'].to_order == 4
+        assert parts['1'].child == [parts['1.1'], parts['1.2']]
+        assert all(part.is_fastener is None and part.type is None for part in bom.part_list)
+        assert parts['2.2'].Supplier == 'Norelem'
+        assert bom.purchase_list is None
+
+    def test_requested_columns_give_same_values(self, processed_bom, empty_bom):
+        """ Test whether requested columns have the same values as after processing with all features. """
+        fields = ['Supplier', 'type', 'file_type', 'parent_assembly']
+        bom = process_bom(create_bom(empty_bom), requested_columns=fields + ['purchase_list'])
+        assert [[getattr(part, field) for field in fields] for part in bom.part_list] == \
+               [[getattr(part, field) for field in fields] for part in processed_bom.part_list]
+        assert bom.purchase_list == processed_bom.purchase_list
+
+    def test_exporter_required_columns_give_tree_order(self, empty_bom):
+        """ Test whether columns required by the exporter link Parts, so each Part is in the tree order once. """
+        bom = process_bom(create_bom(empty_bom),
+                          requested_columns=['Pos.', 'Part number', 'Qty.'] + BomXlsxExporter.required_columns)
+        assert len(bom.part_list.get_tree_order()) == len(bom.part_list)
+
+    def test_requested_purchase_list_gives_same_values(self, processed_bom, empty_bom):
+        """ Test whether the purchase list alone is grouped by normalized values as after processing all features. """
+        bom = process_bom(create_bom(empty_bom), requested_columns=['Pos.', 'purchase_list'])
+        assert bom.purchase_list == processed_bom.purchase_list
+
+
+class TestParallelProcessorDirector:
+    def test_same_result_as_serial_processing(self):
+        """ Test whether processing subtrees in a process pool gives the same Part list as serial processing. """
+        serial_bom = process_new_bom()
+        parallel_bom = process_new_bom(ParallelProcessorDirector, max_workers=2)
+        fields = PART_LIST_COLUMNS + ['sets', 'to_order', 'type', 'file_type', 'parent_assembly']
+        assert [[getattr(part, field) for field in fields] for part in parallel_bom.part_list] == \
+               [[getattr(part, field) for field in fields] for part in serial_bom.part_list]
+        assert parallel_bom.purchase_list == serial_bom.purchase_list
+
+    def test_links_after_merge(self):
+        """ Test whether merged Parts keep their links within subtrees. """
+        parallel_bom = process_new_bom(ParallelProcessorDirector, max_workers=2)
+        parts = {part.position: part for part in parallel_bom.part_list}
+        assert parts['2.1'].parent is parts['2']
+        assert parts['2'].child == [parts['2.1'], parts['2.2']]
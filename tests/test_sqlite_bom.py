@@ -0,0 +1,127 @@
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from conftest import PART_LIST_COLUMNS, PART_LIST_ROWS, create_bom, process_bom
+from web_app.exceptions import PartListValidationError
+from web_app.models import DefaultBom, BomCsvExporter, BomTypeSheetsXlsxExporter
+
+# Part list with a position sorted between other positions only as a number
+NUMBERED_PART_LIST_ROWS = PART_LIST_ROWS + [['2.10', '1', '193 138', 'Non-return valve GRLA', 'FESTO']]
+
+
+@pytest.fixture
+def processed_boms(bom_manager):
+    """ Fixture of the same part list processed in memory and in SQLite. """
+    return tuple(process_bom(create_bom(bom, NUMBERED_PART_LIST_ROWS))
+                 for bom in (DefaultBom('M-2022-00 Layout', 2), bom_manager.create_bom('M-2022-00 Layout', 2)))
+
+
+def get_tree_rows(bom, *args):
+    """ Returns tree rows with positions of Parts. """
+    return [{**tree_row, 'part': tree_row['part'].position} for tree_row in bom.part_list.iter_tree_rows(*args)]
+
+
+class TestSqliteBom:
+    def test_create_parts(self, bom_manager):
+        """ Test whether Parts are stored in the database and read in the order of creation. """
+        bom = bom_manager.create_bom()
+        parts = bom.create_parts(NUMBERED_PART_LIST_ROWS, PART_LIST_COLUMNS)
+        assert len(parts) == len(bom) == len(NUMBERED_PART_LIST_ROWS)
+        assert parts[1].__dict__['Part number'] == '193 138'
+        assert [[getattr(part, column) for column in PART_LIST_COLUMNS] for part in bom.part_list] == \
+               NUMBERED_PART_LIST_ROWS
+        assert os.path.isfile(bom.database_path)
+
+    def test_processing(self, processed_boms):
+        """ Test whether processing with queries matches processing in memory. """
+        bom, sqlite_bom = processed_boms
+        attributes = ['sets', 'to_order', 'type', 'file_type', 'parent_assembly', 'flags', 'Supplier']
+        assert [[getattr(part, attribute) for attribute in attributes] for part in sqlite_bom.part_list] == \
+               [[getattr(part, attribute) for attribute in attributes] for part in bom.part_list]
+        assert sqlite_bom.purchase_list == bom.purchase_list
+
+    def test_tree_rows(self, processed_boms):
+        """ Test whether tree rows, children and subtree bounds are read from the stored tree order. """
+        bom, sqlite_bom = processed_boms
+        assert get_tree_rows(sqlite_bom) == get_tree_rows(bom)
+        assert [row['part'].position for row in sqlite_bom.part_list.get_tree_children(5)] == ['2.1', '2.10', '2.2']
+        subtree_root = next(part for part in sqlite_bom.part_list if part.position == '2')
+        start, end = sqlite_bom.part_list.get_subtree_bounds(subtree_root)
+        assert [row['part'] for row in get_tree_rows(sqlite_bom, start, end)] == ['2', '2.1', '2.10', '2.2']
+        assert sqlite_bom.part_list.get_max_depth(start, end) == 1
+
+    def test_subtree_index(self, processed_boms):
+        """ Test whether the subtree index built from the stored tree order matches the one built in memory. """
+        bom, sqlite_bom = processed_boms
+        subtree_index = bom.part_list.get_subtree_index()
+        sqlite_subtree_index = sqlite_bom.part_list.get_subtree_index()
+        assert [part.position for part in sqlite_subtree_index.tree_order] == \
+               [part.position for part in subtree_index.tree_order]
+        assert sqlite_subtree_index.depths == subtree_index.depths
+        assert sqlite_subtree_index.exits == subtree_index.exits
+
+    def test_where_used(self, processed_boms):
+        """ Test whether occurrences of the Part number are found with paths of their ancestors. """
+        bom, sqlite_bom = processed_boms
+        assert sqlite_bom.get_where_used('193 138') == bom.get_where_used('193 138')
+        assert [occurrence['path'] for occurrence in sqlite_bom.get_where_used('193 138')] == [
+            [{'position': '1', 'number': 'M-2022-01-00'}],
+            [{'position': '2', 'number': 'M-2022-02-00'}],
+        ]
+
+    def test_decimal_quantities(self, bom_manager):
+        """ Test whether decimal quantities are multiplied exactly. """
+        rows = [['1', Decimal('1.5'), 'A', 'Frame', ''], ['1.1', 3, 'B', 'Profile', ''],
+                ['1.1.1', Decimal('0.25'), 'C', 'Sheet', '']]
+        bom = process_bom(create_bom(bom_manager.create_bom('Layout', 2), rows))
+        assert [(part.quantity, part.to_order) for part in bom.part_list] == \
+               [(Decimal('1.5'), Decimal('3.0')), (3, Decimal('9.0')), (Decimal('0.25'), Decimal('2.250'))]
+
+    def test_validation(self, bom_manager):
+        """ Test whether problems of the part list are found by queries and processing is not started. """
+        bom = bom_manager.create_bom()
+        rows = NUMBERED_PART_LIST_ROWS + [['1.1', 'x', '', 'Duplicate', ''], ['4.1', '1', 'A', 'Orphan', '']]
+        with pytest.raises(PartListValidationError) as e:
+            process_bom(create_bom(bom, rows))
+        assert [(problem['row'], problem['message']) for problem in e.value.problems] == [
+            (2, 'Position "1.1" is not unique.'),
+            (10, 'Part number is empty.'),
+            (10, 'Quantity "x" is not a number.'),
+            (10, 'Position "1.1" is not unique.'),
+            (11, 'Parent of the position "4.1" does not exist.'),
+        ]
+        assert all(part.type is None for part in bom.part_list)
+
+    def test_pickle(self, processed_boms):
+        """ Test whether a pickled Bom opens its database again. """
+        sqlite_bom = pickle.loads(pickle.dumps(processed_boms[1]))
+        assert len(sqlite_bom) == len(NUMBERED_PART_LIST_ROWS)
+        assert sqlite_bom.part_list.get_tree_rows(0, 1)[0]['part'].position == '3'
+
+    @pytest.mark.parametrize('exporter_class', [BomCsvExporter, BomTypeSheetsXlsxExporter])
+    def test_export(self, processed_boms, exporter_class):
+        """ Test whether streamed exports match exports of the Bom processed in memory. """
+        exported_columns = ['Pos.', 'Part number', 'to_order', 'type']
+        exports = [b''.join(exporter_class(bom).stream_part_list(exported_columns, True)) for bom in processed_boms]
+        assert exports[0] == exports[1]
+
+    def test_export_from_another_thread(self, processed_boms):
+        """ Test whether a Bom processed in one thread is exported by another one, e.g. serving a later request. """
+        exported_columns = ['Pos.', 'Part number', 'to_order', 'type']
+        with ThreadPoolExecutor(1) as executor:
+            export = executor.submit(lambda: b''.join(BomCsvExporter(processed_boms[1]).stream_part_list(
+                exported_columns, True))).result()
+        assert export == b''.join(BomCsvExporter(processed_boms[0]).stream_part_list(exported_columns, True))
+
+    def test_reset_and_delete_bom(self, bom_manager):
+        """ Test whether database files of reset and deleted Boms are removed. """
+        bom = bom_manager.create_bom()
+        clean_bom = bom_manager.reset_bom(bom)
+        assert not os.path.exists(bom.database_path)
+        bom_manager.delete_bom(clean_bom)
+        assert not os.path.exists(clean_bom.database_path)
+        assert bom_manager.bom_list == []
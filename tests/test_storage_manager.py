@@ -0,0 +1,57 @@
+import os
+import time
+
+import pytest
+
+from web_app.models import StorageManager
+
+
+def create_file(directory, name, size, age):
+    """ Creates a file of the given size, last used the given number of seconds ago. """
+    path = directory / name
+    path.write_bytes(b'x' * size)
+    used_at = time.time() - age
+    os.utime(path, (used_at, used_at))
+    return str(path)
+
+
+class TestStorageManager:
+    @pytest.fixture
+    def storage_manager(self, tmp_path):
+        """ Fixture of a Storage Manager with a 250 bytes budget and a one hour age limit. """
+        return StorageManager(str(tmp_path), max_bytes=250, max_age=3600, min_age=60)
+
+    def test_evict_expired_files(self, storage_manager, tmp_path):
+        """ Test whether files older than the age limit are evicted. """
+        expired_file = create_file(tmp_path, 'expired.csv', 10, 7200)
+        fresh_file = create_file(tmp_path, 'fresh.csv', 10, 120)
+        assert storage_manager.evict() == [os.path.abspath(expired_file)]
+        assert os.path.exists(fresh_file)
+
+    def test_evict_least_recently_used_files_above_budget(self, storage_manager, tmp_path):
+        """ Test whether the least recently used files are evicted until the folder fits in the byte budget. """
+        oldest_file = create_file(tmp_path, 'oldest.xlsx', 100, 600)
+        older_file = create_file(tmp_path, 'older.xlsx', 100, 500)
+        newer_file = create_file(tmp_path, 'newer.xlsx', 100, 400)
+        storage_manager.touch(oldest_file)
+        assert storage_manager.evict() == [os.path.abspath(older_file)]
+        assert os.path.exists(oldest_file) and os.path.exists(newer_file)
+
+    def test_keep_leased_and_recently_used_files(self, storage_manager, tmp_path):
+        """ Test whether leased files and files used within the minimal age are never evicted. """
+        leased_file = create_file(tmp_path, 'leased.csv', 300, 7200)
+        recent_file = create_file(tmp_path, 'recent.csv', 300, 10)
+        with storage_manager.lease(leased_file):
+            os.utime(leased_file, (time.time() - 7200, time.time() - 7200))
+            assert storage_manager.evict() == []
+        assert storage_manager.evict() == [os.path.abspath(leased_file)]
+        assert os.path.exists(recent_file)
+
+    def test_record_write_evicts_once_per_interval(self, tmp_path):
+        """ Test whether eviction on writes runs at most once per eviction interval. """
+        storage_manager = StorageManager(str(tmp_path), max_age=3600, min_age=0, eviction_interval=0)
+        create_file(tmp_path, 'expired.csv', 10, 7200)
+        assert len(storage_manager.record_write()) == 1
+        storage_manager.eviction_interval = 3600
+        create_file(tmp_path, 'expired.csv', 10, 7200)
+        assert storage_manager.record_write() == []
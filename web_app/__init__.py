@@ -1,13 +1,25 @@
+import importlib
 import os
 
-from flask import Flask
-from flask_session.__init__ import Session
+# Heavy dependencies are imported by the code paths which need them, so scripts and workers which only use
+# the part model start fast. Long-lived processes import them up front with preload().
+PRELOADED_MODULES = ['pandas', 'openpyxl', 'flask', 'flask_session', 'flask_mail']
 
-from config import config
-from .models import DefaultBomManager
+
+def preload(modules=None):
+    """Imports lazily loaded dependencies, e.g. before a long-lived worker starts serving requests."""
+    for module in modules or PRELOADED_MODULES:
+        importlib.import_module(module)
 
 
 def create_app(env=None):
+    from flask import Flask
+    from flask_session.__init__ import Session
+
+    from config import config
+    from .models import BomStore, StorageManager
+
+    preload()
     app = Flask(__name__, instance_relative_config=True)
 
     if not env:
@@ -18,6 +30,19 @@ def create_app(env=None):
 
     Session(app)
 
+    app.extensions['storage_managers'] = {
+        folder: StorageManager(app.config[folder], eviction_interval=app.config['STORAGE_EVICTION_INTERVAL'], **limits)
+        for folder, limits in app.config['STORAGE_LIMITS'].items() if app.config.get(folder)
+    }
+    app.extensions['bom_store'] = BomStore(app.config['BOMS_FOLDER'], app.config['BOM_STORE_SIZE'])
+
+    @app.after_request
+    def evict_sessions(response):
+        session_storage = app.extensions['storage_managers'].get('SESSION_FILE_DIR')
+        if session_storage:
+            session_storage.record_write()
+        return response
+
     from . import views
     app.register_blueprint(views.bp)
 
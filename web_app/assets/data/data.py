@@ -16,7 +16,8 @@ standard_fasteners = {
     'BS': [3692, 3692, 3692, 3692, 3692, 3692, 3692, 3692, 3692, 4168, 4168, 4168, 4174, 4183, 4183, 4183]
 }
 
-part_position_keywords = ['poz.', 'pos.', 'pozycja']
-part_quantity_keywords = ['szt.', 'sztuk', 'ilość']
-part_number_keywords = ['numer', 'nr części']
-part_name_keywords = ['opis', 'nazwa']
+part_position_keywords = ['poz.', 'pos.', 'pozycja', 'position', 'item']
+part_quantity_keywords = ['szt.', 'sztuk', 'ilość', 'qty', 'quantity']
+part_number_keywords = ['numer', 'nr części', 'part number', 'part no']
+part_name_keywords = ['opis', 'nazwa', 'name', 'description']
+part_supplier_keywords = ['dostawca', 'producent', 'supplier', 'manufacturer', 'vendor']
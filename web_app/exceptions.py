@@ -39,3 +39,26 @@ class DelimiterNotUnique(Exception):
                    f'\n{part}\n' \
                    f'Current set delimiter: "{current_set_delimiter}"'
         super().__init__(self.msg)
+
+
+class MergedColumnNotFound(Exception):
+    def __init__(self, column_name, source_name):
+        self.column_name = column_name
+        self.source_name = source_name
+        self.msg = f'Column "{column_name}" was not found in the merged part list "{source_name}".'
+        super().__init__(self.msg)
+
+
+class MergedPositionConflict(Exception):
+    def __init__(self, position, source_name):
+        self.position = position
+        self.source_name = source_name
+        self.msg = f'Position "{position}" of the merged part list "{source_name}" is already taken by another part.'
+        super().__init__(self.msg)
+
+
+class PartListValidationError(Exception):
+    def __init__(self, problems):
+        self.problems = problems
+        self.msg = f'Found {len(problems)} problems in the part list.'
+        super().__init__(self.msg)
@@ -1,14 +1,50 @@
-from .functions import normalize_string
-from .part_list_exporter import get_first_imported_file
-from .processor_director import prepare_and_finish_processing
+from .functions import normalize_string, normalize_strings, normalize_series
+from .part_list_exporter import get_first_imported_file, format_column_name, get_cell_value, get_export_content_key
+from .part_list_importer import get_csv_columns_count, read_head_and_tail, decode_sample, find_keyword_column, \
+    get_file_digest, get_source_digest, get_row_digest, get_workbook_buffer, get_cell_text, parse_quantity, \
+    parse_quantities
+from .processor_director import prepare_and_finish_processing, split_into_subtrees, group_into_batches, \
+    resolve_processing_steps
+from .sqlite_bom import get_stored_value, get_stored_quantity, get_loaded_quantity, multiply_quantities, \
+    get_parent_position, get_position_delimiter_count, get_position_key
 
 __all__ = [
     # processor_director
     'prepare_and_finish_processing',
+    'split_into_subtrees',
+    'group_into_batches',
+    'resolve_processing_steps',
 
     # functions
     'normalize_string',
+    'normalize_strings',
+    'normalize_series',
 
     # part_list_exporter
     'get_first_imported_file',
+    'format_column_name',
+    'get_cell_value',
+    'get_export_content_key',
+
+    # part_list_importer
+    'get_csv_columns_count',
+    'read_head_and_tail',
+    'decode_sample',
+    'find_keyword_column',
+    'get_file_digest',
+    'get_source_digest',
+    'get_row_digest',
+    'get_workbook_buffer',
+    'get_cell_text',
+    'parse_quantity',
+    'parse_quantities',
+
+    # sqlite_bom
+    'get_stored_value',
+    'get_stored_quantity',
+    'get_loaded_quantity',
+    'multiply_quantities',
+    'get_parent_position',
+    'get_position_delimiter_count',
+    'get_position_key',
 ]
@@ -1,20 +1,50 @@
 from __future__ import annotations
 
 import re
-from functools import wraps
-from typing import Union, TYPE_CHECKING
+from functools import lru_cache, wraps
+from typing import Callable, Optional, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    import pandas as pd
+
     from web_app.models import AbstractPart
 
 
+NON_WORD_CHARACTERS = re.compile(r"[^\w\s]")
+WHITESPACES = re.compile(r"\s+")
+
+
 def normalize_string(s):
-    string = re.sub(r"[^\w\s]", ' ', s)
-    string = re.sub(r"\s+", ' ', string)
+    string = NON_WORD_CHARACTERS.sub(' ', s)
+    string = WHITESPACES.sub(' ', string)
     normalized_string = string.title().strip()
     return normalized_string
 
 
+@lru_cache(maxsize=4096)
+def normalize_string_cached(s: str) -> str:
+    """Returns a normalized string, remembering recently normalized values."""
+    return normalize_string(s)
+
+
+def normalize_strings(values: list[str]) -> list[str]:
+    """Returns normalized values of a column, normalizing each distinct value once."""
+    normalized_values = {value: normalize_string_cached(value) for value in set(values)}
+    return [normalized_values[value] for value in values]
+
+
+def normalize_series(series: pd.Series) -> pd.Series:
+    """Returns a normalized column of a DataFrame, normalizing each distinct value once with vectorized operations."""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(series)
+    normalized_uniques = pd.Series(list(uniques) + [None], dtype=object) \
+        .str.replace(NON_WORD_CHARACTERS, ' ', regex=True).str.replace(WHITESPACES, ' ', regex=True) \
+        .str.title().str.strip()
+    # Missing values are factorized as -1, which takes the trailing None
+    return pd.Series(normalized_uniques.to_numpy()[codes], index=series.index, name=series.name)
+
+
 def get_number_delimiter(string: str) -> list[str]:
     """Returns all delimiters between numbers."""
     clean_string = string.strip()
@@ -40,17 +70,58 @@ def part_modifier(f):
         self.processor.processing_succeeded = False
         for part in self.processor.processed_part_list:
             f(self, part, *args, **kwargs)
+        self.processor.processed_part_list.invalidate_tree_order()
         self.processor.processing_succeeded = True
 
     return wrapper
 
 
-def type_sorter(part):
-    parts_order = "pfjabcdeghiklmnoqrstuvwxyz"  # for ordering parts as: "production, purchased, fastener, junk"
-    return [parts_order.index(c) for c in part.type]
+def part_list_modifier(f):
+    """ Runs processing function once for the whole part list """
+
+    @wraps(f)
+    def wrapper(self, *args, **kwargs):
+        self.processor.processing_succeeded = False
+        f(self, self.processor.processed_part_list, *args, **kwargs)
+        self.processor.processed_part_list.invalidate_tree_order()
+        self.processor.processing_succeeded = True
+
+    return wrapper
+
+
+def processing_step(provides: Union[list[str], Callable], requires: Union[list[str], Callable, None] = None):
+    """ Declares Part attributes set by a processing function and attributes it depends on, or callables of the
+    processor returning them """
+
+    def decorator(f):
+        f.provides = provides
+        f.requires = requires or []
+        return f
+
+    return decorator
+
+
+PART_TYPES_ORDER = ['production', 'purchased', 'fastener', 'junk']
+
+
+def get_natural_sort_key(string: str) -> tuple:
+    """Returns a key for sorting strings with numbers in natural order, e.g. '1.2' before '1.10'."""
+    return tuple((0, int(chunk), '') if chunk.isdigit() else (1, 0, chunk) for chunk in re.split(r'(\d+)', string)
+                 if chunk)
+
+
+def get_type_rank(part_type: Optional[str]) -> int:
+    """Returns the rank for ordering parts as: "production, purchased, fastener, junk", unknown types last."""
+    return PART_TYPES_ORDER.index(part_type) if part_type in PART_TYPES_ORDER else len(PART_TYPES_ORDER)
+
+
+def get_part_sort_key(part: AbstractPart) -> tuple:
+    """Returns a composite key for sorting Parts by 'Type', 'Number' and natural 'Position'."""
+    return get_type_rank(part.type), part.number, get_natural_sort_key(part.position)
 
 
-def sort_by_type_and_number(part_list: list[AbstractPart]):
-    """Returns a list of Parts sorted by 'Type' and 'Number'."""
-    sorted_part_list = sorted(part_list, key=lambda part: (type_sorter(part), part.number), reverse=True)
-    return sorted_part_list
+def sort_by_type_and_number(part_list: list[AbstractPart], sort_keys: Optional[dict[int, tuple]] = None):
+    """Returns a list of Parts sorted by 'Type', 'Number' and 'Position', reusing precomputed sort keys."""
+    if sort_keys is None:
+        return sorted(part_list, key=get_part_sort_key)
+    return sorted(part_list, key=lambda part: sort_keys[id(part)])
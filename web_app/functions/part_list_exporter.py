@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional, TYPE_CHECKING
+import hashlib
+import json
+from decimal import Decimal
+from typing import Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ..models import AbstractBom
@@ -11,3 +14,21 @@ def get_first_imported_file(bom: AbstractBom) -> Optional[str]:
     file_imports = [source for source in bom.imported_bom_sources if 'file' in source['type']]
     first_imported_file = file_imports[0]['name'] if file_imports else None
     return first_imported_file
+
+
+def format_column_name(column: str) -> str:
+    """Returns the column name as shown in exported files."""
+    return column.replace('_', ' ').capitalize()
+
+
+def get_cell_value(value: Any) -> Any:
+    """Returns the value as written to a spreadsheet cell, values of other types, e.g. linked Parts, as text."""
+    if value is None or isinstance(value, (str, int, float, Decimal)):
+        return value
+    return str(value)
+
+
+def get_export_content_key(source_digest: str, settings: dict) -> str:
+    """Returns a key of the exported content, built from the imported file digest and processing settings."""
+    content = json.dumps([source_digest, settings], sort_keys=True, default=str)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
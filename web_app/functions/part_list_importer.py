@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import os
+import re
+from decimal import Decimal
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from web_app.typing import PartListSource
+
+INTEGER_QUANTITY = r'[+-]?\d+'
+DECIMAL_QUANTITY = r'[+-]?\d*\.\d+'
+
+
+def get_csv_columns_count(buffer: str | io.IOBase, encoding: str, delimiter: str = ',') -> int:
+    """Returns the number of columns in the first row of a csv source without moving the read position."""
+    if isinstance(buffer, str):
+        with open(buffer, 'rb') as file:
+            first_line = file.readline()
+    else:
+        position = buffer.tell()
+        first_line = buffer.readline()
+        buffer.seek(position)
+    first_row = next(csv.reader([first_line.decode(encoding)], delimiter=delimiter, skipinitialspace=True), [])
+    return len(first_row)
+
+
+def read_head_and_tail(buffer: str | bytes | io.IOBase, sample_size: int) -> tuple[bytes, bytes]:
+    """Returns complete lines from the beginning and the end of a source, reading at most sample_size bytes of each."""
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        data = bytes(buffer)
+        size = len(data)
+        head, tail = data[:sample_size], data[max(size - sample_size, 0):]
+    elif isinstance(buffer, str):
+        with open(buffer, 'rb') as file:
+            return read_head_and_tail(file, sample_size)
+    else:
+        position = buffer.tell()
+        size = buffer.seek(0, os.SEEK_END)
+        buffer.seek(0)
+        head = buffer.read(sample_size)
+        buffer.seek(max(size - sample_size, 0))
+        tail = buffer.read(sample_size)
+        buffer.seek(position)
+
+    if size > sample_size:
+        head = head.rsplit(b'\n', 1)[0]
+        tail = tail.split(b'\n', 1)[-1]
+    return head.strip(), tail.strip()
+
+
+def decode_sample(sample: bytes, encodings: list[str]) -> tuple[str, str]:
+    """Returns the decoded sample and the first encoding able to decode it."""
+    for encoding in encodings:
+        try:
+            return sample.decode(encoding), encoding
+        except UnicodeDecodeError:
+            continue
+    return sample.decode(encodings[-1], errors='replace'), encodings[-1]
+
+
+def find_keyword_column(columns: list[str], keywords: list[str], excluded: Optional[list[str]] = None) -> Optional[str]:
+    """Returns the first column name matching any of the keywords, preferring exact matches."""
+    excluded = excluded or []
+    candidates = [column for column in columns if column and column not in excluded]
+    for column in candidates:
+        if column.strip().lower() in keywords:
+            return column
+    for column in candidates:
+        if any(keyword in column.lower() for keyword in keywords):
+            return column
+    return None
+
+
+def get_file_digest(filepath: str, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the sha256 digest of the file content."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_source_digest(source: PartListSource) -> str:
+    """Returns the sha256 digest of a part list source: a file path, raw bytes or a seekable binary stream."""
+    if isinstance(source, str):
+        return get_file_digest(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    position = source.tell()
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+        digest.update(chunk)
+    source.seek(position)
+    return digest.hexdigest()
+
+
+def get_row_digest(columns: list[str], row: list) -> bytes:
+    """Returns a short digest of the row content, including names of its columns."""
+    return hashlib.blake2b(repr((columns, row)).encode('utf-8'), digest_size=16).digest()
+
+
+def get_workbook_buffer(source: PartListSource) -> str | io.IOBase:
+    """Returns the source in a form accepted by the workbook reader."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def get_cell_text(value) -> str:
+    """Returns the value of a spreadsheet cell as text, as read from csv files. Whole numbers have no decimals."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_quantity(value):
+    """Returns the quantity of a spreadsheet cell, parsed as by parse_quantities. Other values are kept as text."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else Decimal(str(value))
+    cleaned_value = get_cell_text(value).strip().replace(',', '.')
+    if re.fullmatch(INTEGER_QUANTITY, cleaned_value):
+        return int(cleaned_value)
+    if re.fullmatch(DECIMAL_QUANTITY, cleaned_value):
+        return Decimal(cleaned_value)
+    return get_cell_text(value)
+
+
+def parse_quantities(values: pd.Series) -> pd.Series:
+    """
+    Returns quantities parsed to integers, or to decimals for cut lengths, e.g. '2,5'.
+    Values which are not numbers are kept unchanged.
+    """
+    import pandas as pd
+
+    cleaned_values = values.astype(str).str.strip().str.replace(',', '.', regex=False)
+    is_integer = cleaned_values.str.fullmatch(INTEGER_QUANTITY)
+    is_decimal = cleaned_values.str.fullmatch(DECIMAL_QUANTITY)
+    parsed_values = values.astype(object)
+    parsed_values[is_integer] = pd.Series([int(value) for value in cleaned_values[is_integer]],
+                                          index=cleaned_values.index[is_integer], dtype=object)
+    parsed_values[is_decimal] = pd.Series([Decimal(value) for value in cleaned_values[is_decimal]],
+                                          index=cleaned_values.index[is_decimal], dtype=object)
+    return parsed_values
@@ -1,13 +1,77 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
 from functools import wraps
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart, ProcessorMethods
 
 
 def prepare_and_finish_processing(f):
-    """Processing decorator to prepare initial data and update BOM with processed Part list."""
+    """Processing decorator to validate and prepare initial data and update BOM with processed Part list."""
 
     @wraps(f)
     def wrapper(self, *args, **kwargs):
+        self.processor.validate_part_list()
         self.processor.run_initialization()
         f(self, *args, **kwargs)
         self.processor.finish_processing()
 
     return wrapper
+
+
+def split_into_subtrees(part_list: list[AbstractPart]) -> list[list[int]]:
+    """Returns indexes of linked Parts grouped by top-level subtrees, in the order of the part list."""
+    part_indexes = {id(part): index for index, part in enumerate(part_list)}
+    visited_indexes = set()
+    subtrees = []
+    for part in part_list:
+        if part.parent:
+            continue
+        subtree = []
+        stack = [part]
+        while stack:
+            current_part = stack.pop()
+            index = part_indexes[id(current_part)]
+            if index in visited_indexes:
+                continue
+            visited_indexes.add(index)
+            subtree.append(index)
+            stack.extend(current_part.child or [])
+        subtrees.append(sorted(subtree))
+    return subtrees
+
+
+def group_into_batches(subtrees: list[list[int]], batch_count: int) -> list[list[int]]:
+    """Returns subtrees grouped into batches of a similar size, starting with the largest subtrees."""
+    batches = [[] for _ in range(min(batch_count, len(subtrees)))]
+    for subtree in sorted(subtrees, key=len, reverse=True):
+        lightest_batch = min(batches, key=len)
+        lightest_batch.extend(subtree)
+    return [sorted(batch) for batch in batches]
+
+
+def resolve_processing_steps(bom_modifiers: ProcessorMethods, steps: list[str],
+                             requested_columns: Iterable[str]) -> list[str]:
+    """
+    Returns the steps needed to produce requested columns, in the original order of steps.
+    Steps without declared dependencies are always kept.
+    """
+    needed_columns = set(requested_columns)
+    resolved_steps = []
+    for step in reversed(steps):
+        method = getattr(bom_modifiers, step)
+        provides = getattr(method, 'provides', None)
+        if provides is None:
+            resolved_steps.append(step)
+            continue
+        if callable(provides):
+            provides = provides(bom_modifiers.processor)
+        if needed_columns.intersection(provides):
+            resolved_steps.append(step)
+            requires = method.requires
+            if callable(requires):
+                requires = requires(bom_modifiers.processor)
+            needed_columns.update(requires)
+    return resolved_steps[::-1]
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Optional
+
+from .functions import get_number_delimiter, get_natural_sort_key
+from .part_list_importer import parse_quantity
+
+
+def get_stored_value(value: Any) -> Any:
+    """Returns the Part attribute value as stored in SQLite, decimals as text."""
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def get_stored_quantity(value: Any) -> int | str | None:
+    """
+    Returns the quantity as stored in SQLite, parsed as by parse_quantity. Decimals are stored as text,
+    values which are not numbers as NULL.
+    """
+    if value is None:
+        return None
+    quantity = parse_quantity(value)
+    if isinstance(quantity, int):
+        return quantity
+    if isinstance(quantity, Decimal):
+        return str(quantity)
+    return None
+
+
+def get_loaded_quantity(value: Any) -> Any:
+    """Returns the quantity read from SQLite, decimals stored as text as decimals."""
+    return Decimal(value) if isinstance(value, str) else value
+
+
+def multiply_quantities(multiplicand: Any, multiplier: Any) -> int | str | None:
+    """Returns the product of quantities stored in SQLite, exact for decimals stored as text."""
+    if multiplicand is None or multiplier is None:
+        return None
+    if isinstance(multiplicand, int) and isinstance(multiplier, int):
+        return multiplicand * multiplier
+    return str(Decimal(str(multiplicand)) * Decimal(str(multiplier)))
+
+
+def get_parent_position(position: Any) -> Optional[str]:
+    """
+    Returns the position of the parent Part, as AbstractPart.parent_id does. Top-level positions
+    and positions with more than one kind of delimiter have no parent position.
+    """
+    if position is None:
+        return None
+    position = str(position)
+    delimiters = get_number_delimiter(position)
+    if len(delimiters) != 1:
+        return None
+    return delimiters[0].join(position.split(delimiters[0])[:-1])
+
+
+def get_position_delimiter_count(position: Any) -> int:
+    """Returns the number of different delimiters between numbers of the position."""
+    return len(get_number_delimiter(str(position))) if position is not None else 0
+
+
+def get_position_key(position: Any) -> Optional[str]:
+    """
+    Returns a text which sorts as the natural sort key of the position, so SQLite orders positions naturally
+    by comparing texts. Numbers are prefixed with their length, other chunks are terminated.
+    """
+    if position is None:
+        return None
+    chunks = []
+    for is_text, number, text in get_natural_sort_key(str(position)):
+        if is_text:
+            chunks.append(f'1{text}\x01')
+        else:
+            digits = str(number)
+            chunks.append(f'0{len(digits):03d}{digits}')
+    return ''.join(chunks)
@@ -1,40 +1,107 @@
-from .bom import AbstractBom, DefaultBom
-from .bom_manager import AbstractBomManager, DefaultBomManager
-from .bom_processor import BomProcessor
+from .bom import AbstractBom, DefaultBom, SqliteBom
+from .bom_manager import AbstractBomManager, DefaultBomManager, SqliteBomManager
+from .bom_processor import BomProcessor, SqliteBomProcessor
 from .bom_processor_methods import ProcessorMethods
+from .bom_store import BomStore
 from .part import AbstractPart, DefaultPart
-from .part_list_exporter import AbstractBomExporter, BomXlsxExporter
-from .part_list_importer import AbstractPartListImporter, PartListCsvImporter
-from .processor_director import AbstractProcessorDirector, FullFeatureProcessorDirector
+from .part_column_schema import PartColumnSchema
+from .part_flags import PartFlags
+from .part_list_exporter import AbstractBomExporter, BomXlsxExporter, BomTypeSheetsXlsxExporter, BomCsvExporter, \
+    BomDiffXlsxExporter
+from .part_list_importer import AbstractPartListImporter, PartListCsvImporter, PartListXlsxImporter
+from .part_list_merger import PartListMerger
+from .part_list_validator import PartListValidator, SqlitePartListValidator
+from .part_list_sniffer import AbstractPartListSniffer, PartListCsvSniffer, PartListXlsxSniffer
+from .part_catalogue import PartCatalogue
+from .bom_diff import BomDiff
+from .sqlite_bom_processor_methods import SqliteProcessorMethods
+from .sqlite_parts_collection import SqlitePartsCollection, SqlitePartsView
+from .processor_director import AbstractProcessorDirector, FullFeatureProcessorDirector, ParallelProcessorDirector
+from .storage_manager import StorageManager
+from .subtree_index import SubtreeIndex
+from .value_dictionary import ValueDictionary
+from .where_used_index import WhereUsedIndex
 
 __all__ = [
     # BOM
     'AbstractBom',
     'DefaultBom',
+    'SqliteBom',
     # BOM Manager
 
     'AbstractBomManager',
     'DefaultBomManager',
+    'SqliteBomManager',
 
     # BOM Processor
     'BomProcessor',
+    'SqliteBomProcessor',
 
     # BOM Processor methods
     'ProcessorMethods',
+    'SqliteProcessorMethods',
+
+    # BOM store
+    'BomStore',
 
     # Part
     'AbstractPart',
     'DefaultPart',
 
+    # Part column schema
+    'PartColumnSchema',
+
+    # Part flags
+    'PartFlags',
+
     # BOM Exporter
     'AbstractBomExporter',
     'BomXlsxExporter',
+    'BomTypeSheetsXlsxExporter',
+    'BomCsvExporter',
+    'BomDiffXlsxExporter',
 
     # BOM Importer
     'AbstractPartListImporter',
     'PartListCsvImporter',
+    'PartListXlsxImporter',
+
+    # BOM Merger
+    'PartListMerger',
+
+    # BOM Validator
+    'PartListValidator',
+    'SqlitePartListValidator',
+
+    # BOM Sniffer
+    'AbstractPartListSniffer',
+    'PartListCsvSniffer',
+    'PartListXlsxSniffer',
+
+    # BOM revision diff
+    'BomDiff',
+
+    # Part catalogue
+    'PartCatalogue',
 
     # BOM Processor Director
     'AbstractProcessorDirector',
     'FullFeatureProcessorDirector',
+    'ParallelProcessorDirector',
+
+    # SQLite Parts collection
+    'SqlitePartsCollection',
+    'SqlitePartsView',
+
+    # Storage manager
+    'StorageManager',
+
+    # Subtree index
+    'SubtreeIndex',
+
+    # Value dictionary
+    'ValueDictionary',
+
+    # Where-used index
+    'WhereUsedIndex',
 ]
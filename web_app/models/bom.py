@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-
-import pandas as pd
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Optional
 
 from web_app.exceptions import InvalidPartSetsValue, ObjectNotFound, AttrNotSetException
 from web_app.models.part import AbstractPart, DefaultPart
+from web_app.models.part_column_schema import PartColumnSchema
 from web_app.models.parts_collection import PartsCollection
-from web_app.typing import ImportedBomSource, BomClassTypes
+from web_app.models.sqlite_parts_collection import SqlitePartsCollection, SqlitePartsView
+from web_app.models.value_dictionary import ValueDictionary
+from web_app.models.where_used_index import WhereUsedIndex
+from web_app.typing import ImportedBomSource, BomClassTypes, PartOccurrence, PartTypes, PurchaseListItem
 
 
 class AbstractBom(ABC):
@@ -15,9 +19,13 @@ class AbstractBom(ABC):
     bom_type: BomClassTypes = None
 
     def __init__(self, main_assembly_name: str = '', main_assembly_sets: int = 0):
+        self.where_used: WhereUsedIndex = WhereUsedIndex()
+        self.value_dictionary: ValueDictionary = ValueDictionary()
+        self.column_schema: PartColumnSchema = PartColumnSchema()
         self.part_list: PartsCollection = PartsCollection()
         self.imported_bom_sources: list[ImportedBomSource] = []
         self.imported_bom_columns: list[str] = []
+        self.purchase_list: dict[PartTypes, list[PurchaseListItem]] | None = None
         self._main_assembly_sets: int = main_assembly_sets
         self.main_assembly_name: str = main_assembly_name
 
@@ -30,6 +38,17 @@ class AbstractBom(ABC):
     def __len__(self):
         return len(self.part_list)
 
+    @property
+    def part_list(self) -> PartsCollection:
+        """Getter for the Part list of the BOM."""
+        return self._part_list
+
+    @part_list.setter
+    def part_list(self, part_list: PartsCollection) -> None:
+        """Setter for the Part list of the BOM. Rebuilds the where-used index."""
+        self._part_list = part_list
+        self.where_used = WhereUsedIndex(part_list)
+
     @property
     def main_assembly_sets(self) -> int:
         """Getter for sets of the top-level assembly."""
@@ -51,17 +70,34 @@ class AbstractBom(ABC):
         """Creates a new part within Bill of Materials."""
         ...
 
+    @abstractmethod
+    def create_parts(self, rows: Iterable[Sequence] | Mapping[str, Sequence],
+                     columns: Optional[Sequence[str]] = None) -> list[AbstractPart]:
+        """Creates new parts within Bill of Materials from rows sharing the same columns or from columnar data."""
+        ...
+
     def delete_part(self, part: AbstractPart) -> None:
         """Deletes an existing part from Bill of Materials."""
         if part not in self.part_list:
             raise ObjectNotFound(part, self)
         else:
-            self.part_list = [item for item in self.part_list if item is not part]
+            self._part_list = PartsCollection([item for item in self.part_list if item is not part])
+            self.where_used.remove_part(part)
 
     def delete_all_parts(self) -> None:
         """Deletes all existing parts from Bill of Materials."""
         self.part_list = PartsCollection()
 
+    def set_part_columns(self, **columns: str) -> None:
+        """Maps Part attributes of all Parts, e.g. 'position_column', to part list columns at once."""
+        self.column_schema.set_columns(**columns)
+        self.where_used.reindex(self.part_list)
+        self.part_list.invalidate_tree_order()
+
+    def get_where_used(self, number: str) -> list[PartOccurrence]:
+        """Returns every occurrence of the 'Part number' within Bill of Materials."""
+        return self.where_used.get_occurrences(number)
+
     def get_part_count(self) -> int:
         """Returns the quantity of parts in Bill of Materials"""
         part_count = len(self.part_list)
@@ -69,6 +105,8 @@ class AbstractBom(ABC):
 
     def print_part_list(self) -> None:
         """Prints a list of Parts in the Bill of Materials"""
+        import pandas as pd
+
         part_list = [part.__dict__ for part in self.part_list]
         df = pd.DataFrame(part_list)
         pd.set_option('display.max_rows', 100)
@@ -79,6 +117,8 @@ class AbstractBom(ABC):
 
     def print_tree_part_list(self) -> None:
         """Prints a tree list of Parts in the Bill of Materials."""
+        import pandas as pd
+
         part_list = [part.__dict__ for part in self.part_list.get_tree_part_list()]
         df = pd.DataFrame(part_list)
         pd.set_option('display.max_rows', 100)
@@ -97,6 +137,95 @@ class DefaultBom(AbstractBom):
 
     def create_part(self, **kwargs) -> DefaultPart:
         """Creates a new Default Part within Bill of Materials."""
-        part = DefaultPart(**kwargs)
+        part = DefaultPart(_column_schema=self.column_schema, **kwargs)
         self.part_list.add_part(part)
+        self.where_used.add_part(part)
         return part
+
+    def create_parts(self, rows: Iterable[Sequence] | Mapping[str, Sequence],
+                     columns: Optional[Sequence[str]] = None) -> list[DefaultPart]:
+        """Creates new Default Parts within Bill of Materials from rows or columnar data."""
+        if isinstance(rows, Mapping):
+            rows = self.value_dictionary.encode_columns(rows)
+        else:
+            rows = self.value_dictionary.encode_rows(rows if isinstance(rows, Sequence) else list(rows), columns)
+        parts = DefaultPart.from_rows(rows, columns, self.column_schema)
+        self.part_list.add_parts(parts)
+        self.where_used.add_parts(parts)
+        return parts
+
+
+class SqliteBom(AbstractBom):
+    """
+    Class for the Bill of Materials which Parts are stored in a local SQLite database, for BOMs too large
+    to keep every Part in memory. Parts are processed by SqliteBomProcessor and read in batches when iterated.
+    """
+    bom_type: BomClassTypes = 'sqlite'
+
+    def __init__(self, database_path: str, main_assembly_name: str = '', main_assembly_sets: int = 0):
+        super().__init__(main_assembly_name, main_assembly_sets)
+        self.part_list = SqlitePartsCollection(database_path, self.column_schema, DefaultPart)
+
+    @property
+    def database_path(self) -> str:
+        """Returns the path of the database file storing Parts."""
+        return self.part_list.database_path
+
+    @property
+    def part_list(self) -> SqlitePartsCollection:
+        """Getter for the Part list of the BOM."""
+        return self._part_list
+
+    @part_list.setter
+    def part_list(self, part_list: SqlitePartsCollection) -> None:
+        """Setter for the Part list of the BOM. Parts are looked up by indexed queries instead of in-memory indexes."""
+        self._part_list = part_list
+
+    def create_part(self, **kwargs) -> DefaultPart:
+        """Stores a new Default Part within Bill of Materials."""
+        return self.create_parts([list(kwargs.values())], list(kwargs))[0]
+
+    def create_parts(self, rows: Iterable[Sequence] | Mapping[str, Sequence],
+                     columns: Optional[Sequence[str]] = None) -> SqlitePartsView:
+        """Stores new Default Parts within Bill of Materials from rows or columnar data, in a single transaction."""
+        if isinstance(rows, Mapping):
+            columns = list(rows.keys())
+            rows = zip(*rows.values())
+        return self.part_list.add_rows(rows, columns)
+
+    def delete_part(self, part: AbstractPart) -> None:
+        """Deletes an existing part from Bill of Materials."""
+        try:
+            self.part_list.delete_part(part)
+        except ObjectNotFound as e:
+            raise ObjectNotFound(part, self) from e
+
+    def delete_all_parts(self) -> None:
+        """Deletes all existing parts from Bill of Materials."""
+        self.part_list.delete_all_parts()
+
+    def set_part_columns(self, **columns: str) -> None:
+        """Maps Part attributes of all Parts, e.g. 'position_column', to part list columns and indexes them."""
+        self.column_schema.set_columns(**columns)
+        self.part_list.index_part_columns()
+        self.part_list.commit()
+
+    def get_where_used(self, number: str) -> list[PartOccurrence]:
+        """Returns every occurrence of the 'Part number' within Bill of Materials, with ancestors found by a query."""
+        number_column = self.part_list.get_part_column('number_column')
+        position_column = self.part_list.get_part_column('position_column')
+        parts = [part for _, part in self.part_list.select_parts(f'FROM parts WHERE {number_column} = ? ORDER BY id',
+                                                                 (number,))]
+        paths = {part._part_id: [] for part in parts}
+        for part_id, position, ancestor_number in self.part_list.execute(f"""
+                WITH RECURSIVE ancestors (part_id, ancestor_id, depth) AS (
+                    SELECT id, parent_id, 1 FROM parts WHERE {number_column} = ? AND parent_id IS NOT NULL
+                    UNION ALL
+                    SELECT ancestors.part_id, parent_id, depth + 1 FROM ancestors
+                    JOIN parts ON id = ancestor_id WHERE parent_id IS NOT NULL
+                )
+                SELECT part_id, {position_column}, {number_column} FROM ancestors JOIN parts ON id = ancestor_id
+                ORDER BY part_id, depth DESC""", (number,)):
+            paths[part_id].append({'position': position, 'number': ancestor_number})
+        return [{'position': part.position, 'quantity': part.quantity, 'sets': part.sets, 'to_order': part.to_order,
+                 'type': part.type, 'path': paths[part._part_id]} for part in parts]
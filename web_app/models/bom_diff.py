@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from collections import deque
+
+from web_app.exceptions import AttrNotSetException
+from web_app.models.bom import AbstractBom, DefaultBom
+from web_app.models.part import AbstractPart
+from web_app.models.part_list_importer import PartListCsvImporter
+from web_app.typing import BomChange, HeaderPositions, PartListSource, ToOrderChange
+
+
+class BomDiff:
+    """
+    Class for comparing two revisions of a Bill of Materials in linear time.
+    Parts are matched by 'Position' first and then by 'Part number', so a Part found at another position is
+    reported as moved. Changes of the total quantity to order are propagated through the tree of each revision.
+    """
+
+    def __init__(self, old_bom: AbstractBom, new_bom: AbstractBom):
+        self.old_bom: AbstractBom = old_bom
+        self.new_bom: AbstractBom = new_bom
+        self.changes: list[BomChange] = self._compare_parts()
+        self.to_order_changes: list[ToOrderChange] = self._compare_to_order()
+
+    def __len__(self):
+        return len(self.changes)
+
+    @classmethod
+    def from_csv(cls, old_source: PartListSource, new_source: PartListSource, part_columns: dict[str, str],
+                 header_position: HeaderPositions = 'top', main_assembly_sets: int = 1) -> BomDiff:
+        """Compares two csv part lists. Part columns map Part attributes, e.g. 'position_column', to column names."""
+        boms = []
+        for source in (old_source, new_source):
+            bom = DefaultBom(main_assembly_sets=main_assembly_sets)
+            PartListCsvImporter(source, header_position,
+                                quantity_column=part_columns.get('quantity_column')).import_to(bom)
+            bom.set_part_columns(**part_columns)
+            boms.append(bom)
+        return cls(*boms)
+
+    def _compare_parts(self) -> list[BomChange]:
+        """Returns added, removed, moved and quantity-changed Parts."""
+        old_parts_by_position = {}
+        for part in self.old_bom.part_list:
+            old_parts_by_position.setdefault(part.position, part)
+
+        changes = []
+        unmatched_new_parts = []
+        matched_old_parts = set()
+        for part in self.new_bom.part_list:
+            old_part = old_parts_by_position.get(part.position)
+            if old_part is not None and id(old_part) not in matched_old_parts and old_part.number == part.number:
+                matched_old_parts.add(id(old_part))
+                if old_part.quantity != part.quantity:
+                    changes.append(self._get_change('quantity_changed', old_part, part))
+            else:
+                unmatched_new_parts.append(part)
+
+        unmatched_old_parts_by_number: dict[str, deque[AbstractPart]] = {}
+        for part in self.old_bom.part_list:
+            if id(part) not in matched_old_parts:
+                unmatched_old_parts_by_number.setdefault(part.number, deque()).append(part)
+
+        for part in unmatched_new_parts:
+            old_parts = unmatched_old_parts_by_number.get(part.number)
+            if old_parts:
+                changes.append(self._get_change('moved', old_parts.popleft(), part))
+            else:
+                changes.append(self._get_change('added', None, part))
+
+        for old_parts in unmatched_old_parts_by_number.values():
+            for old_part in old_parts:
+                changes.append(self._get_change('removed', old_part, None))
+        return changes
+
+    def _compare_to_order(self) -> list[ToOrderChange]:
+        """Returns 'Part numbers' which total quantity to order changed, including changes of their ancestors."""
+        old_to_order = get_total_to_order(self.old_bom)
+        new_to_order = get_total_to_order(self.new_bom)
+        to_order_changes = []
+        for number in {**old_to_order, **new_to_order}:
+            old_value, new_value = old_to_order.get(number, 0), new_to_order.get(number, 0)
+            if old_value != new_value:
+                to_order_changes.append({
+                    'number': number,
+                    'old_to_order': old_value,
+                    'new_to_order': new_value,
+                    'difference': new_value - old_value,
+                })
+        return to_order_changes
+
+    @staticmethod
+    def _get_change(change: str, old_part: AbstractPart | None, new_part: AbstractPart | None) -> BomChange:
+        """Returns the representation of a single change."""
+        part = new_part or old_part
+        return {
+            'change': change,
+            'number': part.number,
+            'name': part.name,
+            'old_position': old_part.position if old_part else None,
+            'new_position': new_part.position if new_part else None,
+            'old_quantity': old_part.quantity if old_part else None,
+            'new_quantity': new_part.quantity if new_part else None,
+        }
+
+
+def get_total_to_order(bom: AbstractBom) -> dict[str, int]:
+    """Returns the total quantity to order of each 'Part number', multiplied by quantities of all ancestors."""
+    try:
+        main_assembly_sets = bom.main_assembly_sets
+    except AttrNotSetException:
+        main_assembly_sets = 1
+    quantities_by_position = {}
+    parent_positions = {}
+    for part in bom.part_list:
+        if part.position not in quantities_by_position:
+            quantities_by_position[part.position] = part.quantity
+            parent_positions[part.position] = part.parent_id
+
+    sets_by_position = {}
+
+    def get_sets(part_position: str) -> int:
+        """Returns sets of the Part at the position, resolving and caching sets of its ancestors first."""
+        ancestor_positions = []
+        position = part_position
+        while position not in sets_by_position:
+            parent_position = parent_positions[position]
+            if parent_position not in quantities_by_position:
+                sets_by_position[position] = main_assembly_sets
+                break
+            ancestor_positions.append(position)
+            position = parent_position
+        for ancestor_position in reversed(ancestor_positions):
+            parent_position = parent_positions[ancestor_position]
+            sets_by_position[ancestor_position] = sets_by_position[parent_position] * \
+                                                  quantities_by_position[parent_position]
+        return sets_by_position[part_position]
+
+    total_to_order = {}
+    for part in bom.part_list:
+        total_to_order[part.number] = total_to_order.get(part.number, 0) + part.quantity * get_sets(part.position)
+    return total_to_order
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import os
+import uuid
 from abc import ABC, abstractmethod
 
 from web_app.exceptions import ObjectNotFound
-from web_app.models.bom import AbstractBom, DefaultBom
+from web_app.models.bom import AbstractBom, DefaultBom, SqliteBom
 from web_app.typing import BomManagerClassTypes
 
 
@@ -73,3 +75,46 @@ class DefaultBomManager(AbstractBomManager):
             clean_bom = DefaultBom()
             self.bom_list = [item if item is not bom else clean_bom for item in self.bom_list]
             return clean_bom
+
+
+class SqliteBomManager(AbstractBomManager):
+    """Class for the Manager of Bills of Materials stored in SQLite databases, one database file per BOM."""
+    manager_type: BomManagerClassTypes = 'sqlite'
+
+    def __init__(self, database_directory: str):
+        super().__init__()
+        self.database_directory: str = database_directory
+
+    def create_bom(self, main_assembly_name: str = '', main_assembly_sets: int = 0) -> SqliteBom:
+        """Creates a new SQLite Bill of Materials within BOM Manager, stored in a new database file."""
+        bom = SqliteBom(self._get_database_path(), main_assembly_name, main_assembly_sets)
+        self.bom_list.append(bom)
+        return bom
+
+    def reset_bom(self, bom: SqliteBom) -> SqliteBom:
+        """Replaces existing Bill of Materials with new instance of SQLite Bill of Materials, removing its database."""
+        if bom not in self.bom_list:
+            raise ObjectNotFound(bom, self)
+        else:
+            clean_bom = SqliteBom(self._get_database_path())
+            self.bom_list = [item if item is not bom else clean_bom for item in self.bom_list]
+            self._remove_database(bom)
+            return clean_bom
+
+    def delete_bom(self, bom: SqliteBom) -> None:
+        """Deletes an existing Bill of Materials from BOM Manager with its database."""
+        super().delete_bom(bom)
+        self._remove_database(bom)
+
+    def _get_database_path(self) -> str:
+        """Returns a path of a new database file."""
+        return os.path.join(self.database_directory, f'{uuid.uuid4().hex}.sqlite3')
+
+    @staticmethod
+    def _remove_database(bom: SqliteBom) -> None:
+        """Closes and removes the database file of the BOM."""
+        bom.part_list.close()
+        try:
+            os.remove(bom.database_path)
+        except FileNotFoundError:
+            pass
@@ -3,8 +3,12 @@ from __future__ import annotations
 import copy
 from typing import Union
 
-from .bom import AbstractBom, PartsCollection
+from .bom import AbstractBom, PartsCollection, SqliteBom
 from .bom_processor_methods import ProcessorMethods
+from .part_list_validator import PartListValidator, SqlitePartListValidator
+from .sqlite_bom_processor_methods import SqliteProcessorMethods
+from ..exceptions import PartListValidationError
+from ..typing import PartTypes, PurchaseListItem
 
 
 class BomProcessor:
@@ -23,6 +27,8 @@ class BomProcessor:
         self.reverse_bom_sorting: bool = False
         self.normalized_columns: list | None = None
         self.parts_sorting: bool | None = None
+        self.supplier_column: str | None = None
+        self.purchase_list: dict[PartTypes, list[PurchaseListItem]] | None = None
         self.bom_modifiers = ProcessorMethods(self)
 
     def __str__(self):
@@ -43,6 +49,12 @@ class BomProcessor:
         for index, part in enumerate(self.processed_part_list):
             print(index, part.__dict__)
 
+    def validate_part_list(self) -> None:
+        """Checks the BOM part list before processing. Raises an exception with all found problems."""
+        problems = PartListValidator(self.bom).validate()
+        if problems:
+            raise PartListValidationError(problems)
+
     def run_initialization(self):
         """Sets processor data for processing."""
         self.initial_part_list = copy.deepcopy(self.bom.part_list)
@@ -57,7 +69,43 @@ class BomProcessor:
         """Sets BOM part list as processed part list."""
         if self.processing_succeeded:
             self.bom.part_list = self.processed_part_list
+            self.bom.purchase_list = self.purchase_list
 
     def undo_processing(self) -> None:
         """Sets BOM Part list as initial part list."""
         self.bom.part_list = self.initial_part_list
+        self.bom.purchase_list = None
+
+
+class SqliteBomProcessor(BomProcessor):
+    """
+    Class for a BOM Processor of Parts stored in SQLite, processed by queries within a single transaction.
+    Part list is not copied, processing is committed when it succeeds and rolled back when it is undone.
+    """
+
+    def __init__(self, bom: SqliteBom):
+        super().__init__(bom)
+        self.bom_modifiers = SqliteProcessorMethods(self)
+
+    def validate_part_list(self) -> None:
+        """Checks the BOM part list before processing with queries. Raises an exception with all found problems."""
+        problems = SqlitePartListValidator(self.bom).validate()
+        if problems:
+            raise PartListValidationError(problems)
+
+    def run_initialization(self):
+        """Sets processor data for processing, starting from the last committed Part list."""
+        self.bom.part_list.rollback()
+        self.initial_part_list = self.bom.part_list
+        self.processed_part_list = self.bom.part_list
+
+    def finish_processing(self):
+        """Commits changes of the processed Part list."""
+        if self.processing_succeeded:
+            self.bom.part_list.commit()
+            self.bom.purchase_list = self.purchase_list
+
+    def undo_processing(self) -> None:
+        """Discards changes of the Part list which are not committed."""
+        self.bom.part_list.rollback()
+        self.bom.purchase_list = None
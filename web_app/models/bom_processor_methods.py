@@ -1,15 +1,40 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 from typing import TYPE_CHECKING
 
 from ..assets.data.data import standard_fasteners
-from ..functions import normalize_string
-from ..functions.functions import create_keyword_list, part_modifier
-from ..typing import PartTypes
+from ..functions import normalize_strings
+from ..functions.functions import create_keyword_list, part_modifier, part_list_modifier, \
+    processing_step
+from ..typing import PurchaseListItem
+from .part_flags import PartFlags, PART_TYPE_FLAGS, PART_TYPES_BY_FLAGS
 
 if TYPE_CHECKING:
     from . import BomProcessor, AbstractPart
+    from .parts_collection import PartsCollection
+
+
+def get_is_fastener(values: Iterable) -> bool:
+    """Returns True if any of the Part values names a standard fastener with one of its standard sizes."""
+    name_split = [str(value).upper() for value in values]
+    norm_in_name = {norm: name for norm, value in standard_fasteners.items() for name in name_split if norm in name}
+    is_part_fastener = False
+    if norm_in_name:
+        part_norm = next(iter(norm_in_name))
+        part_name = norm_in_name[part_norm]
+        part_numbers = [int(num) for num in re.findall(r'\d+', part_name)]
+        is_part_fastener = any(x in part_numbers for x in standard_fasteners[part_norm])
+    return is_part_fastener
+
+
+def get_purchase_list_requirements(processor: BomProcessor) -> list[str]:
+    """Returns attributes the purchase list is grouped by, with grouped columns which are normalized."""
+    column_schema = processor.bom.column_schema
+    grouped_columns = {processor.supplier_column, column_schema.number_column, column_schema.name_column}
+    return ['type', 'to_order'] + [column for column in processor.normalized_columns or []
+                                   if column in grouped_columns]
 
 
 class ProcessorMethods:
@@ -18,18 +43,27 @@ class ProcessorMethods:
     def __init__(self, processor: BomProcessor):
         self.processor = processor
 
-    @part_modifier
-    def set_parent(self, part: AbstractPart) -> None:
-        """Returns a list of each Part's parent 'position number'."""
-        parent = [item for item in self.processor.processed_part_list if item.id == part.parent_id]
-        part.parent = parent[0] if parent else None
-
-    @part_modifier
-    def set_child(self, part: AbstractPart) -> None:
-        """Returns a list of each child 'position number'."""
-        child_list = [item for item in self.processor.processed_part_list if item.parent_id == part.id]
-        part.child = child_list
-
+    @processing_step(['parent'])
+    @part_list_modifier
+    def set_parent(self, part_list: PartsCollection) -> None:
+        """Sets each Part's parent, found by 'position number' in a single pass."""
+        parts_by_id = {}
+        for part in part_list:
+            parts_by_id.setdefault(part.id, part)
+        for part in part_list:
+            part.parent = parts_by_id.get(part.parent_id)
+
+    @processing_step(['child'])
+    @part_list_modifier
+    def set_child(self, part_list: PartsCollection) -> None:
+        """Sets a list of each Part's children, found by 'position number' in a single pass."""
+        children_by_parent_id = {}
+        for part in part_list:
+            children_by_parent_id.setdefault(part.parent_id, []).append(part)
+        for part in part_list:
+            part.child = children_by_parent_id.get(part.id, [])
+
+    @processing_step(['sets'], requires=['parent'])
     @part_modifier
     def set_sets(self, part: AbstractPart) -> None:
         """Returns the quantity of Part sets to order."""
@@ -40,58 +74,50 @@ class ProcessorMethods:
             current_part = current_part.parent
         part.sets = sets
 
+    @processing_step(['to_order'], requires=['sets'])
     @part_modifier
     def set_to_order(self, part: AbstractPart) -> None:
         """Returns the total quantity of the Part to order."""
         part.to_order = part.quantity * part.sets
 
+    @processing_step(['file_type'], requires=['child', 'is_production'])
     @part_modifier
     def set_file_type(self, part: AbstractPart) -> None:
         """Returns a file type of the Part."""
         part.file_type = 'assembly' if part.child and part.is_production else 'part'
 
+    @processing_step(['type'], requires=['is_junk', 'is_production', 'is_fastener', 'is_purchased'])
     @part_modifier
     def set_type(self, part: AbstractPart) -> None:
-        """Returns the type of the Part."""
-        part_type: PartTypes | None = None
-        if part.is_junk:
-            part_type = 'junk'
-        elif part.is_production:
-            part_type = 'production'
-        elif part.is_fastener:
-            part_type = 'fastener'
-        elif part.is_purchased:
-            part_type = 'purchased'
-        part.type = part_type
+        """Returns the type of the Part, looked up by its type flags."""
+        part.type = PART_TYPES_BY_FLAGS[part.flags & PART_TYPE_FLAGS]
 
+    @processing_step(['is_production'])
     @part_modifier
     def set_is_production(self, part: AbstractPart) -> None:
         """Returns True if the Part is of 'production' type based on provided keywords."""
         keywords = create_keyword_list(self.processor.production_part_keywords)
         part.is_production = any(keyword in part.number for keyword in keywords) if keywords else False
 
+    @processing_step(['is_fastener'])
     @part_modifier
     def set_is_fastener(self, part: AbstractPart) -> None:
         """Returns True if the Part is of 'fastener' type based on keywords."""
-        name_split = [str(value).upper() for key, value in vars(part).items() if key != "parent" and key != "child"]
-        norm_in_name = {norm: name for norm, value in standard_fasteners.items() for name in name_split if norm in name}
-        is_part_fastener = False
-        if norm_in_name:
-            part_norm = next(iter(norm_in_name))
-            part_name = norm_in_name[part_norm]
-            part_numbers = [int(num) for num in re.findall(r'\d+', part_name)]
-            is_part_fastener = any(x in part_numbers for x in standard_fasteners[part_norm])
-        part.is_fastener = is_part_fastener
+        part.is_fastener = get_is_fastener([value for key, value in vars(part).items()
+                                            if key not in ("parent", "child", "flags") and not key.startswith("_")])
 
+    @processing_step(['is_purchased'], requires=['is_production', 'is_fastener'])
     @part_modifier
     def set_is_purchased(self, part: AbstractPart) -> None:
         """Returns True if the Part is of 'purchased' type. It could be only if it's not "production" or "fastener"."""
-        part.is_purchased = True if not part.is_production and not part.is_fastener else False
+        part.is_purchased = not part.flags & (PartFlags.PRODUCTION | PartFlags.FASTENER)
 
+    @processing_step(['parent_assembly'], requires=['parent'])
     @part_modifier
     def set_parent_assembly(self, part: AbstractPart):
         part.parent_assembly = self.processor.bom.main_assembly_name if not part.parent else part.parent.number
 
+    @processing_step(['is_junk_by_keywords'])
     @part_modifier
     def set_is_junk_by_keywords(self, part: AbstractPart) -> None:
         """Returns True if the Part is of 'junk' type based by provided keywords."""
@@ -99,27 +125,64 @@ class ProcessorMethods:
         is_junk = any(keyword in part.name or keyword in part.number for keyword in keywords) if keywords else False
         part.is_junk_by_keywords = is_junk
 
+    @processing_step(['is_junk_by_empty_fields'])
     @part_modifier
     def set_is_junk_by_empty_fields(self, part: AbstractPart) -> None:
         """Function that sets a part as "junk" if all specified fields are empty."""
         fields = create_keyword_list(self.processor.junk_part_empty_fields)
         part.is_junk_by_empty_fields = not any(getattr(part, field) for field in fields) if fields else False
 
-    @part_modifier
-    def set_is_junk_by_purchased_part_nesting(self, part: AbstractPart) -> None:
-        """Returns True if the Part is nested in another Part that is not a 'Production' type."""
-        part.is_junk_by_purchased_part_nesting = False if not part.parent or part.parent.is_production else True
-
+    @processing_step(['is_junk_by_purchased_part_nesting'], requires=['parent', 'child', 'is_production'])
+    @part_list_modifier
+    def set_is_junk_by_purchased_part_nesting(self, part_list: PartsCollection) -> None:
+        """Sets True for Parts nested anywhere in a Part that is not a 'Production' type, in one tree order pass."""
+        subtree_index = part_list.get_subtree_index()
+        nested_until = 0
+        for index, part in enumerate(subtree_index.tree_order):
+            part.is_junk_by_purchased_part_nesting = index < nested_until
+            if not part.is_production:
+                nested_until = max(nested_until, subtree_index.exits[index])
+
+    @processing_step(['is_junk'],
+                     requires=['is_junk_by_keywords', 'is_junk_by_empty_fields', 'is_junk_by_purchased_part_nesting'])
     @part_modifier
     def set_is_junk(self, part: AbstractPart) -> None:
         """Returns True if any 'is_junk' condition is True."""
-        is_junk = any([part.is_junk_by_keywords, part.is_junk_by_empty_fields, part.is_junk_by_purchased_part_nesting])
-        part.is_junk = is_junk
+        part.is_junk = bool(part.flags & PartFlags.JUNK_CONDITIONS)
 
-    @part_modifier
-    def set_normalized_names(self, part: AbstractPart) -> None:
-        """Returns a Part with the normalized name of chosen BOM columns."""
+    @processing_step(lambda processor: processor.normalized_columns or [])
+    @part_list_modifier
+    def set_normalized_names(self, part_list: PartsCollection) -> None:
+        """Normalizes names of chosen BOM columns, normalizing each distinct name of a column once."""
         for key in self.processor.normalized_columns:
-            if hasattr(part, key):
-                normalized_name = normalize_string(getattr(part, key))
-                setattr(part, key, normalized_name)
+            parts = [part for part in part_list if hasattr(part, key)]
+            normalized_names = normalize_strings([getattr(part, key) for part in parts])
+            for part, normalized_name in zip(parts, normalized_names):
+                setattr(part, key, self.processor.bom.value_dictionary.encode(key, normalized_name))
+
+    @processing_step(['purchase_list'], requires=get_purchase_list_requirements)
+    @part_list_modifier
+    def set_purchase_list(self, part_list: PartsCollection) -> None:
+        """Sets quantities to order summed up by 'Part number' and optionally 'Supplier', split by type."""
+        supplier_column = self.processor.supplier_column
+        purchase_items: dict[tuple, PurchaseListItem] = {}
+        for part in part_list:
+            supplier = getattr(part, supplier_column, '') if supplier_column else ''
+            key = (part.type, part.number, supplier)
+            purchase_item = purchase_items.get(key)
+            if purchase_item is None:
+                purchase_item = purchase_items[key] = {
+                    'number': part.number,
+                    'name': part.name,
+                    'supplier': supplier,
+                    'type': part.type,
+                    'to_order': 0,
+                    'positions': [],
+                }
+            purchase_item['to_order'] += part.to_order
+            purchase_item['positions'].append(part.position)
+
+        purchase_list: dict[PartTypes, list[PurchaseListItem]] = {}
+        for purchase_item in purchase_items.values():
+            purchase_list.setdefault(purchase_item['type'], []).append(purchase_item)
+        self.processor.purchase_list = purchase_list
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import pickle
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractBom
+
+
+class BomStore:
+    """
+    Class for processed BOMs pickled to files of a folder, looked up by keys stored in sessions.
+    Sessions hold only the keys, so requests reading a BOM do not unpickle all of its Parts. Recently used BOMs
+    are cached in memory of the application process, others are loaded from their files, e.g. after a restart
+    or by another process. Files are expected to expire as other stored files do.
+    """
+
+    def __init__(self, directory: str, max_count: int = 16):
+        self.directory = directory
+        self.max_count = max_count
+        self._boms: OrderedDict[str, AbstractBom] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._boms)
+
+    def get_path(self, key: str) -> str:
+        """Returns the path of the file of the BOM stored with the key."""
+        return os.path.join(self.directory, f'{key}.pickle')
+
+    def add(self, bom: AbstractBom) -> str:
+        """Stores the BOM and returns its key."""
+        key = uuid.uuid4().hex
+        path = self.get_path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        # The file is written under a temporary name, so other processes never load a partly written BOM
+        with open(f'{path}.tmp', 'wb') as file:
+            pickle.dump(bom, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{path}.tmp', path)
+        self._cache(key, bom)
+        return key
+
+    def get(self, key: Optional[str]) -> Optional[AbstractBom]:
+        """Returns the BOM stored with the key and marks it as recently used, or None if its file has expired."""
+        if not key or not key.isalnum():
+            return None
+        path = self.get_path(key)
+        if not os.path.isfile(path):
+            with self._lock:
+                self._boms.pop(key, None)
+            return None
+        with self._lock:
+            bom = self._boms.get(key)
+            if bom is not None:
+                self._boms.move_to_end(key)
+                return bom
+        try:
+            with open(path, 'rb') as file:
+                bom = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        self._cache(key, bom)
+        return bom
+
+    def remove(self, key: Optional[str]) -> None:
+        """Drops the BOM stored with the key, e.g. when the session processes another part list."""
+        if not key or not key.isalnum():
+            return
+        with self._lock:
+            self._boms.pop(key, None)
+        try:
+            os.remove(self.get_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _cache(self, key: str, bom: AbstractBom) -> None:
+        """Keeps the BOM in memory, dropping least recently used BOMs above the maximal count."""
+        with self._lock:
+            self._boms[key] = bom
+            self._boms.move_to_end(key)
+            while len(self._boms) > self.max_count:
+                self._boms.popitem(last=False)
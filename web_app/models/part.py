@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 from abc import ABC
+from collections.abc import Iterable, Mapping, Sequence
+from decimal import Decimal
 from typing import Optional
 
 from web_app.exceptions import AttrNotSetException, QuantityColumnIsNotDigit, DelimiterNotUnique
 from web_app.functions.functions import get_number_delimiter
+from web_app.models.part_column_schema import PartColumnSchema
+from web_app.models.part_flags import PartFlag, PartFlags, PART_FLAG_ATTRIBUTES
 from web_app.typing import PartTypes, PartFileTypes, PartClassTypes
 
 
 class AbstractPart(ABC):
     """Abstract class for a Part."""
     part_type: PartClassTypes = None
+    is_production = PartFlag(PartFlags.PRODUCTION)
+    is_fastener = PartFlag(PartFlags.FASTENER)
+    is_purchased = PartFlag(PartFlags.PURCHASED)
+    is_junk_by_keywords = PartFlag(PartFlags.JUNK_BY_KEYWORDS)
+    is_junk_by_empty_fields = PartFlag(PartFlags.JUNK_BY_EMPTY_FIELDS)
+    is_junk_by_purchased_part_nesting = PartFlag(PartFlags.JUNK_BY_PURCHASED_PART_NESTING)
+    is_junk = PartFlag(PartFlags.JUNK)
 
     def __init__(self, **kwargs):
         self.sets: int | None = None
@@ -20,18 +31,13 @@ class AbstractPart(ABC):
         self.parent_assembly: str | None = None
         self.type: PartTypes | None = None
         self.file_type: PartFileTypes | None = None
-        self.is_fastener: bool | None = None
-        self.is_purchased: bool | None = None
-        self.is_production: bool | None = None
-        self.is_junk_by_keywords: bool | None = None
-        self.is_junk_by_empty_fields: bool | None = None
-        self.is_junk_by_purchased_part_nesting: bool | None = None
-        self.is_junk: bool | None = None
-
-        self._position_column: str = ''
-        self._quantity_column: str = ''
-        self._number_column: str = ''
-        self._name_column: str = ''
+        # Bitmask of PartFlags viewed by the 'is_*' attributes, with a bitmask of flags which have been set
+        self.flags: int = 0
+        self._assigned_flags: int = 0
+
+        self._column_schema: PartColumnSchema = PartColumnSchema()
+        for key in PART_FLAG_ATTRIBUTES.keys() & kwargs.keys():
+            setattr(self, key, kwargs.pop(key))
         self.__dict__.update(kwargs)
 
     def __str__(self):
@@ -40,37 +46,69 @@ class AbstractPart(ABC):
     def __repr__(self):
         return f'{self.number} {self.name}'
 
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence] | Mapping[str, Sequence], columns: Optional[Sequence[str]] = None,
+                  column_schema: Optional[PartColumnSchema] = None) -> list[AbstractPart]:
+        """
+        Creates Parts from rows sharing the same columns or from columnar data.
+        Default attributes are resolved once and copied to each Part, skipping per-Part initialization.
+        """
+        if isinstance(rows, Mapping):
+            columns = list(rows.keys())
+            rows = list(zip(*rows.values()))
+        default_attributes = vars(cls())
+        if column_schema is not None:
+            default_attributes['_column_schema'] = column_schema
+
+        if not isinstance(rows, Sequence):
+            rows = list(rows)
+        parts = [None] * len(rows)
+        for index, row in enumerate(rows):
+            part = cls.__new__(cls)
+            attributes = default_attributes.copy()
+            attributes.update(zip(columns, row))
+            part.__dict__ = attributes
+            parts[index] = part
+        return parts
+
     @property
     def position(self) -> str:
         """Returns the 'Part position' attribute of the Part."""
-        if not self._position_column:
+        column = self._column_schema.position_column
+        if not column:
             raise AttrNotSetException('Part position')
-        return getattr(self, self._position_column)
+        return getattr(self, column)
 
     @property
     def number(self) -> str:
         """Returns the 'Part number' attribute of the Part."""
-        if not self._number_column:
+        column = self._column_schema.number_column
+        if not column:
             raise AttrNotSetException('Part number')
-        return getattr(self, self._number_column)
+        return getattr(self, column)
 
     @property
-    def quantity(self) -> int:
-        """Returns the 'Part quantity' attribute of the Part."""
-        if not self._quantity_column:
+    def quantity(self) -> int | Decimal:
+        """Returns the 'Part quantity' attribute of the Part. Quantities parsed on import are returned as they are."""
+        column = self._column_schema.quantity_column
+        if not column:
             raise AttrNotSetException('Part quantity')
+        qty = getattr(self, column)
+        if isinstance(qty, (int, Decimal)):
+            return qty
         try:
-            qty = int(getattr(self, self._quantity_column))
+            qty = int(qty)
         except ValueError as e:
-            raise QuantityColumnIsNotDigit(self, self._quantity_column) from e
+            raise QuantityColumnIsNotDigit(self, column) from e
         return qty
 
     @property
     def name(self) -> str:
         """Returns the 'Part name' attribute of the Part."""
-        if not self._name_column:
+        column = self._column_schema.name_column
+        if not column:
             raise AttrNotSetException('Part name')
-        return getattr(self, self._name_column)
+        return getattr(self, column)
 
     def get_pos_delimiter(self) -> str:
         """" Returns Part's position unique delimiter. """
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+from web_app.functions import get_first_imported_file, get_stored_value
+from web_app.models.bom import AbstractBom
+from web_app.typing import CatalogueEntry
+
+CATALOGUE_COLUMNS = ['source', 'project', 'number', 'name', 'supplier', 'type', 'to_order', 'positions', 'updated_at']
+
+
+class PartCatalogue:
+    """
+    Class for a cross-project catalogue of Parts stored in a local SQLite database.
+    Each processed BOM replaces only the rows of its own imported source.
+    """
+    # Part attributes needed to update the catalogue from a processed BOM
+    required_columns: list[str] = ['purchase_list']
+
+    def __init__(self, database_path: str):
+        self.database_path: str = database_path
+        self._create_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns a new connection to the catalogue database."""
+        connection = sqlite3.connect(self.database_path)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _create_schema(self) -> None:
+        """Creates the catalogue table and its indexes if they do not exist."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS catalogue_parts (
+                    source TEXT NOT NULL,
+                    project TEXT,
+                    number TEXT NOT NULL,
+                    name TEXT COLLATE NOCASE,
+                    supplier TEXT,
+                    type TEXT,
+                    to_order NUMERIC,
+                    positions TEXT,
+                    updated_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS catalogue_parts_source ON catalogue_parts (source);
+                CREATE INDEX IF NOT EXISTS catalogue_parts_number ON catalogue_parts (number);
+                CREATE INDEX IF NOT EXISTS catalogue_parts_supplier ON catalogue_parts (supplier);
+                CREATE INDEX IF NOT EXISTS catalogue_parts_name ON catalogue_parts (name COLLATE NOCASE);
+            """)
+
+    def update(self, bom: AbstractBom) -> int:
+        """Replaces catalogue rows of the BOM source with its purchase list. Returns the number of stored rows."""
+        source = get_first_imported_file(bom)
+        if not source or bom.purchase_list is None:
+            return 0
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        # Decimal quantities, e.g. cut lengths, are stored as text which the column converts to numbers
+        rows = [(source, bom.main_assembly_name, item['number'], item['name'], item['supplier'], item['type'],
+                 get_stored_value(item['to_order']), ', '.join(item['positions']), updated_at)
+                for purchase_items in bom.purchase_list.values() for item in purchase_items]
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM catalogue_parts WHERE source = ?', (source,))
+            connection.executemany(f'INSERT INTO catalogue_parts ({", ".join(CATALOGUE_COLUMNS)}) '
+                                   f'VALUES ({", ".join("?" * len(CATALOGUE_COLUMNS))})', rows)
+        return len(rows)
+
+    def remove_source(self, source: str) -> None:
+        """Removes all catalogue rows of the source."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute('DELETE FROM catalogue_parts WHERE source = ?', (source,))
+
+    def find_by_number(self, number: str) -> list[CatalogueEntry]:
+        """Returns catalogue entries of the 'Part number' in every project."""
+        return self._find('number = ?', (number,))
+
+    def find_by_supplier(self, supplier: str) -> list[CatalogueEntry]:
+        """Returns catalogue entries of the supplier in every project."""
+        return self._find('supplier = ?', (supplier,))
+
+    def find_by_name_prefix(self, prefix: str) -> list[CatalogueEntry]:
+        """Returns catalogue entries which 'Part name' starts with the prefix, ignoring the letter case."""
+        escaped_prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return self._find("name LIKE ? ESCAPE '\\'", (f'{escaped_prefix}%',))
+
+    def _find(self, condition: str, parameters: tuple) -> list[CatalogueEntry]:
+        """Returns catalogue entries matching the condition."""
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(f'SELECT {", ".join(CATALOGUE_COLUMNS)} FROM catalogue_parts '
+                                        f'WHERE {condition} ORDER BY number, source', parameters)
+            return [dict(row) for row in cursor]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+
+class PartColumnSchema:
+    """
+    Class for a mapping of Part attributes to part list columns, shared by all Parts of the BOM.
+    Copies of Parts keep sharing the schema, so remapping columns applies to the whole BOM at once.
+    """
+
+    def __init__(self, position_column: str = '', quantity_column: str = '', number_column: str = '',
+                 name_column: str = ''):
+        self.position_column: str = position_column
+        self.quantity_column: str = quantity_column
+        self.number_column: str = number_column
+        self.name_column: str = name_column
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.get_columns()})'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def get_columns(self) -> dict[str, str]:
+        """Returns names of mapped columns by Part attributes."""
+        return vars(self).copy()
+
+    def set_columns(self, **columns: str) -> None:
+        """Maps Part attributes, e.g. 'position_column', to part list columns."""
+        for attribute, column in columns.items():
+            if attribute not in vars(self):
+                raise AttributeError(f"'{attribute}' is not a Part column attribute.")
+            setattr(self, attribute, column)
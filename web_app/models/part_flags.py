@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from enum import IntFlag
+from typing import Optional, TYPE_CHECKING
+
+from web_app.typing import PartTypes
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+
+
+class PartFlags(IntFlag):
+    """Flags classifying a Part, stored together in a single integer bitmask of the Part."""
+    PRODUCTION = 1
+    FASTENER = 2
+    PURCHASED = 4
+    JUNK_BY_KEYWORDS = 8
+    JUNK_BY_EMPTY_FIELDS = 16
+    JUNK_BY_PURCHASED_PART_NESTING = 32
+    JUNK = 64
+    JUNK_CONDITIONS = JUNK_BY_KEYWORDS | JUNK_BY_EMPTY_FIELDS | JUNK_BY_PURCHASED_PART_NESTING
+
+
+# Boolean attributes of Parts by the flag they view
+PART_FLAG_ATTRIBUTES: dict[str, PartFlags] = {
+    'is_production': PartFlags.PRODUCTION,
+    'is_fastener': PartFlags.FASTENER,
+    'is_purchased': PartFlags.PURCHASED,
+    'is_junk_by_keywords': PartFlags.JUNK_BY_KEYWORDS,
+    'is_junk_by_empty_fields': PartFlags.JUNK_BY_EMPTY_FIELDS,
+    'is_junk_by_purchased_part_nesting': PartFlags.JUNK_BY_PURCHASED_PART_NESTING,
+    'is_junk': PartFlags.JUNK,
+}
+PART_TYPE_FLAGS = PartFlags.JUNK | PartFlags.PRODUCTION | PartFlags.FASTENER | PartFlags.PURCHASED
+
+
+def _get_part_type(flags: int) -> Optional[PartTypes]:
+    """Returns the type of the Part flagged by the bitmask, junk flag first, then production, fastener, purchased."""
+    for flag, part_type in ((PartFlags.JUNK, 'junk'), (PartFlags.PRODUCTION, 'production'),
+                            (PartFlags.FASTENER, 'fastener'), (PartFlags.PURCHASED, 'purchased')):
+        if flags & flag:
+            return part_type
+    return None
+
+
+# Types of Parts for every combination of type flags, looked up by 'flags & PART_TYPE_FLAGS'
+PART_TYPES_BY_FLAGS: list[Optional[PartTypes]] = [_get_part_type(flags) for flags in range(PART_TYPE_FLAGS + 1)]
+
+
+class PartFlag:
+    """
+    Descriptor of a boolean Part attribute, viewing a single flag of the Part bitmask.
+    Flags which have not been set yet are read as None.
+    """
+
+    def __init__(self, flag: PartFlags):
+        self.mask: int = int(flag)
+
+    def __get__(self, part: Optional[AbstractPart], owner=None) -> bool | None | PartFlag:
+        if part is None:
+            return self
+        if not part._assigned_flags & self.mask:
+            return None
+        return bool(part.flags & self.mask)
+
+    def __set__(self, part: AbstractPart, value: bool | None) -> None:
+        if value is None:
+            part._assigned_flags &= ~self.mask
+        else:
+            part._assigned_flags |= self.mask
+        if value:
+            part.flags |= self.mask
+        else:
+            part.flags &= ~self.mask
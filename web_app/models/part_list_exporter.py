@@ -1,44 +1,242 @@
 from __future__ import annotations
 
+import codecs
+import csv
+import io
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections.abc import Iterator
+from typing import Optional, TYPE_CHECKING
 
-import pandas as pd
-
-from web_app.functions import get_first_imported_file
+from web_app.functions import get_first_imported_file, format_column_name, get_cell_value
+from web_app.functions.functions import get_type_rank, PART_TYPES_ORDER
 from web_app.models.bom import AbstractBom
+from web_app.typing import BomChange, ToOrderChange, TreeRow
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+    from web_app.models.bom_diff import BomDiff
+
+PURCHASE_LIST_COLUMNS = ['number', 'name', 'supplier', 'to_order', 'positions']
+STREAM_CHUNK_SIZE = 64 * 1024
+# The deepest outline level supported by Excel
+MAX_OUTLINE_LEVEL = 7
 
 
 class AbstractBomExporter(ABC):
     """Abstract class for exporting a part list to a various file types."""
+    # Part attributes needed to export the part list in tree order
+    required_columns: list[str] = ['parent', 'child']
+    file_extension: str = None
+    mimetype: str = None
 
     def __init__(self, bom: AbstractBom):
         self.bom: AbstractBom = bom
         self.exported_filename: str = ''
 
     @abstractmethod
-    def _save(self, exported_columns: list, exports_directory: str, filename_without_extension: str):
-        """Creates a file with a part list."""
+    def _save(self, exported_columns: list, exports_directory: str, filename_without_extension: str,
+              include_purchase_list: bool = False, subtree_root: Optional[AbstractPart] = None):
+        """Creates a file with a part list and optionally with a purchase list."""
         ...
 
-    def export_part_list(self, exported_columns: list, exports_directory: str, filename: Optional[str] = None) -> None:
-        """Exports the part list to a file."""
+    @abstractmethod
+    def stream_part_list(self, exported_columns: list, include_purchase_list: bool = False,
+                         subtree_root: Optional[AbstractPart] = None) -> Iterator[bytes]:
+        """Generates the exported file in chunks without writing it to the exports directory."""
+        ...
+
+    def export_part_list(self, exported_columns: list, exports_directory: str, filename: Optional[str] = None,
+                         include_purchase_list: bool = False, subtree_root: Optional[AbstractPart] = None) -> None:
+        """
+        Exports the part list to a file. The purchase list is exported only if the BOM has been processed.
+        If the subtree root Part is given, only the Part with Parts nested in it is exported.
+        """
+        self._save(exported_columns, exports_directory, self.get_filename_without_extension(),
+                   include_purchase_list and self.bom.purchase_list is not None, subtree_root)
+
+    def _get_tree_rows(self, subtree_root: Optional[AbstractPart] = None) -> Iterator[TreeRow]:
+        """Yields Parts in tree order with their depths, limited to the subtree of the root Part if given."""
+        return self.bom.part_list.iter_tree_rows(*self.bom.part_list.get_subtree_bounds(subtree_root))
+
+    def get_filename_without_extension(self) -> str:
+        """Returns the name of the exported file based on the first imported file."""
         exported_filename = 'PrettyBom - Bill of materials'
-        if not filename:
-            first_imported_file = get_first_imported_file(self.bom)
-            if first_imported_file:
-                exported_filename = first_imported_file.rsplit('.', 1)[0]
-        self._save(exported_columns, exports_directory, exported_filename)
+        first_imported_file = get_first_imported_file(self.bom)
+        if first_imported_file:
+            exported_filename = first_imported_file.rsplit('.', 1)[0]
+        return exported_filename
 
+    def get_exported_filename(self) -> str:
+        """Returns the name of the exported file with its extension."""
+        return f'{self.get_filename_without_extension()}.{self.file_extension}'
 
-class BomXlsxExporter(AbstractBomExporter):
-    """Class for exporting a part list to the xlsx file."""
+    def _get_purchase_list_rows(self) -> dict[str, list[list]]:
+        """Returns purchase list rows sorted by 'Part number' and split by the type of Parts."""
+        purchase_list_rows = {}
+        for part_type in sorted(self.bom.purchase_list, key=get_type_rank):
+            purchase_items = sorted(self.bom.purchase_list[part_type], key=lambda item: item['number'])
+            rows = [[item[column] for column in PURCHASE_LIST_COLUMNS] for item in purchase_items]
+            for row in rows:
+                row[-1] = ', '.join(row[-1])
+            purchase_list_rows[part_type or 'unknown'] = rows
+        return purchase_list_rows
 
-    def _save(self, exported_columns: list, exports_directory: str, filename_without_extension: str):
-        df = pd.DataFrame(map(vars, self.bom.part_list.get_tree_part_list()), columns=exported_columns)
-        df.columns = df.columns.str.replace('_', ' ').str.capitalize()
 
+class BomXlsxExporter(AbstractBomExporter):
+    """Class for exporting a part list to the xlsx file. The purchase list is exported to a sheet for each type."""
+    file_extension = 'xlsx'
+    mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    def _save(self, exported_columns: list, exports_directory: str, filename_without_extension: str,
+              include_purchase_list: bool = False, subtree_root: Optional[AbstractPart] = None):
         self.exported_filename = f'{filename_without_extension}.xlsx'
         exported_filepath = f'{exports_directory}{self.exported_filename}'
-        df.to_excel(exported_filepath, index=False, header=True)
-        print(f"Exported {len(df)} parts to file: {self.exported_filename}.")
+        part_count = self._write(exported_filepath, exported_columns, include_purchase_list, subtree_root)
+        print(f"Exported {part_count} parts to file: {self.exported_filename}.")
+
+    def stream_part_list(self, exported_columns: list, include_purchase_list: bool = False,
+                         subtree_root: Optional[AbstractPart] = None) -> Iterator[bytes]:
+        """
+        Generates the xlsx file in chunks. The xlsx file is a zip archive finished by its central directory,
+        so the workbook is written to memory before streaming.
+        """
+        buffer = io.BytesIO()
+        self._write(buffer, exported_columns, include_purchase_list and self.bom.purchase_list is not None,
+                    subtree_root)
+        buffer.seek(0)
+        yield from iter(lambda: buffer.read(STREAM_CHUNK_SIZE), b'')
+
+    def _write(self, target: str | io.BytesIO, exported_columns: list, include_purchase_list: bool,
+               subtree_root: Optional[AbstractPart] = None) -> int:
+        """Writes the workbook to the file path or buffer. Returns the number of exported Parts."""
+        import pandas as pd
+
+        # Attributes are read with getattr, as Part flags are not stored in the Part dictionary
+        df = pd.DataFrame([[getattr(tree_row['part'], column, None) for column in exported_columns]
+                           for tree_row in self._get_tree_rows(subtree_root)], columns=exported_columns)
+        df.columns = df.columns.map(format_column_name)
+
+        with pd.ExcelWriter(target, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Bill of materials', index=False, header=True)
+            if include_purchase_list:
+                purchase_list_columns = [format_column_name(column) for column in PURCHASE_LIST_COLUMNS]
+                for part_type, rows in self._get_purchase_list_rows().items():
+                    purchase_list_df = pd.DataFrame(rows, columns=purchase_list_columns)
+                    purchase_list_df.to_excel(writer, sheet_name=f'Purchase list - {part_type}', index=False,
+                                              header=True)
+        return len(df)
+
+
+class BomTypeSheetsXlsxExporter(BomXlsxExporter):
+    """
+    Class for exporting a part list to the xlsx file with a tree sheet and a sheet for each type of Parts.
+    The tree is traversed once and each row is appended to streaming sheet writers, rows of the tree sheet
+    are grouped by Excel outline levels from the depth of Parts.
+    """
+    required_columns: list[str] = ['parent', 'child', 'type']
+
+    def get_filename_without_extension(self) -> str:
+        return f'{super().get_filename_without_extension()} - by type'
+
+    def _write(self, target: str | io.BytesIO, exported_columns: list, include_purchase_list: bool,
+               subtree_root: Optional[AbstractPart] = None) -> int:
+        from openpyxl import Workbook
+        from openpyxl.worksheet.dimensions import RowDimension
+        from openpyxl.worksheet.properties import Outline
+
+        start, end = self.bom.part_list.get_subtree_bounds(subtree_root)
+        # The subtree root is the first and the shallowest Part of the subtree
+        root_depth = self.bom.part_list.get_max_depth(start, start + 1)
+        header = [format_column_name(column) for column in exported_columns]
+
+        workbook = Workbook(write_only=True)
+        tree_sheet = workbook.create_sheet('Bill of materials')
+        tree_sheet.sheet_properties.outlinePr = Outline(summaryBelow=False)
+        tree_sheet.sheet_format.outlineLevelRow = min(self.bom.part_list.get_max_depth(start, end) - root_depth,
+                                                      MAX_OUTLINE_LEVEL)
+        tree_sheet.append(header)
+        type_sheets = {}
+        for part_type in PART_TYPES_ORDER:
+            type_sheets[part_type] = workbook.create_sheet(f'Parts - {part_type}')
+            type_sheets[part_type].append(header)
+
+        for row_index, tree_row in enumerate(self.bom.part_list.iter_tree_rows(start, end), 2):
+            part = tree_row['part']
+            row = [get_cell_value(getattr(part, column, None)) for column in exported_columns]
+            outline_level = min(tree_row['depth'] - root_depth, MAX_OUTLINE_LEVEL)
+            if outline_level:
+                tree_sheet.row_dimensions[row_index] = RowDimension(tree_sheet, index=row_index,
+                                                                    outlineLevel=outline_level)
+            tree_sheet.append(row)
+            # Written rows are not kept by the write-only sheet, so neither are their dimensions
+            tree_sheet.row_dimensions.pop(row_index, None)
+
+            part_type = part.type or 'unknown'
+            if part_type not in type_sheets:
+                type_sheets[part_type] = workbook.create_sheet(f'Parts - {part_type}')
+                type_sheets[part_type].append(header)
+            type_sheets[part_type].append(row)
+
+        if include_purchase_list:
+            purchase_list_header = [format_column_name(column) for column in PURCHASE_LIST_COLUMNS]
+            for part_type, rows in self._get_purchase_list_rows().items():
+                purchase_list_sheet = workbook.create_sheet(f'Purchase list - {part_type}')
+                purchase_list_sheet.append(purchase_list_header)
+                for row in rows:
+                    purchase_list_sheet.append(row)
+        workbook.save(target)
+        return end - start
+
+
+class BomCsvExporter(AbstractBomExporter):
+    """Class for exporting a part list to the csv file. The purchase list is not exported to csv files."""
+    file_extension = 'csv'
+    mimetype = 'text/csv'
+
+    def _save(self, exported_columns: list, exports_directory: str, filename_without_extension: str,
+              include_purchase_list: bool = False, subtree_root: Optional[AbstractPart] = None):
+        self.exported_filename = f'{filename_without_extension}.csv'
+        with open(f'{exports_directory}{self.exported_filename}', 'wb') as file:
+            file.writelines(self.stream_part_list(exported_columns, subtree_root=subtree_root))
+        start, end = self.bom.part_list.get_subtree_bounds(subtree_root)
+        print(f"Exported {end - start} parts to file: {self.exported_filename}.")
+
+    def stream_part_list(self, exported_columns: list, include_purchase_list: bool = False,
+                         subtree_root: Optional[AbstractPart] = None) -> Iterator[bytes]:
+        """Generates csv rows of the part list in chunks while traversing the tree."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([format_column_name(column) for column in exported_columns])
+        # Byte order mark lets spreadsheet applications detect the utf-8 encoding
+        yield codecs.BOM_UTF8
+        for tree_row in self._get_tree_rows(subtree_root):
+            writer.writerow([getattr(tree_row['part'], column, None) for column in exported_columns])
+            if buffer.tell() >= STREAM_CHUNK_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+
+
+class BomDiffXlsxExporter:
+    """Class for exporting changes between two revisions of a part list to the xlsx file."""
+
+    def __init__(self, bom_diff: BomDiff):
+        self.bom_diff: BomDiff = bom_diff
+        self.exported_filename: str = ''
+
+    def export_diff(self, exports_directory: str, filename: Optional[str] = None) -> None:
+        """Exports part changes and changes of total quantities to order to separate sheets."""
+        import pandas as pd
+
+        exported_filename = filename or 'PrettyBom - Revision changes'
+        changes_df = pd.DataFrame(self.bom_diff.changes, columns=list(BomChange.__annotations__))
+        to_order_changes_df = pd.DataFrame(self.bom_diff.to_order_changes, columns=list(ToOrderChange.__annotations__))
+
+        self.exported_filename = f'{exported_filename}.xlsx'
+        exported_filepath = f'{exports_directory}{self.exported_filename}'
+        with pd.ExcelWriter(exported_filepath) as writer:
+            for sheet_name, df in (('Changes', changes_df), ('To order changes', to_order_changes_df)):
+                df.columns = df.columns.str.replace('_', ' ').str.capitalize()
+                df.to_excel(writer, sheet_name=sheet_name, index=False, header=True)
+        print(f"Exported {len(changes_df)} changes to file: {self.exported_filename}.")
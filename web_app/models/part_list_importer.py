@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-import copy
+import io
 import os
 from abc import ABC, abstractmethod
+from typing import Optional
 
-import pandas as pd
-
-from web_app.models import AbstractBom, AbstractPart
-from web_app.typing import ImportedBomSource, HeaderPositions
+from web_app.functions import get_csv_columns_count, parse_quantities, get_workbook_buffer, get_cell_text, \
+    parse_quantity
+from web_app.models import AbstractBom
+from web_app.typing import ImportedBomSource, HeaderPositions, PartListSource
 
 
 class AbstractPartListImporter(ABC):
@@ -18,8 +19,8 @@ class AbstractPartListImporter(ABC):
         self.imported_bom_columns: list = self._get_part_list_columns()
 
     @abstractmethod
-    def _read_part_list(self) -> list[AbstractPart]:
-        """Read a source and return a part list."""
+    def _read_part_list(self) -> list[list]:
+        """Read a source and return a part list as rows of values ordered as the part list columns."""
         ...
 
     @abstractmethod
@@ -34,47 +35,75 @@ class AbstractPartListImporter(ABC):
 
     def import_to(self, part_list: AbstractBom) -> None:
         """Import read parts to any part list created by BOM Manager."""
-        for part in self.imported_part_list:
-            part_list.create_part(**part)
+        part_list.create_parts(self.imported_part_list, self.imported_bom_columns)
         part_list.imported_bom_columns = self.imported_bom_columns
         part_list.imported_bom_sources.append(self._get_imported_bom_source())
 
 
 class PartListCsvImporter(AbstractPartListImporter):
-    """Class for importing a part list from a csv file."""
-
-    def __init__(self, filepath: str, imported_bom_header_position: HeaderPositions):
-        self.filepath = filepath
+    """
+    Class for importing a part list from a csv file.
+
+    The source could be a path to a local file, which is read through a memory-mapped buffer, raw bytes
+    or a binary file-like object, e.g. the stream of an uploaded file.
+    Values of the quantity column, if given, are parsed to numbers once on import.
+    """
+    # Encodings tried in turn if the source cannot be decoded with the given one, e.g. sniffed from a sample
+    encodings = ['utf-8-sig', 'cp1250']
+
+    def __init__(self, source: PartListSource, imported_bom_header_position: HeaderPositions, filename: str = '',
+                 encoding: str = 'cp1250', delimiter: str = ',', quantity_column: Optional[str] = None):
+        self.source: PartListSource = source
+        self.filename: str = filename or (os.path.basename(source) if isinstance(source, str) else '')
         self.imported_bom_header_position: HeaderPositions = imported_bom_header_position
-        self._df = None
+        self.encoding: str = encoding
+        self.delimiter: str = delimiter
+        self.quantity_column: Optional[str] = quantity_column
+        self._header_row: list[str] = []
         super().__init__()
 
-    def _read_part_list(self) -> list[AbstractPart]:
-        df_initial = pd.read_csv(self.filepath, sep=',', on_bad_lines='skip', header=None,
+    def _get_buffer(self) -> str | io.IOBase:
+        """Returns the source in a form accepted by the csv reader."""
+        if isinstance(self.source, (bytes, bytearray, memoryview)):
+            return io.BytesIO(self.source)
+        if not isinstance(self.source, str) and not self.source.seekable():
+            return io.BytesIO(self.source.read())
+        return self.source
+
+    def _read_part_list(self) -> list[list]:
+        import pandas as pd
+
+        buffer = self._get_buffer()
+        position = None if isinstance(buffer, str) else buffer.tell()
+        encodings = [self.encoding] + [encoding for encoding in self.encodings if encoding != self.encoding]
+        for encoding in encodings:
+            try:
+                columns_count = get_csv_columns_count(buffer, encoding, self.delimiter)
+                df = pd.read_csv(buffer, sep=self.delimiter, usecols=range(columns_count), header=None,
                                  skipinitialspace=True,
-                                 encoding='cp1250')
-
-        columns_count = len(df_initial.columns)
-        df = pd.read_csv(self.filepath, sep=',', usecols=range(columns_count), header=None,
-                         skipinitialspace=True,
-                         encoding='cp1250')
-        df_diff = pd.concat([df_initial, df]).drop_duplicates(keep=False)
-        imported_bom_sliced_rows = []
-        if not df_diff.empty:
-            for index, row in df_diff.iterrows():
-                imported_bom_sliced_rows.append(dict(row))
-            sliced_rows_count = len(imported_bom_sliced_rows)
-            print(f"Sliced {sliced_rows_count} rows.")
+                                 encoding=encoding,
+                                 memory_map=isinstance(buffer, str))
+            except UnicodeDecodeError:
+                if encoding == encodings[-1]:
+                    raise
+                if position is not None:
+                    buffer.seek(position)
+                continue
+            self.encoding = encoding
+            break
 
         df = df.fillna('').astype(str)
-        df.applymap(lambda x: x.strip().replace('\n', '') if isinstance(x, str) else x)
         print(f"Imported {len(df)} items including header. ")
 
-        self._df = copy.deepcopy(df)
+        header_index = df.index[-1] if self.imported_bom_header_position == 'bottom' else df.index[0]
+        # Column names are stripped, as offered by PartListCsvSniffer
+        self._header_row = [column.strip() for column in df.loc[header_index].tolist()]
         df.columns = self._get_part_list_columns()
         df = self._remove_part_list_header(df)
+        if self._header_row.count(self.quantity_column) == 1:
+            df[self.quantity_column] = parse_quantities(df[self.quantity_column])
 
-        part_list = [row.to_dict() for index, row in df.iterrows()]
+        part_list = df.to_numpy().tolist()
         self.imported_part_list = part_list
         return part_list
 
@@ -83,21 +112,88 @@ class PartListCsvImporter(AbstractPartListImporter):
         if self.imported_bom_header_position == 'bottom':
             dataframe.drop(index=dataframe.index[-1], axis=0, inplace=True)
         else:
-            dataframe.drop(index=dataframe.index[1], axis=0, inplace=True)
+            dataframe.drop(index=dataframe.index[0], axis=0, inplace=True)
         return dataframe
 
     def _get_part_list_columns(self) -> list:
-        if self.imported_bom_header_position == 'bottom':
-            last_row = self._df.tail(1).values.flatten().tolist()
-            column_list = last_row
-        else:
-            first_row = self._df.head(1).values.flatten().tolist()
-            column_list = first_row
+        column_list = self._header_row
+        self.imported_bom_columns = column_list
+        return column_list
+
+    def _get_imported_bom_source(self) -> ImportedBomSource:
+        """Returns the representation of the imported source."""
+        source = {'type': 'file', 'name': self.filename}
+        return source
+
+
+class PartListXlsxImporter(AbstractPartListImporter):
+    """
+    Class for importing a part list from a sheet of the xlsx file, the active sheet by default.
+
+    The workbook is opened in read-only mode, so rows are streamed from the sheet one by one without loading
+    the whole sheet. Values are read as text, as from csv files. Values of the quantity column, if given,
+    are parsed to numbers once on import.
+    """
+
+    def __init__(self, source: PartListSource, imported_bom_header_position: HeaderPositions, filename: str = '',
+                 sheet_name: Optional[str] = None, quantity_column: Optional[str] = None):
+        self.source: PartListSource = source
+        self.filename: str = filename or (os.path.basename(source) if isinstance(source, str) else '')
+        self.imported_bom_header_position: HeaderPositions = imported_bom_header_position
+        self.sheet_name: Optional[str] = sheet_name
+        self.quantity_column: Optional[str] = quantity_column
+        self._header_row: list[str] = []
+        super().__init__()
+
+    def _read_part_list(self) -> list[list]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(get_workbook_buffer(self.source), read_only=True, data_only=True)
+        try:
+            worksheet = workbook[self.sheet_name] if self.sheet_name else workbook.active
+            sheet_rows = (row for row in worksheet.iter_rows(values_only=True)
+                          if any(value is not None and value != '' for value in row))
+            if self.imported_bom_header_position == 'bottom':
+                # The header is the last row, so rows are converted once the whole sheet is read
+                sheet_rows = list(sheet_rows)
+                header_row = sheet_rows.pop() if sheet_rows else None
+            else:
+                header_row = next(sheet_rows, None)
+            if header_row is None:
+                return []
+            self._set_header_row(header_row)
+            quantity_index = self._header_row.index(self.quantity_column) \
+                if self._header_row.count(self.quantity_column) == 1 else None
+            # Rows with the header at the top are converted while they are streamed from the sheet
+            rows = [self._convert_row(row, quantity_index) for row in sheet_rows]
+        finally:
+            workbook.close()
+        print(f"Imported {len(rows) + 1} items including header. ")
+        self.imported_part_list = rows
+        return rows
+
+    def _set_header_row(self, header_row: tuple) -> None:
+        """Sets column names from the header row of the sheet."""
+        header_row = list(header_row)
+        # Formatted but empty cells after the last column name are not part of the part list
+        while header_row and header_row[-1] in (None, ''):
+            header_row.pop()
+        # Column names are stripped, as offered by PartListXlsxSniffer
+        self._header_row = [get_cell_text(value).strip() for value in header_row]
+
+    def _convert_row(self, row: tuple, quantity_index: Optional[int]) -> list:
+        """Returns values of the sheet row under the header read as text, the quantity parsed to a number."""
+        columns_count = len(self._header_row)
+        values = row[:columns_count] + (None,) * (columns_count - len(row))
+        return [parse_quantity(value) if index == quantity_index else get_cell_text(value)
+                for index, value in enumerate(values)]
+
+    def _get_part_list_columns(self) -> list:
+        column_list = self._header_row
         self.imported_bom_columns = column_list
         return column_list
 
     def _get_imported_bom_source(self) -> ImportedBomSource:
         """Returns the representation of the imported source."""
-        filename = os.path.basename(self.filepath)
-        source = {'type': 'file', 'name': filename}
+        source = {'type': 'file', 'name': self.filename}
         return source
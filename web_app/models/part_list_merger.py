@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from web_app.exceptions import MergedColumnNotFound, MergedPositionConflict
+from web_app.functions import get_source_digest, get_row_digest
+from web_app.functions.functions import get_number_delimiter
+from web_app.models.bom import AbstractBom
+from web_app.models.part_list_importer import AbstractPartListImporter, PartListCsvImporter, PartListXlsxImporter
+from web_app.typing import MergedPartListSource
+
+
+class PartListMerger:
+    """
+    Class for merging part lists of several csv or xlsx sources, e.g. subassemblies exported separately, into one BOM.
+
+    Sources are parsed concurrently and merged in their order, each one as soon as it is parsed, so part lists
+    are never concatenated. Positions of a source are nested under its parent position. Sources repeated under
+    the same parent and rows already merged from previous sources are skipped by their content hash, while other
+    rows at positions of previous sources are reported as conflicts. Parts lacking columns of other sources
+    get empty values of these columns.
+    """
+
+    def __init__(self, sources: list[MergedPartListSource], position_column: str,
+                 quantity_column: Optional[str] = None, max_workers: Optional[int] = None):
+        self.sources: list[MergedPartListSource] = sources
+        self.position_column: str = position_column
+        self.quantity_column: Optional[str] = quantity_column
+        self.max_workers: Optional[int] = max_workers
+        self.source_digests: list[str] = []
+        self.duplicate_sources: list[str] = []
+        self.duplicate_row_count: int = 0
+
+    def merge_to(self, bom: AbstractBom) -> None:
+        """Merges part lists of all sources into the BOM, keeping columns of all sources."""
+        sources = self._get_unique_sources()
+        merged_columns = {column: None for column in bom.imported_bom_columns}
+        row_digests = set()
+        merged_positions = set()
+        max_workers = self.max_workers or min(len(sources), os.cpu_count() or 1) or 1
+        with ThreadPoolExecutor(max_workers) as executor:
+            for source, importer in zip(sources, executor.map(self._read_source, sources)):
+                self._nest_positions(importer, source)
+                importer.imported_part_list = self._skip_duplicate_rows(importer, source, row_digests,
+                                                                        merged_positions)
+                importer.import_to(bom)
+                merged_columns.update(dict.fromkeys(importer.imported_bom_columns))
+        bom.part_list.fill_missing_attributes(merged_columns)
+        bom.imported_bom_columns = list(merged_columns)
+
+    def _get_unique_sources(self) -> list[MergedPartListSource]:
+        """Returns sources with distinct content or parent position, in the given order."""
+        unique_sources = []
+        merged_sources = set()
+        for source in self.sources:
+            part_list_source = source['source']
+            if not isinstance(part_list_source, (str, bytes, bytearray, memoryview)) and \
+                    not part_list_source.seekable():
+                # Streams which cannot be read twice are hashed and parsed from memory
+                source = {**source, 'source': part_list_source.read()}
+            digest = get_source_digest(source['source'])
+            self.source_digests.append(digest)
+            if (digest, source.get('parent_position') or '') in merged_sources:
+                self.duplicate_sources.append(self._get_source_name(source))
+                continue
+            merged_sources.add((digest, source.get('parent_position') or ''))
+            unique_sources.append(source)
+        return unique_sources
+
+    def _read_source(self, source: MergedPartListSource) -> AbstractPartListImporter:
+        """Parses the part list of the source, as a workbook if the source name has the xlsx extension."""
+        if self._get_source_name(source).lower().endswith('.xlsx'):
+            return PartListXlsxImporter(source['source'], source.get('header_position', 'top'),
+                                        source.get('filename', ''), quantity_column=self.quantity_column)
+        layout = {key: source[key] for key in ('encoding', 'delimiter') if key in source}
+        return PartListCsvImporter(source['source'], source.get('header_position', 'top'), source.get('filename', ''),
+                                   quantity_column=self.quantity_column, **layout)
+
+    def _nest_positions(self, importer: AbstractPartListImporter, source: MergedPartListSource) -> None:
+        """Prefixes positions of the parsed part list with the parent position of its source."""
+        parent_position = source.get('parent_position')
+        if not parent_position:
+            return
+        if importer.imported_bom_columns.count(self.position_column) != 1:
+            raise MergedColumnNotFound(self.position_column, self._get_source_name(source))
+
+        column_index = importer.imported_bom_columns.index(self.position_column)
+        rows = importer.imported_part_list
+        # Nested positions keep the delimiter of the merged part list, or of the parent position
+        delimiter = next((delimiter for row in rows for delimiter in get_number_delimiter(row[column_index])),
+                         None) or next(iter(get_number_delimiter(parent_position)), '.')
+        for row in rows:
+            row[column_index] = f'{parent_position}{delimiter}{row[column_index].strip()}'
+
+    def _skip_duplicate_rows(self, importer: AbstractPartListImporter, source: MergedPartListSource,
+                             row_digests: set[bytes], merged_positions: set[str]) -> list[list]:
+        """
+        Returns rows of the parsed part list which have not been merged yet. Raises MergedPositionConflict
+        if another row has been merged at the position from previous sources.
+        """
+        columns = importer.imported_bom_columns
+        position_index = columns.index(self.position_column) if self.position_column in columns else None
+        rows = []
+        for row in importer.imported_part_list:
+            row_digest = get_row_digest(columns, row)
+            if row_digest in row_digests:
+                self.duplicate_row_count += 1
+                continue
+            if position_index is not None and row[position_index].strip() in merged_positions:
+                raise MergedPositionConflict(row[position_index].strip(), self._get_source_name(source))
+            row_digests.add(row_digest)
+            rows.append(row)
+        # Positions repeated within a source are reported by the part list validation
+        if position_index is not None:
+            merged_positions.update(row[position_index].strip() for row in importer.imported_part_list)
+        return rows
+
+    @staticmethod
+    def _get_source_name(source: MergedPartListSource) -> str:
+        """Returns the name of the source shown to users."""
+        part_list_source = source['source']
+        return source.get('filename') or (os.path.basename(part_list_source) if isinstance(part_list_source, str)
+                                          else '')
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import csv
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from web_app.assets.data.data import (part_position_keywords, part_quantity_keywords, part_number_keywords,
+                                      part_name_keywords, part_supplier_keywords)
+from web_app.functions import decode_sample, find_keyword_column, read_head_and_tail, get_workbook_buffer, \
+    get_cell_text
+from web_app.typing import HeaderPositions, PartListSource, SniffedPartList
+
+COLUMN_KEYWORDS = {
+    'position': part_position_keywords,
+    'quantity': part_quantity_keywords,
+    'number': part_number_keywords,
+    'name': part_name_keywords,
+    'supplier': part_supplier_keywords,
+}
+
+
+class AbstractPartListSniffer(ABC):
+    """Abstract class for detecting the layout of a part list without reading the whole source."""
+
+    def __init__(self, source: PartListSource):
+        self.source: PartListSource = source
+
+    @abstractmethod
+    def sniff(self, header_position: Optional[HeaderPositions] = None) -> SniffedPartList:
+        """Detects the layout of a part list. The header position is detected if not provided."""
+        ...
+
+    @staticmethod
+    def _count_keyword_matches(row: list[str]) -> int:
+        """Returns the number of cells matching any of the column keywords."""
+        keywords = [keyword for column_keywords in COLUMN_KEYWORDS.values() for keyword in column_keywords]
+        return sum(any(keyword in cell.lower() for keyword in keywords) for cell in row)
+
+    def _detect_header_position(self, first_row: list[str], last_row: list[str]) -> HeaderPositions:
+        """Returns the position of the row that looks more like a header."""
+        first_row_score = (self._count_keyword_matches(first_row), -sum(cell.isdigit() for cell in first_row))
+        last_row_score = (self._count_keyword_matches(last_row), -sum(cell.isdigit() for cell in last_row))
+        return 'bottom' if last_row_score > first_row_score else 'top'
+
+    @staticmethod
+    def _preselect_columns(columns: list[str]) -> dict[str, Optional[str]]:
+        """Returns the columns that most likely store the part position, quantity, number, name and supplier."""
+        preselected_columns = {}
+        for column_name, keywords in COLUMN_KEYWORDS.items():
+            preselected_columns[column_name] = find_keyword_column(columns, keywords,
+                                                                   list(preselected_columns.values()))
+        return preselected_columns
+
+
+class PartListCsvSniffer(AbstractPartListSniffer):
+    """Class for detecting the layout of a csv part list by reading only its head and tail."""
+    encodings = ['utf-8-sig', 'cp1250']
+    delimiters = ',;\t|'
+    sample_size = 64 * 1024
+
+    def sniff(self, header_position: Optional[HeaderPositions] = None) -> SniffedPartList:
+        head, tail = read_head_and_tail(self.source, self.sample_size)
+        sample, encoding = decode_sample(head + b'\n' + tail, self.encodings)
+        lines = sample.splitlines()
+        try:
+            delimiter = csv.Sniffer().sniff(sample[:len(head)], delimiters=self.delimiters).delimiter
+        except csv.Error:
+            delimiter = ','
+
+        first_row, last_row = csv.reader([lines[0], lines[-1]], delimiter=delimiter, skipinitialspace=True)
+        header_position = header_position or self._detect_header_position(first_row, last_row)
+        columns = [column.strip() for column in (last_row if header_position == 'bottom' else first_row)]
+        return {
+            'encoding': encoding,
+            'delimiter': delimiter,
+            'header_position': header_position,
+            'columns': columns,
+            'preselected_columns': self._preselect_columns(columns),
+        }
+
+
+class PartListXlsxSniffer(AbstractPartListSniffer):
+    """
+    Class for detecting the layout of a part list in the active sheet of the xlsx file.
+    Rows are streamed in read-only mode, keeping only the first and the last one which is not empty.
+    """
+
+    def sniff(self, header_position: Optional[HeaderPositions] = None) -> SniffedPartList:
+        from openpyxl import load_workbook
+
+        position = None if isinstance(self.source, (str, bytes, bytearray, memoryview)) else self.source.tell()
+        workbook = load_workbook(get_workbook_buffer(self.source), read_only=True, data_only=True)
+        try:
+            first_row = last_row = ()
+            for row in workbook.active.iter_rows(values_only=True):
+                if any(value is not None and value != '' for value in row):
+                    first_row = first_row or row
+                    last_row = row
+        finally:
+            workbook.close()
+            if position is not None:
+                self.source.seek(position)
+
+        first_row, last_row = ([get_cell_text(value).strip() for value in row] for row in (first_row, last_row))
+        header_position = header_position or self._detect_header_position(first_row, last_row)
+        columns = last_row if header_position == 'bottom' else first_row
+        while columns and not columns[-1]:
+            columns.pop()
+        return {
+            'encoding': 'utf-8',
+            'delimiter': '',
+            'header_position': header_position,
+            'columns': columns,
+            'preselected_columns': self._preselect_columns(columns),
+        }
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+from web_app.typing import PartListProblem
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from web_app.models import AbstractBom, AbstractPart, SqliteBom
+
+MANDATORY_PART_COLUMNS = {
+    'position_column': 'Part position',
+    'quantity_column': 'Part quantity',
+    'number_column': 'Part number',
+    'name_column': 'Part name',
+}
+NOT_EMPTY_PART_COLUMNS = ['position_column', 'quantity_column', 'number_column']
+
+
+class PartListValidator:
+    """
+    Class for validating all Parts of the BOM at once, before any processing step runs.
+    Values of Parts are checked with vectorized operations, so every problem is found in a single pass.
+    """
+
+    def __init__(self, bom: AbstractBom):
+        self.bom = bom
+
+    def validate(self) -> list[PartListProblem]:
+        """Returns all problems found in the part list, ordered by rows."""
+        problems = self._get_column_problems()
+        if problems:
+            return problems
+
+        df = self._get_part_values(list(self.bom.part_list))
+        problems += self._get_empty_value_problems(df)
+        problems += self._get_delimiter_problems(df)
+        problems += self._get_quantity_problems(df)
+        problems += self._get_duplicate_position_problems(df)
+        problems += self._get_missing_parent_problems(df)
+        return sorted(problems, key=lambda problem: problem['row'])
+
+    def _get_column_problems(self) -> list[PartListProblem]:
+        """Returns problems of mandatory column names which are not set."""
+        column_names = self.bom.column_schema.get_columns()
+        return [{'row': 0, 'position': '', 'column': column_name,
+                 'message': f'The name of the {column_name} column must be set.'}
+                for column, column_name in MANDATORY_PART_COLUMNS.items()
+                if not column_names[column]]
+
+    def _get_part_values(self, parts: list[AbstractPart]) -> pd.DataFrame:
+        """Returns a DataFrame of mandatory values of Parts, read in a single pass."""
+        import pandas as pd
+
+        column_names = self.bom.column_schema.get_columns()
+        values = {column: [] for column in MANDATORY_PART_COLUMNS}
+        for part in parts:
+            attributes = vars(part)
+            for column, column_values in values.items():
+                column_values.append(attributes.get(column_names[column]))
+        df = pd.DataFrame(values, dtype=object)
+        # Quantities parsed on import are numbers already, only remaining text values need checking
+        df['_is_quantity_parsed'] = df['quantity_column'].map(lambda value: isinstance(value, (int, Decimal)))
+        df[list(MANDATORY_PART_COLUMNS)] = df[list(MANDATORY_PART_COLUMNS)].fillna('').astype(str)
+        df.index = range(1, len(df) + 1)
+        return df
+
+    @staticmethod
+    def _get_problems(df: pd.DataFrame, mask: pd.Series, column: str, message: str) -> list[PartListProblem]:
+        """Returns problems of rows selected by the mask."""
+        return [{'row': row, 'position': position, 'column': MANDATORY_PART_COLUMNS[column],
+                 'message': message.format(value=value)}
+                for row, position, value in zip(df.index[mask], df['position_column'][mask], df[column][mask])]
+
+    def _get_empty_value_problems(self, df: pd.DataFrame) -> list[PartListProblem]:
+        """Returns problems of empty values of mandatory columns."""
+        problems = []
+        for column in NOT_EMPTY_PART_COLUMNS:
+            problems += self._get_problems(df, df[column].str.strip() == '', column,
+                                           f'{MANDATORY_PART_COLUMNS[column]} is empty.')
+        return problems
+
+    def _get_delimiter_problems(self, df: pd.DataFrame) -> list[PartListProblem]:
+        """Returns problems of positions with more than one kind of delimiter between numbers."""
+        delimiters = df['position_column'].str.strip().str.replace(r'\d', '', regex=True)
+        mask = (delimiters != '') & ~delimiters.str.match(r'^(.)\1*$')
+        return self._get_problems(df, mask, 'position_column',
+                                  'Only one delimiter of the "Part position" is allowed, found: "{value}".')
+
+    def _get_quantity_problems(self, df: pd.DataFrame) -> list[PartListProblem]:
+        """Returns problems of quantities which are not integer numbers."""
+        quantities = df['quantity_column']
+        mask = ~df['_is_quantity_parsed'] & (quantities.str.strip() != '') & \
+            ~quantities.str.match(r'^\s*[+-]?\d+\s*$')
+        return self._get_problems(df, mask, 'quantity_column', 'Quantity "{value}" is not a number.')
+
+    def _get_duplicate_position_problems(self, df: pd.DataFrame) -> list[PartListProblem]:
+        """Returns problems of positions used by more than one Part."""
+        positions = df['position_column']
+        mask = (positions.str.strip() != '') & positions.duplicated(keep=False)
+        return self._get_problems(df, mask, 'position_column', 'Position "{value}" is not unique.')
+
+    def _get_missing_parent_problems(self, df: pd.DataFrame) -> list[PartListProblem]:
+        """Returns problems of nested positions which parent position does not exist."""
+        positions = df['position_column']
+        # Parent position is everything before the last delimiter, as in AbstractPart.parent_id
+        parent_positions = positions.str.strip().str.extract(r'^(.*)\D', expand=False)
+        mask = parent_positions.notna() & ~parent_positions.isin(set(positions))
+        return self._get_problems(df, mask, 'position_column', 'Parent of the position "{value}" does not exist.')
+
+
+class SqlitePartListValidator(PartListValidator):
+    """
+    Class for validating all Parts of the SQLite BOM at once, with queries run by the database.
+    Quantities are parsed when Parts are stored, so decimal quantities are valid as they are when parsed on import.
+    Parents of positions with more than one kind of delimiter are not looked up, such positions are invalid already.
+    """
+    bom: SqliteBom
+
+    def validate(self) -> list[PartListProblem]:
+        """Returns all problems found in the part list, ordered by rows."""
+        problems = self._get_column_problems()
+        if problems:
+            return problems
+
+        part_list = self.bom.part_list
+        position = part_list.get_part_column('position_column')
+        conditions = [(column, f"trim(COALESCE({part_list.get_part_column(column)}, '')) = ''",
+                       f'{MANDATORY_PART_COLUMNS[column]} is empty.') for column in NOT_EMPTY_PART_COLUMNS]
+        conditions += [
+            ('position_column', f'get_position_delimiter_count({position}) > 1',
+             'Only one delimiter of the "Part position" is allowed, found: "{value}".'),
+            ('quantity_column', f"quantity IS NULL AND trim(COALESCE({part_list.get_part_column('quantity_column')}, "
+                                f"'')) <> ''", 'Quantity "{value}" is not a number.'),
+            ('position_column', f"trim({position}) <> '' AND {position} IN "
+                                f"(SELECT {position} FROM parts GROUP BY {position} HAVING COUNT(*) > 1)",
+             'Position "{value}" is not unique.'),
+            ('position_column', f'parent_position IS NOT NULL AND NOT EXISTS (SELECT 1 FROM parts AS parent '
+                                f'WHERE parent.{position} = parts.parent_position)',
+             'Parent of the position "{value}" does not exist.'),
+        ]
+        for column, condition, message in conditions:
+            rows = part_list.execute(f'SELECT id, {position}, {part_list.get_part_column(column)} FROM parts '
+                                     f'WHERE {condition}')
+            problems += [{'row': part_id, 'position': self._get_text(part_position),
+                          'column': MANDATORY_PART_COLUMNS[column],
+                          'message': message.format(value=self._get_text(value))}
+                         for part_id, part_position, value in rows]
+        if problems:
+            # Rows are numbered as in the imported part list, ids of deleted Parts are skipped
+            row_numbers = self._get_row_numbers({problem['row'] for problem in problems})
+            for problem in problems:
+                problem['row'] = row_numbers[problem['row']]
+        return sorted(problems, key=lambda problem: problem['row'])
+
+    def _get_row_numbers(self, part_ids: set[int]) -> dict[int, int]:
+        """Returns row numbers of stored Parts by their ids, read in a single pass over the ids."""
+        cursor = self.bom.part_list.execute('SELECT id FROM parts ORDER BY id')
+        return {part_id: row for row, (part_id,) in enumerate(cursor, start=1) if part_id in part_ids}
+
+    @staticmethod
+    def _get_text(value) -> str:
+        """Returns the stored value as shown in problems."""
+        return '' if value is None else str(value)
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from collections.abc import Iterable, Iterator
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
-from web_app.functions.functions import sort_by_type_and_number
+from web_app.functions.functions import get_part_sort_key, sort_by_type_and_number
+from web_app.models.subtree_index import SubtreeIndex
+from web_app.typing import TreeRow
 
 if TYPE_CHECKING:
     from web_app.models import AbstractPart
@@ -13,6 +15,7 @@ if TYPE_CHECKING:
 class PartsCollection(Iterable):
     def __init__(self, part_list: list[AbstractPart] = None) -> None:
         self._collection = part_list
+        self._subtree_index: SubtreeIndex | None = None
 
     def __iter__(self) -> DefaultOrderIterator:
         return DefaultOrderIterator(self._collection)
@@ -25,20 +28,92 @@ class PartsCollection(Iterable):
         if self._collection is None:
             self._collection = []
         self._collection.append(part)
+        self.invalidate_tree_order()
+
+    def add_parts(self, parts: list[AbstractPart]):
+        """Adds multiple Parts to the Parts collection at once."""
+        if self._collection is None:
+            self._collection = list(parts)
+        else:
+            self._collection.extend(parts)
+        self.invalidate_tree_order()
+
+    def fill_missing_attributes(self, attributes: Iterable[str], value='') -> None:
+        """Sets the value of attributes which Parts do not have, e.g. columns of other merged part lists."""
+        attributes = list(attributes)
+        for part in self._collection or []:
+            for attribute in attributes:
+                if not hasattr(part, attribute):
+                    setattr(part, attribute, value)
 
     def get_tree_part_list(self):
         """Returns tree list iterator."""
-        return TreeOrderIterator(self._collection)
+        return iter(self.get_tree_order())
+
+    def get_tree_order(self) -> list[AbstractPart]:
+        """Returns a list of Parts sorted as tree, cached until the Parts collection is modified."""
+        return self.get_subtree_index().tree_order
+
+    def get_subtree_index(self) -> SubtreeIndex:
+        """Returns the subtree index of Parts in tree order, cached until the Parts collection is modified."""
+        if self._subtree_index is None:
+            self._subtree_index = SubtreeIndex(list(TreeOrderIterator(self._collection)))
+        return self._subtree_index
+
+    def get_tree_rows(self, offset: int = 0, limit: Optional[int] = None) -> list[TreeRow]:
+        """Returns a page of Parts in tree order."""
+        return list(self.iter_tree_rows(max(offset, 0), None if limit is None else offset + limit))
+
+    def iter_tree_rows(self, start: int = 0, end: Optional[int] = None) -> Iterator[TreeRow]:
+        """Yields Parts between tree order indexes with their positions in the tree."""
+        tree_order = self.get_tree_order()
+        end = len(tree_order) if end is None else min(end, len(tree_order))
+        for index in range(start, end):
+            yield self._get_tree_row(index)
+
+    def get_subtree_bounds(self, subtree_root: Optional[AbstractPart] = None) -> tuple[int, int]:
+        """Returns tree order indexes where the subtree of the root Part starts and ends, or bounds of the tree."""
+        subtree_index = self.get_subtree_index()
+        if subtree_root is None:
+            return 0, len(subtree_index)
+        return subtree_index.get_enter(subtree_root), subtree_index.get_exit(subtree_root)
+
+    def get_max_depth(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the deepest nesting level of Parts between tree order indexes, or -1 if there are no Parts."""
+        return max(self.get_subtree_index().depths[start:end], default=-1)
+
+    def get_tree_children(self, index: int, offset: int = 0, limit: Optional[int] = None) -> list[TreeRow]:
+        """Returns a page of children of the Part at the tree order index."""
+        subtree_index = self.get_subtree_index()
+        if not 0 <= index < len(subtree_index):
+            raise IndexError(f'Tree order index {index} is out of range.')
+        children_indexes = subtree_index.get_children_indexes(index)
+        end = None if limit is None else offset + limit
+        return [self._get_tree_row(child_index) for child_index in children_indexes[offset:end]]
+
+    def invalidate_tree_order(self) -> None:
+        """Clears the cached tree order after Parts are added or processed."""
+        self._subtree_index = None
+
+    def _get_tree_row(self, index: int) -> TreeRow:
+        """Returns the Part at the tree order index with its position in the tree."""
+        subtree_index = self.get_subtree_index()
+        part = subtree_index.tree_order[index]
+        return {'index': index, 'depth': subtree_index.depths[index], 'child_count': len(part.child or []),
+                'part': part}
 
 
 class AbstractPartListIterator(ABC, Iterator):
     def __init__(self, part_list: list[AbstractPart]):
         self._collection = part_list
         self._position = 0
+        self._ordered_parts: list[AbstractPart] | None = None
 
     def __next__(self):
+        if self._ordered_parts is None:
+            self._ordered_parts = self._iteration_list
         try:
-            value = self._iteration_list[self._position]
+            value = self._ordered_parts[self._position]
             self._position += 1
         except IndexError:
             raise StopIteration()
@@ -76,8 +151,9 @@ class PartNumberOrderIterator(AbstractPartListIterator):
 
     @property
     def _iteration_list(self) -> list[AbstractPart]:
-        """Returns a list of Parts sorted by 'Part number'."""
-        return sorted(self._collection, key=lambda part: part.number, reverse=False)
+        """Returns a list of Parts sorted by 'Part number' and 'Position'."""
+        sort_keys = get_sort_keys(self.collection)
+        return sorted(self.collection, key=lambda part: sort_keys[id(part)][1:])
 
 
 class TreeOrderIterator(AbstractPartListIterator):
@@ -86,15 +162,23 @@ class TreeOrderIterator(AbstractPartListIterator):
 
     @property
     def _iteration_list(self) -> list[AbstractPart]:
-        """Returns a list of Parts sorted as tree by 'Part number' and 'Type'."""
-        initial_bom_tree_list = [part for part in self.collection if not part.parent]
-        bom_tree_list = sorted(initial_bom_tree_list, key=lambda part: part.number)
-        last_generation = 20
-        for generation in range(1, last_generation):
-            for part in bom_tree_list:
-                part_generation = len(part.position.split(part.get_pos_delimiter()))
-                if part_generation == generation:
-                    child_bom = sort_by_type_and_number(part.child)
-                    for item in child_bom:
-                        bom_tree_list.insert(bom_tree_list.index(part) + 1, item)
+        """
+        Returns a list of Parts sorted as tree. Top-level Parts are sorted by 'Part number',
+        children of each Part by 'Type', 'Part number' and 'Position'.
+        """
+        sort_keys = get_sort_keys(self.collection)
+        top_level_parts = sorted((part for part in self.collection if not part.parent),
+                                 key=lambda part: sort_keys[id(part)][1:])
+        bom_tree_list = []
+        parts_to_visit = top_level_parts[::-1]
+        while parts_to_visit:
+            part = parts_to_visit.pop()
+            bom_tree_list.append(part)
+            if part.child:
+                parts_to_visit.extend(sort_by_type_and_number(part.child, sort_keys)[::-1])
         return bom_tree_list
+
+
+def get_sort_keys(part_list: list[AbstractPart]) -> dict[int, tuple]:
+    """Returns sort keys of Parts computed once per Part, mapped by Part identity."""
+    return {id(part): get_part_sort_key(part) for part in part_list}
@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+import copy
+import os
 from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 
+from .bom import AbstractBom
 from .bom_processor import BomProcessor
-from ..functions import (prepare_and_finish_processing)
+from .parts_collection import PartsCollection
+from ..functions import (prepare_and_finish_processing, split_into_subtrees, group_into_batches,
+                         resolve_processing_steps)
 
 
 class AbstractProcessorDirector:
@@ -18,27 +27,112 @@ class AbstractProcessorDirector:
 
 
 class FullFeatureProcessorDirector(AbstractProcessorDirector):
-    """Class for Process Director to process the Part list with all available features."""
+    """
+    Class for Process Director to process the Part list with all available features.
+    If requested columns are given, only steps needed to produce them are run.
+    """
+    linking_steps = [
+        'set_parent',
+        'set_child',
+    ]
+    processing_steps = [
+        'set_sets',
+        'set_to_order',
+        'set_is_production',
+        'set_is_fastener',
+        'set_is_purchased',
+        'set_file_type',
+        'set_is_junk_by_keywords',
+        'set_is_junk_by_empty_fields',
+        'set_is_junk_by_purchased_part_nesting',
+        'set_is_junk',
+        'set_type',
+        'set_parent_assembly',
+        'set_normalized_names',
+    ]
+    aggregation_steps = [
+        'set_purchase_list',
+    ]
 
-    def __init__(self, processor: BomProcessor):
+    def __init__(self, processor: BomProcessor, requested_columns: Optional[list[str]] = None):
         super().__init__(processor)
+        self.requested_columns = requested_columns
+
+    def get_steps(self, steps: list[str]) -> list[str]:
+        """Returns steps to be run, skipping steps which outputs are not requested."""
+        if self.requested_columns is None:
+            return steps
+        all_steps = self.linking_steps + self.processing_steps + self.aggregation_steps
+        resolved_steps = resolve_processing_steps(self.processor.bom_modifiers, all_steps, self.requested_columns)
+        return [step for step in steps if step in resolved_steps]
 
     @prepare_and_finish_processing
     def run_processing(self) -> None:
         """Runs Processor with all available functionalities"""
+        for step in self.get_steps(self.linking_steps + self.processing_steps + self.aggregation_steps):
+            getattr(self.processor.bom_modifiers, step)()
+
+
+class ParallelProcessorDirector(FullFeatureProcessorDirector):
+    """
+    Class for Process Director to process the Part list with all available features in a process pool.
+    After linking, every top-level subtree is independent, so subtrees are processed in separate processes
+    and merged back in the original order of the Part list. Aggregation steps run on the merged Part list.
+    """
+
+    def __init__(self, processor: BomProcessor, max_workers: Optional[int] = None,
+                 requested_columns: Optional[list[str]] = None):
+        super().__init__(processor, requested_columns)
+        self.max_workers = max_workers
+
+    @prepare_and_finish_processing
+    def run_processing(self) -> None:
+        """Runs linking steps in the current process and remaining steps for batches of subtrees in a process pool."""
+        # Subtrees are split by Part links, so linking steps are always run
+        for step in self.linking_steps:
+            getattr(self.processor.bom_modifiers, step)()
+
+        part_list = list(self.processor.processed_part_list)
+        max_workers = self.max_workers or os.cpu_count() or 1
+        batches = group_into_batches(split_into_subtrees(part_list), max_workers * 4)
+        with ProcessPoolExecutor(max_workers) as executor:
+            subtree_bom = self._get_subtree_bom()
+            processor_attributes = self._get_processor_attributes()
+            processed_batches = executor.map(_process_subtrees, [subtree_bom] * len(batches),
+                                             [processor_attributes] * len(batches),
+                                             [[part_list[index] for index in batch] for batch in batches],
+                                             [self.get_steps(self.processing_steps)] * len(batches))
+            # Unpickled Parts carry copies of the column schema, so they are attached to the BOM schema again
+            column_schema = self.processor.bom.column_schema
+            for batch, processed_parts in zip(batches, processed_batches):
+                for index, part in zip(batch, processed_parts):
+                    part._column_schema = column_schema
+                    part_list[index] = part
+        self.processor.bom.value_dictionary.encode_parts(part_list)
+
+        self.processor.processed_part_list = PartsCollection(part_list)
+        for step in self.get_steps(self.aggregation_steps):
+            getattr(self.processor.bom_modifiers, step)()
+
+    def _get_subtree_bom(self) -> AbstractBom:
+        """Returns a copy of the processed BOM without Parts, to be sent to worker processes."""
+        subtree_bom = copy.copy(self.processor.bom)
+        subtree_bom.part_list = PartsCollection()
+        return subtree_bom
+
+    def _get_processor_attributes(self) -> dict:
+        """Returns processor settings to be sent to worker processes."""
+        excluded_attributes = ['bom', 'initial_part_list', 'processed_part_list', 'processing_succeeded',
+                               'bom_modifiers', 'purchase_list']
+        return {key: value for key, value in vars(self.processor).items() if key not in excluded_attributes}
+
 
-        self.processor.bom_modifiers.set_parent()
-        self.processor.bom_modifiers.set_child()
-        self.processor.bom_modifiers.set_sets()
-        self.processor.bom_modifiers.set_to_order()
-        self.processor.bom_modifiers.set_is_production()
-        self.processor.bom_modifiers.set_is_fastener()
-        self.processor.bom_modifiers.set_is_purchased()
-        self.processor.bom_modifiers.set_file_type()
-        self.processor.bom_modifiers.set_is_junk_by_keywords()
-        self.processor.bom_modifiers.set_is_junk_by_empty_fields()
-        self.processor.bom_modifiers.set_is_junk_by_purchased_part_nesting()
-        self.processor.bom_modifiers.set_is_junk()
-        self.processor.bom_modifiers.set_type()
-        self.processor.bom_modifiers.set_parent_assembly()
-        self.processor.bom_modifiers.set_normalized_names()
+def _process_subtrees(bom: AbstractBom, processor_attributes: dict, part_list: list,
+                      processing_steps: list[str]) -> list:
+    """Runs processing steps for a linked list of Parts within a worker process."""
+    processor = BomProcessor(bom)
+    processor.set_attributes_from_kwargs(**processor_attributes)
+    processor.processed_part_list = PartsCollection(part_list)
+    for step in processing_steps:
+        getattr(processor.bom_modifiers, step)()
+    return part_list
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+from ..exceptions import QuantityColumnIsNotDigit
+from ..functions import get_loaded_quantity
+from ..functions.functions import create_keyword_list, normalize_string_cached, part_list_modifier, processing_step
+from ..typing import PartTypes, PurchaseListItem
+from .bom_processor_methods import get_is_fastener, get_purchase_list_requirements
+from .part_flags import PartFlags, PART_TYPE_FLAGS, PART_TYPES_BY_FLAGS
+from .sqlite_parts_collection import PART_BATCH_SIZE, PROCESSED_COLUMNS
+
+if TYPE_CHECKING:
+    from . import BomProcessor
+    from .sqlite_parts_collection import SqlitePartsCollection
+
+# Product of quantities computed by SQLite for integers, by Python for decimals stored as text
+MULTIPLIED_QUANTITIES = "CASE WHEN typeof({0}) = 'integer' AND typeof({1}) = 'integer' THEN {0} * {1} " \
+                        "ELSE multiply_quantities({0}, {1}) END"
+# Values of Parts are passed to functions in JSON arrays of chunks, as functions take at most 127 arguments
+FUNCTION_ARGUMENT_CHUNK_SIZE = 100
+# Functions of Part values called by processing queries
+PROCESSING_SQL_FUNCTIONS = {
+    'get_is_fastener': lambda values: get_is_fastener(value for chunk in json.loads(values) for value in chunk),
+    'get_part_type': lambda flags: PART_TYPES_BY_FLAGS[flags & PART_TYPE_FLAGS],
+    'normalize_string': normalize_string_cached,
+}
+
+
+class SqliteProcessorMethods:
+    """
+    Class that stores the part list processing methods of Parts stored in SQLite.
+    Each method runs the processing step of ProcessorMethods as set-based queries over all Parts,
+    so Parts are never loaded into memory, except for aggregating the purchase list.
+    """
+
+    def __init__(self, processor: BomProcessor):
+        self.processor = processor
+
+    @processing_step(['parent'])
+    @part_list_modifier
+    def set_parent(self, part_list: SqlitePartsCollection) -> None:
+        """Sets each Part's parent, the first Part at the parent position, found by the indexed position column."""
+        position = part_list.get_part_column('position_column')
+        part_list.execute(f'UPDATE parts SET parent_id = (SELECT MIN(parent.id) FROM parts AS parent '
+                          f'WHERE parent.{position} = parts.parent_position)')
+
+    @processing_step(['child'])
+    @part_list_modifier
+    def set_child(self, part_list: SqlitePartsCollection) -> None:
+        """Sets the number of each Part's children, found by the indexed parent position."""
+        position = part_list.get_part_column('position_column')
+        part_list.execute(f'UPDATE parts SET child_count = (SELECT COUNT(*) FROM parts AS child '
+                          f'WHERE child.parent_position = parts.{position})')
+
+    @processing_step(['sets'], requires=['parent'])
+    @part_list_modifier
+    def set_sets(self, part_list: SqlitePartsCollection) -> None:
+        """Sets the quantity of Part sets to order, multiplied down the tree from top-level Parts."""
+        self._check_quantities(part_list, 'id IN (SELECT parent_id FROM parts)')
+        part_list.execute(f"""
+            WITH RECURSIVE part_sets (id, sets, quantity) AS (
+                SELECT id, ?, quantity FROM parts WHERE parent_id IS NULL
+                UNION ALL
+                SELECT parts.id, {MULTIPLIED_QUANTITIES.format('part_sets.sets', 'part_sets.quantity')},
+                    parts.quantity
+                FROM part_sets JOIN parts ON parts.parent_id = part_sets.id
+            )
+            UPDATE parts SET sets = part_sets.sets FROM part_sets WHERE parts.id = part_sets.id
+        """, (self.processor.bom.main_assembly_sets,))
+
+    @processing_step(['to_order'], requires=['sets'])
+    @part_list_modifier
+    def set_to_order(self, part_list: SqlitePartsCollection) -> None:
+        """Sets the total quantity of each Part to order."""
+        self._check_quantities(part_list)
+        part_list.execute(f'UPDATE parts SET to_order = {MULTIPLIED_QUANTITIES.format("quantity", "sets")}')
+
+    @processing_step(['file_type'], requires=['child', 'is_production'])
+    @part_list_modifier
+    def set_file_type(self, part_list: SqlitePartsCollection) -> None:
+        """Sets a file type of each Part."""
+        part_list.execute(f"UPDATE parts SET file_type = CASE WHEN child_count > 0 "
+                          f"AND flags & {PartFlags.PRODUCTION} THEN 'assembly' ELSE 'part' END")
+
+    @processing_step(['type'], requires=['is_junk', 'is_production', 'is_fastener', 'is_purchased'])
+    @part_list_modifier
+    def set_type(self, part_list: SqlitePartsCollection) -> None:
+        """Sets the type of each Part, looked up by its type flags."""
+        self._create_functions(part_list)
+        part_list.execute('UPDATE parts SET type = get_part_type(flags)')
+
+    @processing_step(['is_production'])
+    @part_list_modifier
+    def set_is_production(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts of 'production' type based on provided keywords."""
+        keywords = create_keyword_list(self.processor.production_part_keywords) or []
+        number = part_list.get_part_column('number_column')
+        condition = ' OR '.join([f'instr({number}, ?) > 0'] * len(keywords)) or '0'
+        self._set_flag(part_list, PartFlags.PRODUCTION, condition, keywords)
+
+    @processing_step(['is_fastener'])
+    @part_list_modifier
+    def set_is_fastener(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts of 'fastener' type based on keywords, matching all values of each Part."""
+        self._create_functions(part_list)
+        columns = PROCESSED_COLUMNS + [part_list.get_column(attribute) for attribute in part_list.attributes]
+        chunks = [f'json_array({", ".join(columns[index:index + FUNCTION_ARGUMENT_CHUNK_SIZE])})'
+                  for index in range(0, len(columns), FUNCTION_ARGUMENT_CHUNK_SIZE)]
+        self._set_flag(part_list, PartFlags.FASTENER, f'get_is_fastener(json_array({", ".join(chunks)}))')
+
+    @processing_step(['is_purchased'], requires=['is_production', 'is_fastener'])
+    @part_list_modifier
+    def set_is_purchased(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts of 'purchased' type. It could be only if it's not "production" or "fastener"."""
+        self._set_flag(part_list, PartFlags.PURCHASED, f'NOT flags & {PartFlags.PRODUCTION | PartFlags.FASTENER}')
+
+    @processing_step(['parent_assembly'], requires=['parent'])
+    @part_list_modifier
+    def set_parent_assembly(self, part_list: SqlitePartsCollection) -> None:
+        """Sets the number of each Part's parent, or the main assembly name for top-level Parts."""
+        number = part_list.get_part_column('number_column')
+        part_list.execute(f'UPDATE parts SET parent_assembly = CASE WHEN parent_id IS NULL THEN ? '
+                          f'ELSE (SELECT parent.{number} FROM parts AS parent WHERE parent.id = parts.parent_id) END',
+                          (self.processor.bom.main_assembly_name,))
+
+    @processing_step(['is_junk_by_keywords'])
+    @part_list_modifier
+    def set_is_junk_by_keywords(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts of 'junk' type based by provided keywords."""
+        keywords = create_keyword_list(self.processor.junk_part_keywords) or []
+        name = part_list.get_part_column('name_column')
+        number = part_list.get_part_column('number_column')
+        condition = ' OR '.join([f'instr({name}, ?) > 0 OR instr({number}, ?) > 0'] * len(keywords)) or '0'
+        self._set_flag(part_list, PartFlags.JUNK_BY_KEYWORDS, condition,
+                       [keyword for keyword in keywords for _ in range(2)])
+
+    @processing_step(['is_junk_by_empty_fields'])
+    @part_list_modifier
+    def set_is_junk_by_empty_fields(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts as "junk" if all specified fields are empty."""
+        fields = create_keyword_list(self.processor.junk_part_empty_fields) or []
+        # Values are empty as in Python, except for text values which are not empty strings
+        conditions = [f"COALESCE({part_list.get_column(field)} NOT IN ('', 0), 0)" for field in fields]
+        self._set_flag(part_list, PartFlags.JUNK_BY_EMPTY_FIELDS,
+                       f'NOT ({" OR ".join(conditions)})' if conditions else '0')
+
+    @processing_step(['is_junk_by_purchased_part_nesting'], requires=['parent', 'child', 'is_production'])
+    @part_list_modifier
+    def set_is_junk_by_purchased_part_nesting(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts nested anywhere in a Part that is not a 'Production' type, found down the tree by a query."""
+        flag = PartFlags.JUNK_BY_PURCHASED_PART_NESTING
+        part_list.execute(f"""
+            WITH RECURSIVE nested_parts (id) AS (
+                SELECT id FROM parts WHERE parent_id IN (SELECT id FROM parts WHERE NOT flags & {PartFlags.PRODUCTION})
+                UNION
+                SELECT parts.id FROM nested_parts JOIN parts ON parts.parent_id = nested_parts.id
+            )
+            UPDATE parts SET flags = CASE WHEN id IN nested_parts THEN flags | {flag} ELSE flags & ~{flag} END,
+                assigned_flags = assigned_flags | {flag}
+        """)
+
+    @processing_step(['is_junk'],
+                     requires=['is_junk_by_keywords', 'is_junk_by_empty_fields', 'is_junk_by_purchased_part_nesting'])
+    @part_list_modifier
+    def set_is_junk(self, part_list: SqlitePartsCollection) -> None:
+        """Flags Parts for which any 'is_junk' condition is True."""
+        self._set_flag(part_list, PartFlags.JUNK, f'flags & {PartFlags.JUNK_CONDITIONS}')
+
+    @processing_step(lambda processor: processor.normalized_columns or [])
+    @part_list_modifier
+    def set_normalized_names(self, part_list: SqlitePartsCollection) -> None:
+        """Normalizes names of chosen BOM columns, normalizing each distinct name of a column once."""
+        self._create_functions(part_list)
+        for key in self.processor.normalized_columns:
+            column = part_list.get_column(key)
+            if column != 'NULL':
+                part_list.execute(f"UPDATE parts SET {column} = normalize_string({column}) "
+                                  f"WHERE typeof({column}) = 'text'")
+
+    @processing_step(['purchase_list'], requires=get_purchase_list_requirements)
+    @part_list_modifier
+    def set_purchase_list(self, part_list: SqlitePartsCollection) -> None:
+        """Sets quantities to order summed up by 'Part number' and optionally 'Supplier', split by type."""
+        supplier_column = self.processor.supplier_column
+        supplier = part_list.get_column(supplier_column) if supplier_column else 'NULL'
+        number, name, position = (part_list.get_part_column(column)
+                                  for column in ('number_column', 'name_column', 'position_column'))
+        purchase_items: dict[tuple, PurchaseListItem] = {}
+        cursor = part_list.execute(f"SELECT type, {number}, {name}, COALESCE({supplier}, ''), to_order, {position} "
+                                   f"FROM parts ORDER BY id")
+        while rows := cursor.fetchmany(PART_BATCH_SIZE):
+            for part_type, part_number, part_name, part_supplier, to_order, part_position in rows:
+                key = (part_type, part_number, part_supplier)
+                purchase_item = purchase_items.get(key)
+                if purchase_item is None:
+                    purchase_item = purchase_items[key] = {
+                        'number': part_number,
+                        'name': part_name,
+                        'supplier': part_supplier,
+                        'type': part_type,
+                        'to_order': 0,
+                        'positions': [],
+                    }
+                purchase_item['to_order'] += get_loaded_quantity(to_order)
+                purchase_item['positions'].append(part_position)
+
+        purchase_list: dict[PartTypes, list[PurchaseListItem]] = {}
+        for purchase_item in purchase_items.values():
+            purchase_list.setdefault(purchase_item['type'], []).append(purchase_item)
+        self.processor.purchase_list = purchase_list
+
+    @staticmethod
+    def _set_flag(part_list: SqlitePartsCollection, flag: PartFlags, condition: str, parameters=()) -> None:
+        """Sets the flag of Parts meeting the condition and clears it for other Parts."""
+        part_list.execute(f'UPDATE parts SET flags = CASE WHEN {condition} THEN flags | {flag} ELSE flags & ~{flag} '
+                          f'END, assigned_flags = assigned_flags | {flag}', parameters)
+
+    @staticmethod
+    def _check_quantities(part_list: SqlitePartsCollection, condition: str = '1') -> None:
+        """Raises an exception for the first Part, of Parts meeting the condition, which quantity is not a number."""
+        for _, part in part_list.select_parts(f'FROM parts WHERE quantity IS NULL AND {condition} ORDER BY id '
+                                              f'LIMIT 1'):
+            raise QuantityColumnIsNotDigit(part, part_list.column_schema.quantity_column)
+
+    @staticmethod
+    def _create_functions(part_list: SqlitePartsCollection) -> None:
+        """Registers functions of Part values called by processing queries."""
+        for name, function in PROCESSING_SQL_FUNCTIONS.items():
+            part_list.connection.create_function(name, -1, function, deterministic=True)
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from decimal import Decimal
+from typing import Optional, TYPE_CHECKING
+
+from web_app.exceptions import AttrNotSetException, ObjectNotFound
+from web_app.functions import get_stored_value, get_stored_quantity, get_loaded_quantity, multiply_quantities, \
+    get_parent_position, get_position_delimiter_count, get_position_key
+from web_app.functions.functions import get_type_rank
+from web_app.models.part import DefaultPart
+from web_app.models.part_column_schema import PartColumnSchema
+from web_app.models.part_list_validator import MANDATORY_PART_COLUMNS
+from web_app.models.parts_collection import PartsCollection
+from web_app.models.subtree_index import SubtreeIndex
+from web_app.typing import TreeRow
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+
+# Rows fetched from the database at once while Parts are iterated
+PART_BATCH_SIZE = 10000
+# Attributes set by processing steps, stored in columns of their own
+PROCESSED_COLUMNS = ['sets', 'to_order', 'parent_assembly', 'type', 'file_type']
+PART_COLUMNS = ['id', 'quantity', 'flags', 'assigned_flags'] + PROCESSED_COLUMNS
+# Functions of Part values called by queries
+SQL_FUNCTIONS = {
+    'get_parent_position': get_parent_position,
+    'get_position_delimiter_count': get_position_delimiter_count,
+    'get_position_key': get_position_key,
+    'get_stored_quantity': get_stored_quantity,
+    'multiply_quantities': multiply_quantities,
+    'get_type_rank': get_type_rank,
+}
+
+
+class SqlitePartsCollection(PartsCollection):
+    """
+    Class for a collection of Parts stored in a local SQLite database.
+
+    Imported columns of Parts are stored in columns of the 'parts' table, next to columns of processed attributes
+    and of values derived from the part columns of the BOM, e.g. parent positions. Parts are read in batches
+    while they are iterated, so only Parts in use are kept in memory. The tree order is stored in the
+    'tree_order' table, built with a single recursive query when it is first read after Parts are modified.
+    Each thread opens a connection of its own, so the collection may be shared by requests served by other threads.
+    """
+
+    def __init__(self, database_path: str, column_schema: Optional[PartColumnSchema] = None,
+                 part_class: type[AbstractPart] = DefaultPart):
+        super().__init__()
+        self.database_path: str = database_path
+        self.column_schema: PartColumnSchema = column_schema or PartColumnSchema()
+        self.part_class: type[AbstractPart] = part_class
+        # Database columns of Part attributes by attribute names, in the order of import
+        self._attribute_columns: dict[str, str] = {}
+        # Connections of threads, which cannot be used by other threads
+        self._local: threading.local = threading.local()
+        self._create_schema()
+
+    def __getstate__(self):
+        # Connections cannot be pickled, the database is opened again on first use
+        state = self.__dict__.copy()
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def __iter__(self) -> Iterator[AbstractPart]:
+        return (part for _, part in self.select_parts('FROM parts ORDER BY id'))
+
+    def __len__(self):
+        return self.execute('SELECT COUNT(*) FROM parts').fetchone()[0]
+
+    @property
+    def attributes(self) -> list[str]:
+        """Returns names of Part attributes stored in the database, in the order of import."""
+        return list(self._attribute_columns)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread to the database, opened on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.database_path)
+            for name, function in SQL_FUNCTIONS.items():
+                connection.create_function(name, -1, function, deterministic=True)
+        return connection
+
+    def execute(self, sql: str, parameters: Sequence = ()) -> sqlite3.Cursor:
+        """Executes the query within the current transaction."""
+        return self.connection.execute(sql, parameters)
+
+    def commit(self) -> None:
+        """Commits changes of Parts made since the last commit."""
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        """Discards changes of Parts made since the last commit."""
+        self.connection.rollback()
+
+    def close(self) -> None:
+        """Closes the connection of the current thread to the database, discarding changes which are not committed."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def get_column(self, attribute: Optional[str]) -> str:
+        """Returns the database column of the Part attribute, or NULL if no Part has the attribute."""
+        return self._attribute_columns.get(attribute, 'NULL')
+
+    def get_part_column(self, column: str) -> str:
+        """Returns the database column mapped to the Part attribute, e.g. 'number_column', by the column schema."""
+        attribute = getattr(self.column_schema, column)
+        if not attribute:
+            raise AttrNotSetException(MANDATORY_PART_COLUMNS[column])
+        return self.get_column(attribute)
+
+    def add_part(self, part: AbstractPart) -> None:
+        """Adds Part to the Parts collection. Only imported attributes are stored, Parts are processed again."""
+        self.add_parts([part])
+
+    def add_parts(self, parts: list[AbstractPart]) -> None:
+        """Adds multiple Parts to the Parts collection at once, storing their imported attributes."""
+        default_attributes = vars(self.part_class())
+        for part in parts:
+            attributes = {key: value for key, value in vars(part).items() if key not in default_attributes}
+            self.add_rows([list(attributes.values())], list(attributes))
+
+    def add_rows(self, rows: Iterable[Sequence], columns: Sequence[str]) -> SqlitePartsView:
+        """Stores Parts from rows sharing the same columns. Returns a view of the stored Parts."""
+        # As with Part attributes, the last of repeated columns is kept
+        column_indexes = {column: index for index, column in enumerate(columns)}
+        stored_columns = ['id'] + [self._add_attribute_column(column) for column in column_indexes]
+        first_id = (self.execute('SELECT MAX(id) FROM parts').fetchone()[0] or 0) + 1
+        self.connection.executemany(
+            f'INSERT INTO parts ({", ".join(stored_columns)}) VALUES ({", ".join("?" * len(stored_columns))})',
+            ([None] + [get_stored_value(row[index]) if index < len(row) else None
+                       for index in column_indexes.values()] for row in rows))
+        last_id = self.execute('SELECT MAX(id) FROM parts').fetchone()[0] or 0
+        self.index_part_columns(first_id)
+        self.commit()
+        return SqlitePartsView(self, range(first_id, last_id + 1))
+
+    def fill_missing_attributes(self, attributes: Iterable[str], value='') -> None:
+        """Stores the value of attributes which Parts do not have, e.g. columns of other merged part lists."""
+        for attribute in attributes:
+            column = self._add_attribute_column(attribute)
+            self.execute(f'UPDATE parts SET {column} = ? WHERE {column} IS NULL', (get_stored_value(value),))
+        self.commit()
+
+    def get_part(self, part_id: int) -> AbstractPart:
+        """Returns the Part stored with the id."""
+        for _, part in self.select_parts('FROM parts WHERE id = ?', (part_id,)):
+            return part
+        raise IndexError(f'Part {part_id} is not stored in the database.')
+
+    def delete_part(self, part: AbstractPart) -> None:
+        """Deletes the stored Part."""
+        part_id = getattr(part, '_part_id', None)
+        if part_id is None or not self.execute('DELETE FROM parts WHERE id = ?', (part_id,)).rowcount:
+            raise ObjectNotFound(part, self)
+        self.invalidate_tree_order()
+        self.commit()
+
+    def delete_all_parts(self) -> None:
+        """Deletes all stored Parts."""
+        self.execute('DELETE FROM parts')
+        self.invalidate_tree_order()
+        self.commit()
+
+    def index_part_columns(self, first_id: int = 0) -> None:
+        """
+        Indexes columns mapped to Part positions and numbers, then derives parent positions, position sort keys
+        and quantities of Parts stored from the first id.
+        """
+        for column in ('position_column', 'number_column'):
+            database_column = self.get_column(getattr(self.column_schema, column))
+            if database_column != 'NULL':
+                self.execute(f'CREATE INDEX IF NOT EXISTS parts_{database_column} ON parts ({database_column})')
+        position = self.get_column(self.column_schema.position_column)
+        quantity = self.get_column(self.column_schema.quantity_column)
+        self.execute(f'UPDATE parts SET parent_position = get_parent_position({position}), '
+                     f'position_key = get_position_key({position}), quantity = get_stored_quantity({quantity}) '
+                     f'WHERE id >= ?', (first_id,))
+        self.invalidate_tree_order()
+
+    def get_tree_part_list(self) -> Iterator[AbstractPart]:
+        """Returns tree list iterator, reading Parts in batches."""
+        return (tree_row['part'] for tree_row in self.iter_tree_rows())
+
+    def get_tree_order(self) -> list[AbstractPart]:
+        """Returns a list of all Parts sorted as tree. Prefer iterating tree rows, which keeps Parts on disk."""
+        return list(self.get_tree_part_list())
+
+    def get_subtree_index(self) -> SubtreeIndex:
+        """
+        Returns the subtree index of all Parts read in the stored tree order. Parts are kept in memory by the index,
+        prefer queries of tree rows and subtree bounds.
+        """
+        tree_rows = list(self.iter_tree_rows())
+        return SubtreeIndex([tree_row['part'] for tree_row in tree_rows], [tree_row['depth'] for tree_row in tree_rows])
+
+    def iter_tree_rows(self, start: int = 0, end: Optional[int] = None) -> Iterator[TreeRow]:
+        """Yields Parts between tree order indexes with their positions in the tree."""
+        tree_size = self._get_tree_size()
+        end = tree_size if end is None else min(end, tree_size)
+        for (index, depth, child_count), part in self.select_parts(
+                'FROM tree_order JOIN parts ON parts.id = tree_order.part_id '
+                'WHERE tree_index > ? AND tree_index <= ? ORDER BY tree_index', (start, end),
+                ['tree_index - 1', 'depth', 'COALESCE(child_count, 0)']):
+            yield {'index': index, 'depth': depth, 'child_count': child_count, 'part': part}
+
+    def get_tree_children(self, index: int, offset: int = 0, limit: Optional[int] = None) -> list[TreeRow]:
+        """Returns a page of children of the Part at the tree order index."""
+        if not 0 <= index < self._get_tree_size():
+            raise IndexError(f'Tree order index {index} is out of range.')
+        return [{'index': tree_index, 'depth': depth, 'child_count': child_count, 'part': part}
+                for (tree_index, depth, child_count), part in self.select_parts(
+                    'FROM tree_order JOIN parts ON parts.id = tree_order.part_id '
+                    'WHERE parent_id = (SELECT part_id FROM tree_order WHERE tree_index = ?) '
+                    'ORDER BY tree_index LIMIT ? OFFSET ?', (index + 1, -1 if limit is None else limit, offset),
+                    ['tree_index - 1', 'depth', 'COALESCE(child_count, 0)'])]
+
+    def get_subtree_bounds(self, subtree_root: Optional[AbstractPart] = None) -> tuple[int, int]:
+        """Returns tree order indexes where the subtree of the root Part starts and ends, or bounds of the tree."""
+        tree_size = self._get_tree_size()
+        if subtree_root is None:
+            return 0, tree_size
+        enter = self.execute('SELECT tree_index, depth FROM tree_order WHERE part_id = ?',
+                             (getattr(subtree_root, '_part_id', None),)).fetchone()
+        if enter is None:
+            raise ObjectNotFound(subtree_root, self)
+        # The subtree ends before the next Part which is not nested deeper than the root Part
+        exit_index = self.execute('SELECT tree_index FROM tree_order WHERE tree_index > ? AND depth <= ? '
+                                  'ORDER BY tree_index LIMIT 1', enter).fetchone()
+        return enter[0] - 1, exit_index[0] - 1 if exit_index else tree_size
+
+    def get_max_depth(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Returns the deepest nesting level of Parts between tree order indexes, or -1 if there are no Parts."""
+        tree_size = self._get_tree_size()
+        end = tree_size if end is None else min(end, tree_size)
+        max_depth = self.execute('SELECT MAX(depth) FROM tree_order WHERE tree_index > ? AND tree_index <= ?',
+                                 (start, end)).fetchone()[0]
+        return -1 if max_depth is None else max_depth
+
+    def invalidate_tree_order(self) -> None:
+        """Clears the stored tree order after Parts are added or processed."""
+        self.execute('DELETE FROM tree_order')
+
+    def _create_schema(self) -> None:
+        """Creates tables of Parts and of the tree order with their indexes if they do not exist."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS parts (
+                id INTEGER PRIMARY KEY,
+                parent_id INTEGER,
+                parent_position TEXT,
+                position_key TEXT,
+                quantity,
+                child_count INTEGER,
+                sets,
+                to_order,
+                parent_assembly,
+                type TEXT,
+                file_type TEXT,
+                flags INTEGER NOT NULL DEFAULT 0,
+                assigned_flags INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS parts_parent_id ON parts (parent_id);
+            CREATE INDEX IF NOT EXISTS parts_parent_position ON parts (parent_position);
+            CREATE TABLE IF NOT EXISTS tree_order (
+                tree_index INTEGER PRIMARY KEY,
+                part_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tree_order_part_id ON tree_order (part_id);
+        """)
+
+    def _add_attribute_column(self, attribute: str) -> str:
+        """Returns the database column of the Part attribute, adding the column if it does not exist."""
+        if attribute not in self._attribute_columns:
+            column = f'a{len(self._attribute_columns)}'
+            self.execute(f'ALTER TABLE parts ADD COLUMN {column}')
+            self._attribute_columns[attribute] = column
+        return self._attribute_columns[attribute]
+
+    def _get_tree_size(self) -> int:
+        """Returns the number of Parts in the tree order, building the tree order first if it has been cleared."""
+        tree_size = self.execute('SELECT MAX(tree_index) FROM tree_order').fetchone()[0]
+        if tree_size is None and self.execute('SELECT EXISTS (SELECT 1 FROM parts)').fetchone()[0]:
+            is_in_transaction = self.connection.in_transaction
+            self._build_tree_order()
+            # The tree order built while reading Parts is kept, changes made by processing are committed with it
+            if not is_in_transaction:
+                self.commit()
+            tree_size = self.execute('SELECT MAX(tree_index) FROM tree_order').fetchone()[0]
+        return tree_size or 0
+
+    def _build_tree_order(self) -> None:
+        """
+        Stores Parts in tree order, from a depth-first traversal by parent links. Top-level Parts are sorted by
+        'Part number', children of each Part by 'Type', 'Part number' and 'Position', as in TreeOrderIterator.
+        """
+        number = self.get_part_column('number_column')
+        self.get_part_column('position_column')
+        self.execute('DELETE FROM tree_order')
+        # Deeper Parts leave the queue first, so children of a Part are visited right after it in sorted order
+        self.execute(f"""
+            WITH RECURSIVE tree (part_id, depth, type_rank, number, position_key) AS (
+                SELECT id, 0, 0, {number}, position_key FROM parts WHERE parent_id IS NULL
+                UNION ALL
+                SELECT id, tree.depth + 1, get_type_rank(type), {number}, parts.position_key
+                FROM tree JOIN parts ON parent_id = tree.part_id
+                ORDER BY 2 DESC, 3, 4, 5, 1
+            )
+            INSERT INTO tree_order (part_id, depth) SELECT part_id, depth FROM tree
+        """)
+
+    def select_parts(self, query: str, parameters: Sequence = (),
+                     leading_columns: Sequence[str] = ()) -> Iterator[tuple[tuple, AbstractPart]]:
+        """Yields values of leading columns with Parts selected by the query, fetching rows in batches."""
+        columns = list(leading_columns) + [f'parts.{column}' for column in PART_COLUMNS] + \
+            [f'parts.{column}' for column in self._attribute_columns.values()]
+        cursor = self.execute(f'SELECT {", ".join(columns)} {query}', parameters)
+        default_attributes = vars(self.part_class())
+        default_attributes['_column_schema'] = self.column_schema
+        while rows := cursor.fetchmany(PART_BATCH_SIZE):
+            for row in rows:
+                yield row[:len(leading_columns)], self._get_part(row[len(leading_columns):], default_attributes)
+
+    def _get_part(self, row: Sequence, default_attributes: dict) -> AbstractPart:
+        """Returns a Part with imported attributes, overridden by attributes which have been processed."""
+        part_id, quantity, flags, assigned_flags, *processed_values = row[:len(PART_COLUMNS)]
+        attributes = default_attributes.copy()
+        attributes.update(zip(self._attribute_columns, row[len(PART_COLUMNS):]))
+        attributes.update((column, value) for column, value in zip(PROCESSED_COLUMNS, processed_values)
+                          if value is not None)
+        for column in ('sets', 'to_order'):
+            attributes[column] = get_loaded_quantity(attributes[column])
+        # Decimal quantities are stored as text, their parsed values are stored as quantities of Parts
+        if isinstance(quantity, str) and self.column_schema.quantity_column in attributes:
+            attributes[self.column_schema.quantity_column] = Decimal(quantity)
+        attributes.update(flags=flags, _assigned_flags=assigned_flags, _part_id=part_id)
+        part = self.part_class.__new__(self.part_class)
+        part.__dict__ = attributes
+        return part
+
+
+class SqlitePartsView(Sequence):
+    """Class for a sequence of Parts stored in the database, each one read when it is accessed."""
+
+    def __init__(self, collection: SqlitePartsCollection, part_ids: range):
+        self.collection: SqlitePartsCollection = collection
+        self.part_ids: range = part_ids
+
+    def __len__(self):
+        return len(self.part_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return SqlitePartsView(self.collection, self.part_ids[index])
+        return self.collection.get_part(self.part_ids[index])
+
+    def __iter__(self) -> Iterator[AbstractPart]:
+        if self.part_ids.step != 1:
+            return super().__iter__()
+        return (part for _, part in self.collection.select_parts(
+            'FROM parts WHERE id >= ? AND id < ? ORDER BY id', (self.part_ids.start, self.part_ids.stop)))
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+
+class StorageManager:
+    """
+    Class for keeping files of a folder within a byte budget and an age limit.
+    Least recently used files are evicted first. Leased files and files used within the minimal age are never
+    evicted, which also protects files used by other processes of the application.
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None, max_age: Optional[float] = None,
+                 min_age: float = 300, eviction_interval: float = 60):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.min_age = min_age
+        self.eviction_interval = eviction_interval
+        self._leases: dict[str, int] = {}
+        self._leases_lock = threading.Lock()
+        self._eviction_lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+
+    @contextmanager
+    def lease(self, path: str) -> Iterator[str]:
+        """Protects the file from eviction while it is used."""
+        path = os.path.abspath(path)
+        with self._leases_lock:
+            self._leases[path] = self._leases.get(path, 0) + 1
+        self.touch(path)
+        try:
+            yield path
+        finally:
+            with self._leases_lock:
+                self._leases[path] -= 1
+                if not self._leases[path]:
+                    del self._leases[path]
+
+    def touch(self, path: str) -> None:
+        """Marks the file as recently used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def record_write(self) -> list[str]:
+        """Runs eviction if the eviction interval has passed since the last one. Returns paths of evicted files."""
+        if time.monotonic() - self._last_eviction < self.eviction_interval:
+            return []
+        return self.evict()
+
+    def evict(self) -> list[str]:
+        """Removes expired files and least recently used files above the byte budget. Returns their paths."""
+        if not self._eviction_lock.acquire(blocking=False):
+            return []
+        try:
+            self._last_eviction = time.monotonic()
+            return self._evict()
+        finally:
+            self._eviction_lock.release()
+
+    def _evict(self) -> list[str]:
+        """Removes files which are not protected, starting with the least recently used."""
+        now = time.time()
+        total_size = 0
+        candidates = []
+        for path, size, modified_at in self._scan_files():
+            total_size += size
+            if now - modified_at >= self.min_age and not self._is_leased(path):
+                candidates.append((modified_at, size, path))
+        candidates.sort()
+
+        evicted_paths = []
+        for modified_at, size, path in candidates:
+            is_expired = self.max_age is not None and now - modified_at > self.max_age
+            is_over_budget = self.max_bytes is not None and total_size > self.max_bytes
+            # Remaining candidates are younger, so none of them is expired either
+            if not is_expired and not is_over_budget:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            evicted_paths.append(path)
+        return evicted_paths
+
+    def _scan_files(self) -> Iterator[tuple[str, int, float]]:
+        """Yields paths, sizes and modification times of files in the folder."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            # Files like the cache counter of the session storage belong to the storage itself
+            if entry.name.startswith('__'):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield os.path.abspath(entry.path), stat.st_size, stat.st_mtime
+            except FileNotFoundError:
+                continue
+
+    def _is_leased(self, path: str) -> bool:
+        """Checks whether the file is leased."""
+        with self._leases_lock:
+            return path in self._leases
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+
+
+class SubtreeIndex:
+    """
+    Class for an interval index of the BOM tree, built from a single depth-first traversal.
+    Each Part enters the tree order at its index and its subtree ends at its exit index, so every subtree
+    is a contiguous slice of the tree order and ancestor checks are interval comparisons.
+    Depths of Parts may be given when they are known, e.g. stored with the tree order, instead of child links.
+    """
+
+    def __init__(self, tree_order: list[AbstractPart], depths: Optional[list[int]] = None):
+        self.tree_order: list[AbstractPart] = tree_order
+        self.depths: list[int] = [0] * len(tree_order)
+        self.exits: list[int] = [0] * len(tree_order)
+        self._enters: dict[int, int] | None = None
+        if depths is None:
+            self._build()
+        else:
+            self._build_from_depths(depths)
+
+    def __len__(self):
+        return len(self.tree_order)
+
+    def __getstate__(self):
+        # Enter indexes are mapped by Part identity, which changes after unpickling
+        state = self.__dict__.copy()
+        state['_enters'] = None
+        return state
+
+    def get_enter(self, part: AbstractPart) -> int:
+        """Returns the index of the Part in the tree order."""
+        if self._enters is None:
+            self._enters = {id(tree_part): index for index, tree_part in enumerate(self.tree_order)}
+        return self._enters[id(part)]
+
+    def get_exit(self, part: AbstractPart) -> int:
+        """Returns the index of the tree order where the subtree of the Part ends."""
+        return self.exits[self.get_enter(part)]
+
+    def get_depth(self, part: AbstractPart) -> int:
+        """Returns the nesting level of the Part, top-level Parts have depth 0."""
+        return self.depths[self.get_enter(part)]
+
+    def is_ancestor(self, ancestor: AbstractPart, part: AbstractPart) -> bool:
+        """Checks whether the Part is nested anywhere within the ancestor."""
+        ancestor_enter = self.get_enter(ancestor)
+        return ancestor_enter < self.get_enter(part) < self.exits[ancestor_enter]
+
+    def get_subtree(self, part: AbstractPart) -> list[AbstractPart]:
+        """Returns the Part with all Parts nested in it, in tree order."""
+        enter = self.get_enter(part)
+        return self.tree_order[enter:self.exits[enter]]
+
+    def get_descendants(self, part: AbstractPart) -> list[AbstractPart]:
+        """Returns all Parts nested in the Part, in tree order."""
+        return self.get_subtree(part)[1:]
+
+    def get_children_indexes(self, index: int) -> list[int]:
+        """Returns tree order indexes of children of the Part at the index, jumping over their subtrees."""
+        children_indexes = []
+        child_index = index + 1
+        while child_index < self.exits[index]:
+            children_indexes.append(child_index)
+            child_index = self.exits[child_index]
+        return children_indexes
+
+    def _build(self) -> None:
+        """Sets depths and exit indexes of Parts in tree order."""
+        enters = {id(part): index for index, part in enumerate(self.tree_order)}
+        # Children are visited after their parent, so depths are set in tree order
+        for index, part in enumerate(self.tree_order):
+            for child in part.child or []:
+                self.depths[enters[id(child)]] = self.depths[index] + 1
+        # The last child subtree ends where the parent subtree ends, so exits are set in reverse tree order
+        for index in range(len(self.tree_order) - 1, -1, -1):
+            exit_index = index + 1
+            for child in self.tree_order[index].child or []:
+                exit_index = max(exit_index, self.exits[enters[id(child)]])
+            self.exits[index] = exit_index
+        self._enters = enters
+
+    def _build_from_depths(self, depths: list[int]) -> None:
+        """Sets exit indexes of Parts in tree order from their depths."""
+        self.depths = list(depths)
+        # A subtree ends at the next Part which is not nested deeper than its root
+        open_indexes = []
+        for index, depth in enumerate(self.depths):
+            while open_indexes and self.depths[open_indexes[-1]] >= depth:
+                self.exits[open_indexes.pop()] = index
+            open_indexes.append(index)
+        for index in open_indexes:
+            self.exits[index] = len(self.tree_order)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+
+
+class ValueDictionary:
+    """
+    Class for dictionary encoding of repetitive BOM columns.
+    Each low-cardinality column holds a shared table of its distinct values, so equal values of all Parts
+    reference a single object, which is also pickled once in sessions and worker payloads.
+    """
+    sample_size: int = 1000
+    max_cardinality_ratio: float = 0.5
+
+    def __init__(self):
+        self._tables: dict[str, dict[Any, Any]] = {}
+
+    def __contains__(self, column: str):
+        return column in self._tables
+
+    @property
+    def encoded_columns(self) -> list[str]:
+        """Returns names of dictionary encoded columns."""
+        return list(self._tables)
+
+    def get_values(self, column: str) -> list:
+        """Returns distinct values of a dictionary encoded column."""
+        return list(self._tables.get(column, {}))
+
+    def encode(self, column: str, value: Any) -> Any:
+        """Returns the shared instance of a column value, adding it to the column table."""
+        return self._tables.setdefault(column, {}).setdefault(value, value)
+
+    def encode_column(self, column: str, values: Sequence) -> Sequence:
+        """Returns column values replaced by shared instances if the column has a low cardinality."""
+        if column not in self._tables and not self._is_low_cardinality(values):
+            return values
+        table = self._tables.setdefault(column, {})
+        return [table.setdefault(value, value) for value in values]
+
+    def encode_rows(self, rows: Sequence[Sequence], columns: Sequence[str]) -> Sequence[Sequence]:
+        """Returns rows with values of low-cardinality columns replaced by shared instances."""
+        sample = rows[:self.sample_size]
+        encoded_indexes = [index for index, column in enumerate(columns)
+                           if column in self._tables or self._is_low_cardinality([row[index] for row in sample])]
+        if not encoded_indexes:
+            return rows
+        tables = [self._tables.setdefault(columns[index], {}) for index in encoded_indexes]
+        encoded_rows = [None] * len(rows)
+        for row_index, row in enumerate(rows):
+            row = list(row)
+            for index, table in zip(encoded_indexes, tables):
+                value = row[index]
+                row[index] = table.setdefault(value, value)
+            encoded_rows[row_index] = row
+        return encoded_rows
+
+    def encode_columns(self, columns: Mapping[str, Sequence]) -> dict[str, Sequence]:
+        """Returns columnar data with values of low-cardinality columns replaced by shared instances."""
+        return {column: self.encode_column(column, values) for column, values in columns.items()}
+
+    def encode_parts(self, part_list: Iterable[AbstractPart]) -> None:
+        """Replaces values of dictionary encoded columns of Parts by shared instances."""
+        for part in part_list:
+            attributes = vars(part)
+            for column, table in self._tables.items():
+                if column in attributes:
+                    value = attributes[column]
+                    attributes[column] = table.setdefault(value, value)
+
+    def _is_low_cardinality(self, values: Sequence) -> bool:
+        """Checks whether a sample of column values repeats enough to be worth encoding."""
+        sample = values[:self.sample_size]
+        try:
+            return bool(sample) and len(set(sample)) <= len(sample) * self.max_cardinality_ratio
+        except TypeError:
+            return False
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from web_app.exceptions import AttrNotSetException
+from web_app.typing import PartOccurrence
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
+
+
+class WhereUsedIndex:
+    """
+    Class for a reverse index from 'Part number' to every occurrence of the Part within a BOM.
+    Parts which 'Part number' column is not set yet are indexed on the first lookup.
+    """
+
+    def __init__(self, part_list: Iterable[AbstractPart] = None):
+        self._occurrences: dict[str, list[AbstractPart]] = {}
+        self._pending_parts: list[AbstractPart] = []
+        if part_list is not None:
+            self.add_parts(part_list)
+
+    def __len__(self):
+        self._index_pending_parts()
+        return len(self._occurrences)
+
+    def __contains__(self, number: str):
+        self._index_pending_parts()
+        return number in self._occurrences
+
+    def add_part(self, part: AbstractPart) -> None:
+        """Adds a Part occurrence to the index."""
+        try:
+            number = part.number
+        except AttrNotSetException:
+            self._pending_parts.append(part)
+        else:
+            self._occurrences.setdefault(number, []).append(part)
+
+    def add_parts(self, part_list: Iterable[AbstractPart]) -> None:
+        """Adds occurrences of multiple Parts to the index."""
+        for part in part_list:
+            self.add_part(part)
+
+    def reindex(self, part_list: Iterable[AbstractPart]) -> None:
+        """Drops indexed occurrences, so Parts are indexed again on the next lookup, e.g. after remapping columns."""
+        self._occurrences = {}
+        self._pending_parts = list(part_list)
+
+    def remove_part(self, part: AbstractPart) -> None:
+        """Removes a Part occurrence from the index."""
+        self._index_pending_parts()
+        try:
+            occurrences = self._occurrences[part.number]
+        except (AttrNotSetException, KeyError):
+            return
+        occurrences[:] = [item for item in occurrences if item is not part]
+        if not occurrences:
+            del self._occurrences[part.number]
+
+    def get_parts(self, number: str) -> list[AbstractPart]:
+        """Returns every Part with the given 'Part number'."""
+        self._index_pending_parts()
+        return self._occurrences.get(number, [])
+
+    def get_occurrences(self, number: str) -> list[PartOccurrence]:
+        """Returns every occurrence of the 'Part number' with its ancestor path and cumulative sets."""
+        return [self._get_occurrence(part) for part in self.get_parts(number)]
+
+    def _index_pending_parts(self) -> None:
+        """Indexes Parts which 'Part number' column has been set since they were added."""
+        if self._pending_parts:
+            pending_parts, self._pending_parts = self._pending_parts, []
+            self.add_parts(pending_parts)
+
+    @staticmethod
+    def _get_occurrence(part: AbstractPart) -> PartOccurrence:
+        """Returns the representation of a Part occurrence."""
+        ancestors = []
+        ancestor = part.parent
+        while ancestor:
+            ancestors.append(ancestor)
+            ancestor = ancestor.parent
+        return {
+            'position': part.position,
+            'quantity': part.quantity,
+            'sets': part.sets,
+            'to_order': part.to_order,
+            'type': part.type,
+            'path': [{'position': item.position, 'number': item.number} for item in reversed(ancestors)],
+        }
@@ -0,0 +1,74 @@
+$(function () {
+
+    const treePreview = $("#tree-preview");
+    const treePreviewHeader = $("#tree-preview-header");
+    const treePreviewSpacer = $("#tree-preview-spacer");
+    const treePreviewRows = $("#tree-preview-rows");
+
+    const rowHeight = 32;
+    const pageSize = 100;
+    const overscanRows = 20;
+    const loadedPages = {};
+    const pendingPages = {};
+    let columns = [];
+
+    const formatValue = (value) => value === null || value === undefined ? '' : String(value);
+
+    const loadPage = (page) => {
+        if (loadedPages[page] || pendingPages[page]) {
+            return;
+        }
+        pendingPages[page] = $.getJSON(treePreviewUrl, {offset: page * pageSize, limit: pageSize})
+            .done(function (data) {
+                if (!columns.length) {
+                    columns = data.columns;
+                    createHeader();
+                }
+                treePreviewSpacer.height(data.total * rowHeight);
+                loadedPages[page] = data.rows;
+                renderVisibleRows();
+            })
+            .always(function () {
+                delete pendingPages[page];
+            });
+    }
+
+    const createHeader = () => {
+        columns.forEach(function (column) {
+            $('<div>', {class: 'tree-preview-cell', text: column.replace(/\_/g, " ")}).appendTo(treePreviewHeader);
+        });
+    }
+
+    const createRow = (row) => {
+        const rowElement = $('<div>', {class: 'tree-preview-row'}).css('top', row.index * rowHeight);
+        row.values.forEach(function (value, index) {
+            const cell = $('<div>', {class: 'tree-preview-cell', text: formatValue(value)});
+            if (index === 0) {
+                cell.css('padding-left', 8 + row.depth * 16);
+            }
+            cell.appendTo(rowElement);
+        });
+        return rowElement;
+    }
+
+    const renderVisibleRows = () => {
+        const firstRow = Math.max(Math.floor(treePreview.scrollTop() / rowHeight) - overscanRows, 0);
+        const lastRow = Math.ceil((treePreview.scrollTop() + treePreview.height()) / rowHeight) + overscanRows;
+        const visibleRows = [];
+        for (let page = Math.floor(firstRow / pageSize); page <= Math.floor(lastRow / pageSize); page++) {
+            if (!loadedPages[page]) {
+                loadPage(page);
+                continue;
+            }
+            loadedPages[page].forEach(function (row) {
+                if (row.index >= firstRow && row.index <= lastRow) {
+                    visibleRows.push(createRow(row));
+                }
+            });
+        }
+        treePreviewRows.empty().append(visibleRows);
+    }
+
+    treePreview.scroll(renderVisibleRows);
+    loadPage(0);
+});
@@ -13,11 +13,12 @@ $(function () {
         })
     }
 
-    const createOptions = (parent, optionsList, isMultiple) => {
+    const createOptions = (parent, optionsList, isMultiple, selectedOption) => {
         optionsList.forEach(function (option) {
             $('<option>', {
                 text: option,
                 value: option,
+                selected: option === selectedOption,
             }).appendTo(parent);
         });
 
@@ -25,7 +26,7 @@ $(function () {
             $('<option>', {
                 text: '--- Select column name ---',
                 value: '',
-                selected: true,
+                selected: !selectedOption,
             }).prependTo(parent);
         }
     }
@@ -76,8 +77,16 @@ $(function () {
         }
     }
 
-    $("#PART_POSITION_COLUMN, #PART_QUANTITY_COLUMN, #PART_NUMBER_COLUMN, #PART_NAME_COLUMN").each(function (_, element) {
-        createOptions(element, importedBomColumns, false);
+    const preselectedColumnElements = {
+        PART_POSITION_COLUMN: 'position',
+        PART_QUANTITY_COLUMN: 'quantity',
+        PART_NUMBER_COLUMN: 'number',
+        PART_NAME_COLUMN: 'name',
+        PART_SUPPLIER_COLUMN: 'supplier',
+    }
+
+    $("#PART_POSITION_COLUMN, #PART_QUANTITY_COLUMN, #PART_NUMBER_COLUMN, #PART_NAME_COLUMN, #PART_SUPPLIER_COLUMN").each(function (_, element) {
+        createOptions(element, importedBomColumns, false, preselectedColumns[preselectedColumnElements[element.id]]);
     })
 
     $("#NORMALIZED_COLUMN, #JUNK_PART_EMPTY_FIELDS").each(function (_, element) {
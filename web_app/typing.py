@@ -1,16 +1,117 @@
-from typing import Literal, TypedDict
+from typing import BinaryIO, Literal, Optional, TypedDict, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from web_app.models import AbstractPart
 
 HeaderPositions = Literal['top', 'bottom']
 ImportedBomSourceTypes = Literal['file']
-BomManagerClassTypes = Literal['default']
-BomClassTypes = Literal['default']
+BomManagerClassTypes = Literal['default', 'sqlite']
+BomClassTypes = Literal['default', 'sqlite']
 PartClassTypes = Literal['default']
 BomProcessorClassTypes = ['default']
 PartTypes = Literal['production', 'purchased', 'fastener', 'junk']
 PartFileTypes = Literal['part', 'assembly']
+PartListSource = Union[str, bytes, BinaryIO]
+BomChangeTypes = Literal['added', 'removed', 'moved', 'quantity_changed']
 
 
 class ImportedBomSource(TypedDict):
     """Class defining the source representation."""
     type: ImportedBomSourceTypes
     name: str
+
+
+class PurchaseListItem(TypedDict):
+    """Class defining the total quantity of a Part to order within the whole BOM."""
+    number: str
+    name: str
+    supplier: str
+    type: Optional[PartTypes]
+    to_order: int
+    positions: list[str]
+
+
+class PartOccurrenceAncestor(TypedDict):
+    """Class defining an ancestor in the path of a Part occurrence."""
+    position: str
+    number: str
+
+
+class PartOccurrence(TypedDict):
+    """Class defining a single use of a Part within the BOM tree."""
+    position: str
+    quantity: int
+    sets: Optional[int]
+    to_order: Optional[int]
+    type: Optional[PartTypes]
+    path: list[PartOccurrenceAncestor]
+
+
+class CatalogueEntry(TypedDict):
+    """Class defining the total quantity of a Part used in a single project of the catalogue."""
+    source: str
+    project: str
+    number: str
+    name: str
+    supplier: str
+    type: Optional[PartTypes]
+    to_order: int
+    positions: str
+    updated_at: str
+
+
+class BomChange(TypedDict):
+    """Class defining a change of a Part between two revisions of the BOM."""
+    change: BomChangeTypes
+    number: str
+    name: str
+    old_position: Optional[str]
+    new_position: Optional[str]
+    old_quantity: Optional[int]
+    new_quantity: Optional[int]
+
+
+class ToOrderChange(TypedDict):
+    """Class defining a change of the total quantity to order of a Part between two revisions of the BOM."""
+    number: str
+    old_to_order: int
+    new_to_order: int
+    difference: int
+
+
+class SniffedPartList(TypedDict):
+    """Class defining the detected layout of an imported part list."""
+    encoding: str
+    delimiter: str
+    header_position: HeaderPositions
+    columns: list[str]
+    preselected_columns: dict[str, Optional[str]]
+
+
+class MergedPartListSource(TypedDict, total=False):
+    """
+    Class defining a part list source merged into the BOM. Parts of the source are nested under the parent position,
+    if given. Layout of the source defaults to the csv importer defaults.
+    """
+    source: PartListSource
+    filename: str
+    header_position: HeaderPositions
+    encoding: str
+    delimiter: str
+    parent_position: Optional[str]
+
+
+class PartListProblem(TypedDict):
+    """Class defining a problem of a part list row found before processing."""
+    row: int
+    position: str
+    column: str
+    message: str
+
+
+class TreeRow(TypedDict):
+    """Class defining a Part at a position of the BOM tree order."""
+    index: int
+    depth: int
+    child_count: int
+    part: 'AbstractPart'
@@ -1,21 +1,74 @@
 import logging
 import os
+import uuid
+from contextlib import ExitStack
+from zipfile import BadZipFile
 
 from flask import session, render_template, flash, request, redirect, url_for, send_from_directory, current_app, \
-    Blueprint
+    Blueprint, jsonify, Response, abort, g, stream_with_context
 from flask_mail import Message, Mail
+from openpyxl.utils.exceptions import InvalidFileException
 from werkzeug.utils import secure_filename
 
-from .exceptions import DelimiterNotUnique, AttrNotSetException, QuantityColumnIsNotDigit
-from .models import DefaultBomManager, BomXlsxExporter, PartListCsvImporter, BomProcessor
-from .models.processor_director import FullFeatureProcessorDirector
+from .exceptions import DelimiterNotUnique, AttrNotSetException, QuantityColumnIsNotDigit, PartListValidationError, \
+    MergedColumnNotFound, MergedPositionConflict
+from .functions import get_file_digest, get_export_content_key
+from .models import DefaultBomManager, BomXlsxExporter, BomTypeSheetsXlsxExporter, BomCsvExporter, \
+    PartListCsvImporter, PartListCsvSniffer, PartListXlsxImporter, PartListXlsxSniffer, PartListMerger, \
+    BomProcessor, BomStore, PartCatalogue, StorageManager, AbstractBom, SqliteBom, SqliteBomManager, SqliteBomProcessor
+from .models.processor_director import FullFeatureProcessorDirector, ParallelProcessorDirector
 from .typing import *
 
 bp = Blueprint('views', __name__)
 
+TREE_PREVIEW_PAGE_SIZE = 100
+TREE_PREVIEW_MAX_PAGE_SIZE = 500
+MAX_FLASHED_PROBLEMS = 20
+BOM_EXPORTERS = {'xlsx': BomXlsxExporter, 'xlsx-by-type': BomTypeSheetsXlsxExporter, 'csv': BomCsvExporter}
+
 
 def is_allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in current_app.config['ALLOWED_EXTENSIONS']
+    return '.' in filename and get_file_extension(filename) in current_app.config['ALLOWED_EXTENSIONS']
+
+
+def get_file_extension(filename):
+    return filename.rsplit('.', 1)[1].lower()
+
+
+def get_storage_manager(folder) -> StorageManager:
+    return current_app.extensions['storage_managers'][folder]
+
+
+def get_bom_store() -> BomStore:
+    return current_app.extensions['bom_store']
+
+
+def get_user_bom() -> Optional[AbstractBom]:
+    bom_store = get_bom_store()
+    user_bom = bom_store.get(session.get('user_bom_key'))
+    if user_bom is None:
+        return None
+    # Processed BOMs are stored in files, which expire as other stored files do
+    get_storage_manager('BOMS_FOLDER').touch(bom_store.get_path(session['user_bom_key']))
+    if isinstance(user_bom, SqliteBom):
+        # Parts of SQLite BOMs are stored in database files, which expire as other stored files do
+        if not os.path.isfile(user_bom.database_path):
+            return None
+        get_storage_manager('BOMS_FOLDER').touch(user_bom.database_path)
+        g.user_bom = user_bom
+    return user_bom
+
+
+@bp.teardown_request
+def close_user_bom(exception=None):
+    # Connections to SQLite BOMs are opened by each request thread, the BOM itself is shared by requests
+    user_bom = g.pop('user_bom', None)
+    if isinstance(user_bom, SqliteBom):
+        user_bom.part_list.close()
+
+
+def get_layout_of_source(layout: SniffedPartList) -> dict:
+    return {key: layout[key] for key in ('header_position', 'encoding', 'delimiter')}
 
 
 def required(field, message):
@@ -33,33 +86,46 @@ def home_page():
         if 'file' not in request.files:
             flash('No file part')
             return redirect(request.url)
-        file = request.files['file']
+        # Files after the first one are subassemblies merged into the Bill of Materials
+        files = request.files.getlist('file')
         """
         If the user does not select a file, the browser submits an
         empty file without a filename.
         """
         logging.warning('HOME PAGE DETECTED!')
 
-        if file.filename == '':
+        if not files or files[0].filename == '':
             flash('No selected file')
             return redirect(request.url)
-        if file and is_allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            imported_bom_path_name = os.path.join(current_app.config['IMPORTS_FOLDER'], filename)
+        if all(file and is_allowed_file(file.filename) for file in files):
+            imported_bom_header_position = request.form.get('HEADER_POSITION', 'auto')
             os.makedirs(current_app.config['IMPORTS_FOLDER'], exist_ok=True)
-            file.save(imported_bom_path_name)
-
-            imported_bom_header_position: HeaderPositions = request.form['HEADER_POSITION']
-            bom_importer = PartListCsvImporter(imported_bom_path_name, imported_bom_header_position)
-            user_bom_manager = DefaultBomManager()
-            user_bom = user_bom_manager.create_bom()
-            bom_importer.import_to(user_bom)
-
-            session['user_bom'] = user_bom
+            imported_files = []
+            for file in files:
+                extension = get_file_extension(file.filename)
+                sniffer_class = PartListXlsxSniffer if extension == 'xlsx' else PartListCsvSniffer
+                bom_sniffer = sniffer_class(file.stream)
+                try:
+                    file_layout = bom_sniffer.sniff(None if imported_bom_header_position == 'auto'
+                                                    else imported_bom_header_position)
+                except (BadZipFile, InvalidFileException):
+                    flash(f'Unable to read the part list "{secure_filename(file.filename)}" - '
+                          f'the file is not a valid xlsx workbook.')
+                    return redirect(request.url)
+                imported_bom_path_name = os.path.join(current_app.config['IMPORTS_FOLDER'],
+                                                      f'{uuid.uuid4().hex}.{extension}')
+                file.save(imported_bom_path_name)
+                imported_files.append({'filepath': imported_bom_path_name, 'filename': secure_filename(file.filename),
+                                       'layout': file_layout})
+            get_storage_manager('IMPORTS_FOLDER').record_write()
+
+            user_bom_layout = imported_files[0].pop('layout')
+            session['user_bom_import'] = {**imported_files[0], 'merged_files': imported_files[1:]}
+            session['user_bom_layout'] = user_bom_layout
             return redirect(url_for('views.user_data'))
 
         else:
-            flash('Invalid file type. Bill of materials should have a csv extension.')
+            flash('Invalid file type. Bill of materials should have a csv or xlsx extension.')
             return redirect(request.url)
 
     return render_template('index.html')
@@ -67,7 +133,10 @@ def home_page():
 
 @bp.route('/user_data', methods=['GET', 'POST'])
 def user_data():
-    user_bom = session.get('user_bom')
+    user_bom_import = session.get('user_bom_import')
+    user_bom_layout: SniffedPartList = session.get('user_bom_layout')
+    if not user_bom_import:
+        return redirect(url_for('views.home_page'))
 
     if request.method == 'POST':
         bom_attributes = {
@@ -75,34 +144,115 @@ def user_data():
                                            'Please provide main assembly full name.'),
             'main_assembly_sets': required(request.form['MAIN_ASSEMBLY_SETS'], 'Please provide main assembly sets.'),
         }
+        part_attributes = {
+            'position_column': required(request.form['PART_POSITION_COLUMN'],
+                                        'Please select part position column.'),
+            'quantity_column': required(request.form['PART_QUANTITY_COLUMN'],
+                                        'Please select part quantity column.'),
+            'number_column': required(request.form['PART_NUMBER_COLUMN'], 'Please select part number column.'),
+            'name_column': required(request.form['PART_NAME_COLUMN'], 'Please select part number column.'),
+        }
+        exported_columns = required(request.form.getlist('EXPORT_COLUMNS'),
+                                    'Please select at least one column to export.')
+        include_purchase_list = 'EXPORT_PURCHASE_LIST' in request.form
+        if '_flashes' in session:
+            return redirect(request.url)
+
+        merged_files = user_bom_import.get('merged_files', [])
+        with ExitStack() as leases:
+            imports_storage = get_storage_manager('IMPORTS_FOLDER')
+            imported_bom_path_name = leases.enter_context(imports_storage.lease(user_bom_import['filepath']))
+            merged_path_names = [leases.enter_context(imports_storage.lease(merged_file['filepath']))
+                                 for merged_file in merged_files]
+            if not all(os.path.isfile(path_name) for path_name in [imported_bom_path_name] + merged_path_names):
+                flash('The uploaded file has expired. Please upload the Bill of Materials again.')
+                return redirect(url_for('views.home_page'))
+            # Part lists too large to be kept in memory are stored in SQLite
+            imported_paths = [imported_bom_path_name] + merged_path_names
+            if sum(map(os.path.getsize, imported_paths)) >= current_app.config['SQLITE_BOM_IMPORT_SIZE']:
+                user_bom_manager = SqliteBomManager(current_app.config['BOMS_FOLDER'])
+            else:
+                user_bom_manager = DefaultBomManager()
+            user_bom = user_bom_manager.create_bom()
+            g.user_bom = user_bom
+            try:
+                if merged_files:
+                    # Merged files without a parent position are merged at the top level
+                    parent_positions = request.form.getlist('MERGED_PARENT_POSITION') + [''] * len(merged_files)
+                    sources = [{'source': imported_bom_path_name, 'filename': user_bom_import['filename'],
+                                **get_layout_of_source(user_bom_layout)}]
+                    sources += [{'source': path_name, 'filename': merged_file['filename'],
+                                 'parent_position': parent_positions[index].strip(),
+                                 **get_layout_of_source(merged_file['layout'])}
+                                for index, (path_name, merged_file) in enumerate(zip(merged_path_names,
+                                                                                     merged_files))]
+                    bom_merger = PartListMerger(sources, part_attributes['position_column'],
+                                                part_attributes['quantity_column'])
+                    bom_merger.merge_to(user_bom)
+                    source_digest = ':'.join(bom_merger.source_digests)
+                else:
+                    if imported_bom_path_name.endswith('.xlsx'):
+                        bom_importer = PartListXlsxImporter(imported_bom_path_name,
+                                                            user_bom_layout['header_position'],
+                                                            user_bom_import['filename'],
+                                                            quantity_column=part_attributes['quantity_column'])
+                    else:
+                        bom_importer = PartListCsvImporter(imported_bom_path_name, user_bom_layout['header_position'],
+                                                           user_bom_import['filename'], user_bom_layout['encoding'],
+                                                           user_bom_layout['delimiter'],
+                                                           part_attributes['quantity_column'])
+                    bom_importer.import_to(user_bom)
+                    source_digest = get_file_digest(imported_bom_path_name)
+
+            except (MergedColumnNotFound, MergedPositionConflict) as e:
+                flash(e.msg)
+                return redirect(request.url)
+
+            except UnicodeDecodeError:
+                flash('Unable to read the part list - the encoding of the file is not supported.')
+                return redirect(request.url)
 
         for key, value in bom_attributes.items():
             setattr(user_bom, key, value)
-
-        part_attributes = {
-            '_position_column': required(request.form['PART_POSITION_COLUMN'],
-                                         'Please select part position column.'),
-            '_quantity_column': required(request.form['PART_QUANTITY_COLUMN'],
-                                         'Please select part quantity column.'),
-            '_number_column': required(request.form['PART_NUMBER_COLUMN'], 'Please select part number column.'),
-            '_name_column': required(request.form['PART_NAME_COLUMN'], 'Please select part number column.'),
-        }
-        for part in user_bom.part_list:
-            for key, value in part_attributes.items():
-                setattr(part, key, value)
+        user_bom.set_part_columns(**part_attributes)
 
         processor_attributes = {
             'production_part_keywords': request.form['PRODUCTION_PART_KEYWORDS'],
             'junk_part_empty_fields': request.form.getlist('JUNK_PART_EMPTY_FIELDS'),
             'junk_part_keywords': request.form['JUNK_PART_KEYWORDS'],
             'normalized_columns': request.form.getlist('NORMALIZED_COLUMN'),
+            'supplier_column': request.form.get('PART_SUPPLIER_COLUMN') or None,
         }
-        bom_processor = BomProcessor(user_bom)
-        processor_director = FullFeatureProcessorDirector(bom_processor)
+        if current_app.config['STREAM_EXPORTS']:
+            # Any of the streamed formats can be downloaded later, so columns required by all of them are processed
+            required_columns = {column for exporter in BOM_EXPORTERS.values() for column in exporter.required_columns}
+            requested_columns = exported_columns + sorted(required_columns)
+        else:
+            requested_columns = exported_columns + BomXlsxExporter.required_columns
+        if include_purchase_list:
+            requested_columns.append('purchase_list')
+        # The catalogue is updated on every processing run, whether the purchase list is exported or not
+        requested_columns += PartCatalogue.required_columns
+        if isinstance(user_bom, SqliteBom):
+            bom_processor = SqliteBomProcessor(user_bom)
+            processor_director = FullFeatureProcessorDirector(bom_processor, requested_columns)
+        elif len(user_bom) >= current_app.config['PARALLEL_PROCESSING_PART_COUNT']:
+            bom_processor = BomProcessor(user_bom)
+            processor_director = ParallelProcessorDirector(bom_processor, requested_columns=requested_columns)
+        else:
+            bom_processor = BomProcessor(user_bom)
+            processor_director = FullFeatureProcessorDirector(bom_processor, requested_columns)
         bom_processor.set_attributes_from_kwargs(**processor_attributes)
         try:
             processor_director.run_processing()
 
+        except PartListValidationError as e:
+            for problem in e.problems[:MAX_FLASHED_PROBLEMS]:
+                location = f'Row {problem["row"]} ({problem["position"]}): ' if problem['row'] else ''
+                flash(f'{location}{problem["message"]}')
+            if len(e.problems) > MAX_FLASHED_PROBLEMS:
+                flash(f'Found {len(e.problems) - MAX_FLASHED_PROBLEMS} more problems in the part list.')
+
         except DelimiterNotUnique as e:
             part_number = bom_processor.bom_modifiers.get_part_number(e.part)
             part_name = bom_processor.bom_modifiers.name(e.part)
@@ -119,19 +269,37 @@ def user_data():
         if '_flashes' in session:
             return redirect(request.url)
 
-        exported_columns = required(request.form.getlist('EXPORT_COLUMNS'),
-                                    'Please select at least one column to export.')
-        os.makedirs(current_app.config['EXPORTS_FOLDER'], exist_ok=True)
-        bom_exporter = BomXlsxExporter(user_bom)
-        bom_exporter.export_part_list(exported_columns, current_app.config['EXPORTS_FOLDER'])
-        bom_processor.undo_processing()
-        session['exported_filename'] = bom_exporter.exported_filename
+        bom_store = get_bom_store()
+        bom_store.remove(session.get('user_bom_key'))
+        session['user_bom_key'] = bom_store.add(user_bom)
+        get_storage_manager('BOMS_FOLDER').record_write()
+        session['user_bom_export'] = {
+            'exported_columns': exported_columns,
+            'include_purchase_list': include_purchase_list,
+            'content_key': get_export_content_key(source_digest, request.form.to_dict(flat=False)),
+        }
+        PartCatalogue(current_app.config['CATALOGUE_DATABASE']).update(user_bom)
+        if current_app.config['STREAM_EXPORTS']:
+            session['exported_filename'] = None
+        else:
+            os.makedirs(current_app.config['EXPORTS_FOLDER'], exist_ok=True)
+            bom_exporter = BomXlsxExporter(user_bom)
+            bom_exporter.export_part_list(exported_columns, current_app.config['EXPORTS_FOLDER'],
+                                          include_purchase_list=include_purchase_list)
+            session['exported_filename'] = bom_exporter.exported_filename
+            get_storage_manager('EXPORTS_FOLDER').record_write()
 
         return redirect(url_for('views.download'))
 
-    export_available_columns = user_bom.imported_bom_columns + current_app.config['PART_ADDITIONAL_FIELDS']
-    return render_template('user_data.html', imported_bom_columns=user_bom.imported_bom_columns,
-                           export_available_columns=export_available_columns)
+    # Columns of all merged part lists are offered, as Parts of the merged BOM have all of them
+    merged_files = user_bom_import.get('merged_files', [])
+    layouts = [user_bom_layout] + [merged_file['layout'] for merged_file in merged_files]
+    imported_bom_columns = list(dict.fromkeys(column for layout in layouts for column in layout['columns']))
+    export_available_columns = imported_bom_columns + current_app.config['PART_ADDITIONAL_FIELDS']
+    return render_template('user_data.html', imported_bom_columns=imported_bom_columns,
+                           merged_files=merged_files,
+                           export_available_columns=export_available_columns,
+                           preselected_columns=user_bom_layout['preselected_columns'])
 
 
 @bp.route('/download', defaults={'url_filename': None}, methods=['GET', 'POST'])
@@ -141,8 +309,88 @@ def download(url_filename):
 
     if url_filename:
         exported_bom_directory = os.path.join(os.getcwd(), current_app.config['EXPORTS_FOLDER'])
+        # An open file stays readable after eviction, so marking it as recently used is enough
+        get_storage_manager('EXPORTS_FOLDER').touch(os.path.join(exported_bom_directory, secure_filename(url_filename)))
         return send_from_directory(exported_bom_directory, url_filename, as_attachment=True)
-    return render_template('download.html', exported_file_path=exported_filename)
+    return render_template('download.html', exported_file_path=exported_filename,
+                           export_formats=list(BOM_EXPORTERS))
+
+
+@bp.route('/export/<export_format>', methods=['GET'])
+def export(export_format):
+    user_bom = get_user_bom()
+    user_bom_export = session.get('user_bom_export')
+    if not user_bom or not user_bom_export or export_format not in BOM_EXPORTERS:
+        abort(404)
+
+    subtree_position = request.args.get('subtree')
+    subtree_root = None
+    if subtree_position:
+        subtree_root = next((part for part in user_bom.part_list if part.position == subtree_position), None)
+        if subtree_root is None:
+            abort(404)
+
+    etag = get_export_content_key(user_bom_export['content_key'], {'format': export_format,
+                                                                   'subtree': subtree_position})
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        bom_exporter = BOM_EXPORTERS[export_format](user_bom)
+        # The request context is kept while the export is streamed, so the BOM is closed after streaming
+        response = Response(stream_with_context(bom_exporter.stream_part_list(
+            user_bom_export['exported_columns'], user_bom_export['include_purchase_list'], subtree_root)),
+            mimetype=bom_exporter.mimetype)
+        response.headers.set('Content-Disposition', 'attachment', filename=bom_exporter.get_exported_filename())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+@bp.route('/where_used/<path:part_number>', methods=['GET'])
+def where_used(part_number):
+    user_bom = get_user_bom()
+    if not user_bom:
+        return jsonify({'error': 'No processed Bill of Materials found.'}), 404
+    return jsonify({'number': part_number, 'occurrences': user_bom.get_where_used(part_number)})
+
+
+@bp.route('/tree_preview', methods=['GET'])
+def tree_preview():
+    user_bom = get_user_bom()
+    if not user_bom:
+        return jsonify({'error': 'No processed Bill of Materials found.'}), 404
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', TREE_PREVIEW_PAGE_SIZE, type=int), 1), TREE_PREVIEW_MAX_PAGE_SIZE)
+    parent = request.args.get('parent', type=int)
+    try:
+        if parent is None:
+            tree_rows = user_bom.part_list.get_tree_rows(offset, limit)
+        else:
+            tree_rows = user_bom.part_list.get_tree_children(parent, offset, limit)
+    except IndexError as e:
+        return jsonify({'error': str(e)}), 404
+
+    # Part links are represented by the tree itself
+    columns = [column for column in user_bom.imported_bom_columns + current_app.config['PART_ADDITIONAL_FIELDS']
+               if column not in ('parent', 'child')]
+    rows = [{'index': row['index'], 'depth': row['depth'], 'child_count': row['child_count'],
+             'values': [getattr(row['part'], column, None) for column in columns]} for row in tree_rows]
+    return jsonify({'total': len(user_bom.part_list), 'offset': offset, 'columns': columns, 'rows': rows})
+
+
+@bp.route('/catalogue', methods=['GET'])
+def catalogue():
+    part_catalogue = PartCatalogue(current_app.config['CATALOGUE_DATABASE'])
+    if request.args.get('number'):
+        entries = part_catalogue.find_by_number(request.args['number'])
+    elif request.args.get('supplier'):
+        entries = part_catalogue.find_by_supplier(request.args['supplier'])
+    elif request.args.get('name'):
+        entries = part_catalogue.find_by_name_prefix(request.args['name'])
+    else:
+        return jsonify({'error': 'Please provide a part number, supplier or name prefix.'}), 400
+    return jsonify({'entries': entries})
 
 
 @bp.route('/contact', methods=['GET', 'POST'])